@@ -14,19 +14,54 @@ em modo desenvolvimento: `python app.py` (ele cria o DB em `instance/site.db`).
 """
 
 import os
-from flask import Flask, jsonify, request, send_from_directory
+import re
+from flask import Flask, jsonify, request, send_from_directory, stream_with_context, url_for
 from flask_cors import CORS
-from database import db, User, Raca, Cachorro
+from database import (db, User, Raca, Cachorro, atualizar_esquema, RACA_COLUNAS, consulta_usuarios,
+                      consulta_cachorros, usuario_de_linha, raca_de_linha, cachorro_de_linha, executar)
+from catalog import CatalogoRacas, hash_conteudo
+from conditional import (tem_condicional, nao_modificado, aplicar_validadores,
+                         resposta_nao_modificada, etags_if_match)
+from sqlite_config import opcoes_engine, configurar_engine, criar_engine_leitura
+from compression import Compressao, comprimir_com_cache
+from metrics import Metricas
+from group_commit import GrupoCommit, confirmar, desfazer
+from cache import CacheRespostas, Entrada, chave_usuario, chave_email, chave_cachorros
+from campos import Representacao
+from static_manifest import ManifestoFrontend
+from search import buscar, garantir_indice_busca
+from estatisticas import consultar_estatisticas, garantir_estatisticas
+from sincronizacao import (ALTERACOES_POR_RESPOSTA, ALTERACOES_POR_RESPOSTA_MAXIMO, consultar_alteracoes,
+                           garantir_sincronizacao)
+from streaming import MIMETYPES, ITENS_POR_PARTE, resposta_em_partes
+from export import MIMETYPES_EXPORTACAO, INCLUSOES, exportar, ler_data
+from importacao import MOTIVOS, REGISTROS_POR_LOTE, REGISTROS_POR_LOTE_MAXIMO, abrir_corpo, importar
+from sqlalchemy import String, and_, exists, func, insert, literal, or_, select, tuple_, type_coerce, update
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.exc import IntegrityError
 from flask_swagger_ui import get_swaggerui_blueprint
-from datetime import datetime
+from datetime import datetime, timedelta
+
+# Limite de itens aceitos pelas rotas de cadastro em lote
+TAMANHO_MAXIMO_LOTE = 5000
+# Quantos valores são enviados em cada cláusula IN (o SQLite limita o número de parâmetros)
+VALORES_POR_CONSULTA = 500
+# Campos opcionais do cadastro de cachorro (texto ou número; nunca objeto ou lista)
+CAMPOS_OPCIONAIS_CACHORRO = ('idade', 'peso', 'info_extra')
+# Origem do selo de criação nos ETags (ver `selo` em `create_app`)
+EPOCA = datetime(1970, 1, 1)
 
 # --- Configuração do Flask App e SQLAlchemy ---
-def create_app():
+def create_app(config=None):
     """Cria e configura a aplicação Flask.
 
     Retorna a instância do app pronta para ser usada tanto pelo servidor
     quanto por scripts (ex: `seed_db.py`). Separar a criação da app em
     uma fábrica facilita testes e execução em diferentes contextos.
+
+    `config` (opcional) é um dicionário que sobrescreve a configuração
+    padrão, por exemplo outro `SQLALCHEMY_DATABASE_URI` ou `SQLITE_PERFIL`
+    (ver `sqlite_config.py`) em benchmarks e scripts.
     """
 
     app = Flask(__name__) # Cria a instância do aplicativo Flask
@@ -35,18 +70,340 @@ def create_app():
     # Assim evitamos problemas quando o script for executado a partir de outro diretório.
     basedir = os.path.abspath(os.path.dirname(__file__))
     db_path = os.path.join(basedir, 'instance', 'site.db')
+    # A pasta 'instance' precisa existir já aqui: a fábrica abre o banco ao iniciar (esquema e catálogo).
+    os.makedirs(os.path.join(basedir, 'instance'), exist_ok=True)
     app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_path}"
     
     # Desativa um alerta do SQLAlchemy que não é necessário para o nosso caso, economizando recursos.
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # Aplica a configuração recebida (ex: banco alternativo) antes de inicializar as extensões.
+    app.config.update(config or {})
+
+    # Opções do pool/conexão conforme o perfil SQLite (WAL, PRAGMAs etc.; ver `sqlite_config.py`).
+    opcoes_engine(app)
     
     # Inicializa o SQLAlchemy com a instância do aplicativo Flask.
     db.init_app(app)
+    with app.app_context():
+        configurar_engine(app, db.engine)
+        # Adiciona colunas novas dos modelos em bancos já existentes (ver `database.py`)
+        atualizar_esquema()
+        # Índice FTS5 da busca de raças, em bancos criados antes dele (ver `search.py`)
+        garantir_indice_busca(db.engine)
+        # Tabelas de resumo das estatísticas, mantidas por gatilhos (ver `estatisticas.py`)
+        garantir_estatisticas(db.engine)
+        # Sequência de alterações e lápides dos cachorros, mantidas por gatilhos (ver `sincronizacao.py`)
+        garantir_sincronizacao(db.engine)
+    # Engine somente leitura, com pool próprio, para as requisições GET (WAL; ver `sqlite_config.py`).
+    # A `SessaoRoteada` de `database.py` escolhe o engine de cada consulta.
+    engine_leitura = criar_engine_leitura(app)
+    if engine_leitura is not None:
+        app.extensions['engine_leitura'] = engine_leitura
 
     # Habilita o CORS (Cross-Origin Resource Sharing) para todas as rotas.
     # Isso é essencial para permitir que o Frontend (rodando em um domínio/porta diferente)
     # se comunique com o Backend sem bloqueios de segurança do navegador.
-    CORS(app)
+    # Os cabeçalhos de paginação e de cache são expostos para que o JavaScript do frontend consiga lê-los.
+    CORS(app, expose_headers=['Link', 'X-Next-Cursor', 'ETag', 'Last-Modified'])
+
+    # Métricas por rota (latência, SQL, bytes) em GET /metrics (ver `metrics.py`).
+    # Registrada antes da compressão para medir a resposta já comprimida.
+    with app.app_context():
+        metricas = Metricas(app, db.engine)
+    if engine_leitura is not None and app.config['METRICAS_ATIVAS']:
+        metricas.instrumentar_engine(engine_leitura)
+
+    # Compressão das respostas (gzip/brotli/zstd) conforme o Accept-Encoding (ver `compression.py`).
+    Compressao(app)
+
+    # Catálogo de raças pré-calculado em memória (ver `catalog.py`).
+    # Montado uma vez aqui; é invalidado automaticamente quando alguma raça é gravada.
+    catalogo = CatalogoRacas(app)
+    with app.app_context():
+        catalogo.carregar()
+
+    # Commit em grupo das rotas de escrita (GRUPO_COMMIT; ver `group_commit.py`).
+    # Desligado, as rotas marcadas com `@grupo.escrita` fazem o seu próprio commit.
+    grupo = GrupoCommit(app)
+
+    # Cache LRU/TTL das respostas por usuário, invalidado pelas escritas (CACHE_RESPOSTAS; ver `cache.py`).
+    # Desligado, `obter` sempre devolve None e `guardar` não faz nada.
+    with app.app_context():
+        cache = CacheRespostas(app, db.engine)
+
+    def cachorro_com_raca(cachorro):
+        """Serializa um cachorro incluindo a raça vinda do catálogo em memória.
+
+        Equivale a `cachorro.to_dict(include_breed=True)`, mas evita o SELECT
+        preguiçoso de `breed` feito para cada cachorro (problema N+1), de modo
+        que as listagens usam um número fixo de consultas.
+        """
+        return com_raca(cachorro.to_dict())
+
+    def com_raca(data):
+        """Adiciona a raça (vinda do catálogo) a um cachorro já serializado."""
+        raca = raca_por_id(data['raca_id'])
+        if raca is not None:
+            data['breed'] = raca
+        return data
+
+    def raca_por_id(raca_id):
+        """Raça no formato de `Raca.to_dict()` vinda do catálogo, ou None se não existir."""
+        raca = catalogo.snapshot().racas.get(raca_id)
+        if raca is None:
+            # Raça ausente do snapshot (ex: gravada por outro processo): consulta o banco
+            linha = executar(select(*RACA_COLUNAS).where(Raca.id == raca_id)).first()
+            raca = raca_de_linha(linha) if linha is not None else None
+        return raca
+
+    def violacao(erro):
+        """Identifica a restrição violada em um IntegrityError do SQLite.
+
+        Retorna 'unique', 'not_null', 'foreign_key' ou None.
+        """
+        mensagem = str(erro.orig)
+        if 'UNIQUE constraint failed' in mensagem:
+            return 'unique'
+        if 'NOT NULL constraint failed' in mensagem:
+            return 'not_null'
+        if 'FOREIGN KEY constraint failed' in mensagem:
+            return 'foreign_key'
+        return None
+
+    def existe_usuario_e_raca(user_id=None, raca_id=None):
+        """Condições EXISTS para usar no WHERE de um INSERT/UPDATE de cachorro.
+
+        Assim a existência do usuário e da raça é verificada pelo próprio
+        banco, no mesmo comando da escrita. Isso funciona mesmo em bancos
+        antigos cuja tabela `cachorro` foi recriada sem chaves estrangeiras.
+        """
+        condicoes = []
+        if user_id is not None:
+            condicoes.append(exists().where(User.id == user_id))
+        if raca_id is not None:
+            condicoes.append(exists().where(Raca.id == raca_id))
+        return condicoes
+
+    def motivo_404(user_id=None, raca_id=None):
+        """Descobre (só no caminho de erro) se faltou o usuário ou a raça."""
+        if user_id is not None and db.session.get(User, user_id) is None:
+            return jsonify({"message": "Usuário não encontrado."}), 404
+        return jsonify({"message": "Raça não encontrada."}), 404
+
+    def resposta_duplicado(user_id, nome_pet):
+        """Resposta 409 com os dados do cachorro já cadastrado para o usuário."""
+        desfazer()
+        existing = Cachorro.query.filter_by(user_id=user_id, nome_pet=nome_pet).first()
+        return jsonify({
+            'message': 'Cachorro já registrado para este usuário.',
+            'cachorro': cachorro_com_raca(existing) if existing else None
+        }), 409
+
+    # --- Versões dos recursos (ETags) ---
+    # Os ETags são montados a partir da coluna `versao` de cada registro. Para
+    # respostas que embutem a raça, o hash do catálogo também entra no ETag.
+    # Os ids não são AUTOINCREMENT: depois de uma exclusão o próximo INSERT pode
+    # reaproveitar o id, com a versão de novo em 1. Por isso o ETag também leva
+    # a data de criação do registro (`selo`), que muda a cada novo registro.
+
+    def selo(criado_em):
+        """Data de criação em microssegundos desde 1970, em hexadecimal."""
+        if criado_em is None:
+            return '0'
+        return format((criado_em - EPOCA) // timedelta(microseconds=1), 'x')
+
+    def data_do_selo(texto):
+        return EPOCA + timedelta(microseconds=int(texto, 16)) if texto != '0' else None
+
+    # `variante`: representação pedida com `fields`/`embed` (ver `campos.py`); vazia na completa.
+
+    def com_variante(etag, variante):
+        return f'{etag}.r{variante}' if variante else etag
+
+    def etag_usuario(user_id, versao, data_cadastro, variante=''):
+        return com_variante(f'u{user_id}.{versao}.{selo(data_cadastro)}', variante)
+
+    def etag_cachorro(cachorro_id, versao, data_registro, variante=''):
+        return com_variante(f'c{cachorro_id}.{versao}.{selo(data_registro)}.{catalogo.snapshot().etag}', variante)
+
+    def etag_lista_cachorros(user_id, resumo, variante=''):
+        """ETag da lista de cachorros de um usuário.
+
+        `resumo` = (quantidade, soma dos ids, soma dos ids ao quadrado, soma das versões,
+        maior `data_registro` em texto): muda quando um cachorro é criado, alterado,
+        removido ou trocado de dono, mesmo que um id excluído seja reaproveitado.
+        """
+        assinatura = ','.join(str(int(valor or 0)) for valor in resumo[:4]) + ',' + (resumo[4] or '')
+        return com_variante(f'l{user_id}.{hash_conteudo(assinatura.encode())}.{catalogo.snapshot().etag}', variante)
+
+    def resumo_cachorros(versoes):
+        """Calcula em Python o mesmo resumo que a consulta leve de versões.
+
+        `versoes` = lista de (id, versao, data_registro em texto) dos cachorros.
+        """
+        return (len(versoes), sum(i for i, _, _ in versoes), sum(i * i for i, _, _ in versoes),
+                sum(v for _, v, _ in versoes), max((r for _, _, r in versoes), default=None))
+
+    def responder_usuario(user, status=200):
+        response = jsonify(user.to_dict())
+        response.status_code = status
+        return aplicar_validadores(response, etag_usuario(user.id, user.versao, user.data_cadastro),
+                                   user.atualizado_em or user.data_cadastro)
+
+    # Leituras (GET) usam os serializadores de linhas de `database.py`, sem objetos ORM.
+    # As colunas abaixo vêm no fim da linha, para montar o ETag e o Last-Modified
+    # (o id também: com `fields=` ele pode não estar entre as colunas pedidas).
+    VALIDADORES_USUARIO = (User.id, User.versao, User.atualizado_em, User.data_cadastro)
+    VALIDADORES_CACHORRO = (Cachorro.id, Cachorro.versao, Cachorro.atualizado_em, Cachorro.data_registro)
+
+    def ler_representacao(recurso, permite_ref=False):
+        """Campos pedidos em `fields`/`embed` (ver `campos.py`); ValueError se inválidos."""
+        return Representacao.de_parametros(request.args, recurso, permite_ref)
+
+    def serializador_usuarios(representacao):
+        """(consulta(*extras), de_linha(linha)) dos usuários conforme os campos pedidos."""
+        if representacao.padrao:
+            return consulta_usuarios, usuario_de_linha
+        return representacao.consulta, representacao.de_linha
+
+    def serializador_cachorros(representacao, racas=None):
+        """(consulta(*extras), de_linha(linha)) dos cachorros com a raça, conforme `fields`/`embed`.
+
+        No modo `embed=ref` as raças vão para o dicionário `racas` (ver `campos.py`).
+        """
+        if representacao.padrao:
+            return (lambda *extras: consulta_cachorros(False, False, *extras),
+                    lambda linha: com_raca(cachorro_de_linha(linha)))
+        return representacao.consulta, lambda linha: representacao.montar(linha, raca_por_id, racas)
+
+    def responder_linha_usuario(linha, de_linha, variante=''):
+        """Resposta 200 de um usuário lido com `consulta(*VALIDADORES_USUARIO)` de `serializador_usuarios`."""
+        user_id, versao, atualizado_em, data_cadastro = linha[-4:]
+        return aplicar_validadores(jsonify(de_linha(linha)), etag_usuario(user_id, versao, data_cadastro, variante),
+                                   atualizado_em or data_cadastro)
+
+    def responder_linha_cachorro(linha, de_linha, variante=''):
+        """Resposta 200 de um cachorro lido com `consulta(*VALIDADORES_CACHORRO)` de `serializador_cachorros`."""
+        cachorro_id, versao, atualizado_em, data_registro = linha[-4:]
+        return aplicar_validadores(jsonify(de_linha(linha)), etag_cachorro(cachorro_id, versao, data_registro, variante),
+                                   atualizado_em or data_registro)
+
+    def responder_cachorro(cachorro, dados=None, status=200):
+        response = jsonify(dados if dados is not None else cachorro_com_raca(cachorro))
+        response.status_code = status
+        return aplicar_validadores(response, etag_cachorro(cachorro.id, cachorro.versao, cachorro.data_registro),
+                                   cachorro.atualizado_em or cachorro.data_registro)
+
+    def resposta_do_cache(entrada):
+        """Resposta 200 (ou 304, se o cliente já tem esta versão) a partir de uma entrada do cache."""
+        if tem_condicional() and nao_modificado(entrada.etag, entrada.modificado_em):
+            return resposta_nao_modificada(app.response_class, entrada.etag, entrada.modificado_em)
+        response = app.response_class(entrada.corpo, mimetype=app.json.mimetype)
+        return aplicar_validadores(response, entrada.etag, entrada.modificado_em)
+
+    def guardar_no_cache(chave, response, geracao, modificado_em=None):
+        """Guarda o corpo e os validadores de uma resposta 200 no cache e a devolve."""
+        cache.guardar(chave, Entrada(response.get_data(), response.get_etag()[0], modificado_em), geracao)
+        return response
+
+    def versoes_if_match(prefixo, registro_id):
+        """Versões aceitas pelo cliente no cabeçalho If-Match de um PUT.
+
+        Retorna None (sem If-Match), '*' (qualquer versão) ou um conjunto de pares
+        (versao, data de criação) extraídos dos ETags enviados (vazio se nenhum for
+        deste registro). A data de criação separa um registro de outro que
+        reaproveitou o mesmo id.
+        """
+        etags = etags_if_match()
+        if etags is None or etags == '*':
+            return etags
+        versoes = set()
+        for etag in etags:
+            encontrado = re.match(rf'{prefixo}{registro_id}\.(\d+)\.([0-9a-f]+)(\.|-|$)', etag)
+            if encontrado:
+                versoes.add((int(encontrado.group(1)), data_do_selo(encontrado.group(2))))
+        return versoes
+
+    def resposta_precondicao():
+        return jsonify({"message": "O recurso foi alterado por outra requisição (If-Match não confere)."}), 412
+
+    def parametro_inteiro(nome, minimo=None, maximo=None):
+        """Lê um parâmetro inteiro opcional da query string.
+
+        Retorna None se ausente; levanta ValueError se inválido ou fora dos limites.
+        """
+        valor = request.args.get(nome)
+        if valor is None:
+            return None
+        valor = int(valor)
+        if (minimo is not None and valor < minimo) or (maximo is not None and valor > maximo):
+            raise ValueError(nome)
+        return valor
+
+    def ler_lote(chave):
+        """Lê o corpo de uma rota de lote: uma lista JSON ou {chave: [...]}.
+
+        Retorna a lista de itens ou None se o formato for inválido.
+        """
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get(chave)
+        if not isinstance(data, list) or not data or len(data) > TAMANHO_MAXIMO_LOTE:
+            return None
+        return data
+
+    def em_partes(valores):
+        """Divide uma coleção em partes de até VALORES_POR_CONSULTA elementos."""
+        valores = list(valores)
+        for inicio in range(0, len(valores), VALORES_POR_CONSULTA):
+            yield valores[inicio:inicio + VALORES_POR_CONSULTA]
+
+    def validar_cadastro(data, recurso, textos, ids=(), opcionais=()):
+        """Mensagem do 400 para um item de cadastro, ou None se ele for válido.
+
+        `textos` são os campos obrigatórios de texto (não vazios), `ids` os
+        obrigatórios inteiros e `opcionais` os que, se enviados, precisam ser
+        valores simples: um objeto ou lista faria o INSERT falhar com 500.
+        """
+        if not isinstance(data, dict) or not all(key in data for key in (*textos, *ids)):
+            return f"Dados incompletos para cadastro de {recurso}."
+        if not all(isinstance(data[key], str) and data[key].strip() for key in textos):
+            return f"Dados incompletos para cadastro de {recurso}."
+        try:
+            for key in ids:
+                int(data[key])
+        except (TypeError, ValueError):
+            return f"Dados inválidos para cadastro de {recurso}."
+        if any(isinstance(data.get(key), (dict, list)) for key in opcionais):
+            return f"Dados inválidos para cadastro de {recurso}."
+        return None
+
+    def filtros_por_dono(pares):
+        """Filtros para pares (user_id, nome_pet), em blocos de até VALORES_POR_CONSULTA valores.
+
+        Cada filtro é um OR de `user_id = ? AND nome_pet IN (...)` por dono: com
+        `tuple_(...).in_()` o SQLite varre a tabela inteira, assim cada termo usa
+        o índice único (user_id, nome_pet).
+        """
+        por_dono = {}
+        for user_id, nome_pet in pares:
+            por_dono.setdefault(user_id, []).append(nome_pet)
+        termos, valores = [], 0
+        for user_id, nomes in por_dono.items():
+            for parte in em_partes(nomes):
+                termos.append(and_(Cachorro.user_id == user_id, Cachorro.nome_pet.in_(parte)))
+                valores += len(parte) + 1
+                if valores >= VALORES_POR_CONSULTA:
+                    yield or_(*termos)
+                    termos, valores = [], 0
+        if termos:
+            yield or_(*termos)
+
+    def resposta_lote(resultados, chave):
+        """Monta a resposta das rotas de lote: 201 se tudo foi criado, senão 207."""
+        status = 201 if all(r['status'] == 201 for r in resultados) else 207
+        return jsonify({chave: resultados}), status
 
     # --- Configuração do Swagger UI ---
     SWAGGER_URL = '/swagger' # URL onde a documentação Swagger estará disponível (ex: http://localhost:5000/swagger)
@@ -67,12 +424,14 @@ def create_app():
     # Serve arquivos a partir do diretório do backend (onde este app.py vive).
     @app.route('/static/<path:filename>')
     def static_files(filename):
-        return send_from_directory(basedir, filename)
+        return comprimir_com_cache(send_from_directory(basedir, filename))
 
     # Rota dedicada para servir o arquivo OpenAPI/Swagger diretamente.
     @app.route('/swagger.yaml')
     def swagger_yaml():
-        return send_from_directory(basedir, 'swagger.yaml')
+        # O `mimetypes` do Python não conhece `.yaml`: sem o tipo explícito o arquivo sairia
+        # como application/octet-stream e nunca seria comprimido (ver `compression.py`)
+        return comprimir_com_cache(send_from_directory(basedir, 'swagger.yaml', mimetype='application/yaml'))
 
     # Nota: a rota que serve o frontend (catch-all) foi movida para o final
     # da função `create_app()` para evitar sobrescrever as rotas da API.
@@ -83,27 +442,62 @@ def create_app():
     # Rota GET para buscar todas as raças de cachorro
     @app.route('/racas', methods=['GET'])
     def get_racas():
-        # Consulta todas as raças no banco de dados
-        racas = Raca.query.all()
-        # Converte a lista de objetos Raca para uma lista de dicionários e retorna como JSON
-        return jsonify([raca.to_dict() for raca in racas])
+        # Devolve o JSON já codificado do catálogo em memória (sem consultar o SQLite)
+        snapshot = catalogo.snapshot()
+        if nao_modificado(snapshot.etag):
+            return resposta_nao_modificada(app.response_class, snapshot.etag)
+        response = app.response_class(snapshot.lista, mimetype=app.json.mimetype)
+        return comprimir_com_cache(aplicar_validadores(response, snapshot.etag))
 
     # Rota GET para buscar uma raça específica pelo nome
-    # O nome da raça é passado como parte da URL (ex: /racas/Bulldog-Frances)
+    # O nome da raça é passado como parte da URL (ex: /racas/bulldog-frances)
+    # Rota GET de busca textual de raças (seletor de raças do frontend)
+    @app.route('/racas/search', methods=['GET'])
+    def search_racas():
+        """Busca raças por texto, com filtros e contagens por porte e grupo.
+
+        Uso: GET /racas/search?q=golden&porte=Grande&grupo=Companhia&limit=20
+
+        `q` ignora acentos e maiúsculas e a última palavra vale como prefixo
+        (busca enquanto se digita). Os resultados vêm ordenados por relevância
+        (bm25; o nome pesa mais que os textos). Ver `search.py`.
+
+        Respostas:
+            200: {"total": n, "resultados": [raças], "facetas": {"porte": {...}, "grupo": {...}}}
+            400: `limit` inválido (1 a 100)
+        """
+        try:
+            limite = parametro_inteiro('limit', minimo=1, maximo=100) or 20
+        except ValueError:
+            return jsonify({"message": "Parâmetro 'limit' inválido (use de 1 a 100)."}), 400
+
+        # O resultado só muda quando alguma raça muda: o ETag vem do catálogo e dos parâmetros
+        snapshot = catalogo.snapshot()
+        etag = hash_conteudo(f'{snapshot.etag}?{request.query_string.decode()}'.encode())
+        if nao_modificado(etag):
+            return resposta_nao_modificada(app.response_class, etag)
+        resultado = buscar(snapshot, db.session.connection(), request.args.get('q'),
+                           request.args.get('porte'), request.args.get('grupo'), limite)
+        return comprimir_com_cache(aplicar_validadores(jsonify(resultado), etag))
+
     @app.route('/racas/<string:nome_raca>', methods=['GET'])
     def get_raca_by_name(nome_raca):
-        # Converte o nome da raça recebido na URL para um formato que corresponda ao banco de dados.
-        # Ex: "bulldog-frances" -> "Bulldog Frances" ou "labrador-retriever" -> "Labrador Retriever"
-        # .replace('-', ' ') substitui hífens por espaços.
-        # .title() capitaliza a primeira letra de cada palavra (para nomes compostos como 'Bulldog Frances').
-        formatted_name = nome_raca.replace('-', ' ').title()
-        raca = Raca.query.filter_by(nome=formatted_name).first() # Busca a raça pelo nome
-        if raca:
-            return jsonify(raca.to_dict()) # Retorna os dados da raça como JSON
+        # O nome recebido é normalizado para slug (sem acentos, minúsculo, com hífens)
+        # e procurado no índice do catálogo. Ex: "Bulldog-Francês" -> "bulldog-frances".
+        # Tanto acertos quanto 404 são resolvidos sem consultar o banco.
+        snapshot = catalogo.snapshot()
+        raca_id = snapshot.buscar_slug(nome_raca)
+        if raca_id is not None:
+            etag = snapshot.etags[raca_id]
+            if nao_modificado(etag):
+                return resposta_nao_modificada(app.response_class, etag)
+            response = app.response_class(snapshot.por_id[raca_id], mimetype=app.json.mimetype)
+            return comprimir_com_cache(aplicar_validadores(response, etag))
         return jsonify({"message": "Raça não encontrada."}), 404 # Se não encontrar, retorna 404 (Not Found)
 
     # Rota POST para cadastrar um novo usuário
     @app.route('/usuarios', methods=['POST'])
+    @grupo.escrita
     def create_user():
         """Cria um novo usuário.
 
@@ -122,13 +516,10 @@ def create_app():
 
         data = request.get_json()  # Pega os dados JSON enviados no corpo da requisição
 
-        # Validação básica: verifica se os campos 'nome_completo' e 'email' estão presentes
-        if not data or not all(key in data for key in ['nome_completo', 'email']):
-            return jsonify({"message": "Dados incompletos para cadastro de usuário."}), 400 # 400 (Bad Request)
-
-        # Verifica se o email já existe no banco de dados para evitar duplicatas
-        if User.query.filter_by(email=data['email']).first():
-            return jsonify({"message": "Este e-mail já está cadastrado."}), 409 # 409 (Conflict)
+        # Validação básica: 'nome_completo' e 'email' presentes e em texto, 'telefone' simples
+        erro = validar_cadastro(data, 'usuário', ['nome_completo', 'email'], opcionais=['telefone'])
+        if erro:
+            return jsonify({"message": erro}), 400 # 400 (Bad Request)
 
         # Cria um novo objeto User com os dados recebidos
         new_user = User(
@@ -137,26 +528,130 @@ def create_app():
             telefone=data.get('telefone') # .get() permite que 'telefone' seja opcional
         )
         db.session.add(new_user) # Adiciona o novo usuário à sessão do banco
-        db.session.commit() # Salva as mudanças permanentemente
-        return jsonify(new_user.to_dict()), 201 # Retorna o usuário criado e 201 (Created)
+        # Insere direto: a restrição UNIQUE do e-mail no banco detecta duplicatas
+        # (sem um SELECT prévio e sem corrida entre a verificação e o INSERT).
+        try:
+            db.session.flush()
+        except IntegrityError as erro:
+            desfazer()
+            if violacao(erro) == 'unique':
+                return jsonify({"message": "Este e-mail já está cadastrado."}), 409 # 409 (Conflict)
+            return jsonify({"message": "Dados incompletos para cadastro de usuário."}), 400
+        response = responder_usuario(new_user, 201) # Serializa antes do commit para não recarregar o objeto
+        confirmar() # Salva as mudanças permanentemente
+        return response # Retorna o usuário criado e 201 (Created)
+
+    # Rota POST para cadastrar vários usuários de uma vez (importações de parceiros)
+    @app.route('/usuarios/batch', methods=['POST'])
+    @grupo.escrita
+    def create_users_batch():
+        """Cria vários usuários em uma única transação.
+
+        Payload esperado (JSON): uma lista de objetos no formato de `POST /usuarios`
+        (ou {"usuarios": [...]}), com no máximo TAMANHO_MAXIMO_LOTE itens.
+
+        Os e-mails já existentes são verificados com uma única consulta (IN) e
+        todos os usuários válidos são gravados com um único INSERT (executemany)
+        e um único commit. O INSERT usa `ON CONFLICT DO NOTHING RETURNING`: um
+        e-mail gravado por outra requisição entre a consulta e o INSERT vira um
+        409 daquele item, e não um 500 do lote inteiro.
+
+        Respostas:
+            201: todos os usuários foram criados
+            207: parte dos itens falhou; cada resultado traz seu próprio status
+                 (201, 400 dados incompletos, 409 e-mail já cadastrado)
+            400: corpo inválido, vazio ou grande demais
+        """
+
+        itens = ler_lote('usuarios')
+        if itens is None:
+            return jsonify({"message": "Envie uma lista de usuários (máximo de %d itens)." % TAMANHO_MAXIMO_LOTE}), 400
+
+        resultados = [None] * len(itens)
+        validos = []
+        for indice, data in enumerate(itens):
+            # Mesmas verificações de `POST /usuarios`, antes de qualquer INSERT
+            erro = validar_cadastro(data, 'usuário', ['nome_completo', 'email'], opcionais=['telefone'])
+            if erro:
+                resultados[indice] = {"indice": indice, "status": 400, "message": erro}
+            else:
+                validos.append((indice, data))
+
+        # Uma consulta (por bloco de e-mails) para descobrir quais já estão cadastrados
+        emails_existentes = set()
+        for parte in em_partes({data['email'] for _, data in validos}):
+            emails_existentes.update(db.session.execute(select(User.email).where(User.email.in_(parte))).scalars())
+
+        novos = {}  # e-mail -> índice do item que será criado
+        for indice, data in validos:
+            if data['email'] in emails_existentes or data['email'] in novos:
+                resultados[indice] = {"indice": indice, "status": 409, "message": "Este e-mail já está cadastrado."}
+            else:
+                novos[data['email']] = indice
+
+        if novos:
+            # Um único INSERT com executemany para todos os usuários válidos; o RETURNING traz
+            # só as linhas gravadas (ids e datas), sem reler os registros criados
+            comando = sqlite.insert(User).on_conflict_do_nothing().returning(User)
+            criados = db.session.execute(comando, [{
+                'nome_completo': itens[indice]['nome_completo'],
+                'email': email,
+                'telefone': itens[indice].get('telefone')
+            } for email, indice in novos.items()]).scalars()
+            for user in criados:
+                indice = novos.pop(user.email)
+                resultados[indice] = {"indice": indice, "status": 201, "usuario": user.to_dict()}
+            # Os que sobraram foram cadastrados por outra requisição depois da consulta acima
+            for indice in novos.values():
+                resultados[indice] = {"indice": indice, "status": 409, "message": "Este e-mail já está cadastrado."}
+        confirmar()
+        return resposta_lote(resultados, 'resultados')
 
     # Rota GET para buscar um usuário específico pelo e-mail
     @app.route('/usuarios/email/<string:email>', methods=['GET'])
     def get_user_by_email(email):
         """Retorna um usuário pelo e-mail.
 
-        Uso: GET /usuarios/email/{email}
+        Uso: GET /usuarios/email/{email}?fields=id,nome_completo
         Retorna 200 com o objeto `User` ou 404 se não existir.
+        Com `fields` a resposta traz só os campos pedidos (ver `campos.py`).
         """
 
-        user = User.query.filter_by(email=email).first() # Busca o usuário pelo email
-        if user:
+        try:
+            representacao = ler_representacao('usuario')
+        except ValueError as erro:
+            return jsonify({"message": str(erro)}), 400
+        if representacao.padrao:
+            entrada = cache.obter(chave_email(email))
+            if entrada is not None:
+                return resposta_do_cache(entrada)
+        geracao = cache.geracao()  # Antes da consulta (ver `cache.py`)
+
+        if tem_condicional():
+            # Requisição condicional: consulta só a versão, sem carregar o usuário
+            versao = db.session.execute(
+                select(User.id, User.versao, User.atualizado_em, User.data_cadastro).where(User.email == email)
+            ).first()
+            if versao is not None:
+                etag = etag_usuario(versao.id, versao.versao, versao.data_cadastro, representacao.variante)
+                modificado_em = versao.atualizado_em or versao.data_cadastro
+                if nao_modificado(etag, modificado_em):
+                    return resposta_nao_modificada(app.response_class, etag, modificado_em)
+
+        # Busca o usuário pelo email
+        consulta, de_linha = serializador_usuarios(representacao)
+        linha = executar(consulta(*VALIDADORES_USUARIO).where(User.email == email)).first()
+        if linha:
             # Retorna o usuário. Opcionalmente, poderíamos incluir os cachorros associados aqui.
-            return jsonify(user.to_dict()) 
+            response = responder_linha_usuario(linha, de_linha, representacao.variante)
+            if not representacao.padrao:
+                return response
+            return guardar_no_cache(chave_email(email), response, geracao, linha[-2] or linha[-1])
         return jsonify({"message": "Usuário não encontrado."}), 404
 
     # Rota POST para cadastrar um novo cachorro
     @app.route('/cachorros', methods=['POST'])
+    @grupo.escrita
     def create_cachorro():
         """Cadastra um novo cachorro associado a um usuário e a uma raça.
 
@@ -179,40 +674,168 @@ def create_app():
 
         data = request.get_json()  # Pega os dados JSON do cachorro
 
-        # Validação: verifica se os campos obrigatórios estão presentes
-        if not data or not all(key in data for key in ['nome_pet', 'user_id', 'raca_id']):
+        # Validação: campos obrigatórios presentes (nome em texto, ids inteiros) e opcionais simples
+        erro = validar_cadastro(data, 'cachorro', ['nome_pet'], ['user_id', 'raca_id'], CAMPOS_OPCIONAIS_CACHORRO)
+        if erro:
+            return jsonify({"message": erro}), 400
+
+        # Insere com um único comando: INSERT ... SELECT ... WHERE EXISTS(usuário) AND EXISTS(raça).
+        # Duplicidade (user_id, nome_pet) é detectada pela restrição `uix_user_pet` do banco.
+        valores = {
+            'nome_pet': data['nome_pet'],
+            'idade': data.get('idade'),
+            'peso': data.get('peso'),
+            'info_extra': data.get('info_extra'),
+            'user_id': data['user_id'], # Associa o cachorro ao usuário
+            'raca_id': data['raca_id'], # Associa o cachorro à raça
+            'data_registro': datetime.utcnow()
+        }
+        colunas = Cachorro.__table__.c
+        origem = select(*[literal(valor, colunas[nome].type) for nome, valor in valores.items()]) \
+            .where(*existe_usuario_e_raca(data['user_id'], data['raca_id']))
+        try:
+            new_cachorro = db.session.execute(
+                insert(Cachorro).from_select(list(valores), origem).returning(Cachorro)
+            ).scalar_one_or_none()
+        except IntegrityError as erro:
+            if violacao(erro) == 'unique':
+                # Retorna 409 Conflict com os dados existentes
+                return resposta_duplicado(data['user_id'], data['nome_pet'])
+            desfazer()
+            if violacao(erro) == 'foreign_key':
+                return motivo_404(data['user_id'], data['raca_id'])
             return jsonify({"message": "Dados incompletos para cadastro de cachorro."}), 400
 
-        # Verifica se o usuário e a raça (pelos IDs) existem no banco de dados
-        user = User.query.get(data['user_id']) # Busca o usuário pelo ID
-        raca = Raca.query.get(data['raca_id']) # Busca a raça pelo ID
+        if new_cachorro is None:
+            # Nenhuma linha inserida: o usuário ou a raça não existem
+            return motivo_404(data['user_id'], data['raca_id'])
+        response = responder_cachorro(new_cachorro, status=201) # Serializa antes do commit para não recarregar o objeto
+        confirmar()
+        return response
 
-        if not user:
-            return jsonify({"message": "Usuário não encontrado."}), 404
-        if not raca:
-            return jsonify({"message": "Raça não encontrada."}), 404
-
-        # Verifica duplicidade: mesmo user_id + nome_pet não deve existir
-        existing = Cachorro.query.filter_by(user_id=data['user_id'], nome_pet=data['nome_pet']).first()
-        if existing:
-            # Retorna 409 Conflict com os dados existentes
-            return jsonify({
-                'message': 'Cachorro já registrado para este usuário.',
-                'cachorro': existing.to_dict(include_breed=True)
-            }), 409
-
-        # Cria um novo objeto Cachorro
-        new_cachorro = Cachorro(
-            nome_pet=data['nome_pet'],
-            idade=data.get('idade'),
-            peso=data.get('peso'),
-            info_extra=data.get('info_extra'),
-            user_id=data['user_id'], # Associa o cachorro ao usuário
-            raca_id=data['raca_id'] # Associa o cachorro à raça
-        )
-        db.session.add(new_cachorro)
-        db.session.commit()
-        return jsonify(new_cachorro.to_dict(include_breed=True)), 201
+    def gravar_cachorros(validos, resultados):
+        """Verifica donos, raças e duplicados de um lote de cachorros já validado e grava os novos.
+
+        Preenche `resultados` (201, 404 ou 409) para cada item de `validos`.
+        """
+        # Usuários existentes: uma consulta por bloco de ids
+        usuarios_existentes = set()
+        for parte in em_partes({data['user_id'] for _, data in validos}):
+            usuarios_existentes.update(db.session.execute(select(User.id).where(User.id.in_(parte))).scalars())
+
+        # Raças: vêm do catálogo; só consulta o banco se alguma não estiver no snapshot
+        racas_existentes = set(catalogo.snapshot().racas)
+        faltando = {data['raca_id'] for _, data in validos} - racas_existentes
+        for parte in em_partes(faltando):
+            racas_existentes.update(db.session.execute(select(Raca.id).where(Raca.id.in_(parte))).scalars())
+
+        # Conflitos (user_id, nome_pet) já cadastrados: uma consulta por bloco de pares
+        pares = {(data['user_id'], data['nome_pet']) for _, data in validos}
+        existentes = {}
+        for filtro in filtros_por_dono(pares):
+            for cachorro in db.session.execute(select(Cachorro).where(filtro)).scalars():
+                existentes[(cachorro.user_id, cachorro.nome_pet)] = cachorro_com_raca(cachorro)
+
+        novos = {}        # (user_id, nome_pet) -> (índice, dados) do item que será criado
+        repetidos = []    # Itens que repetem um par já presente no próprio lote
+        for indice, data in validos:
+            par = (data['user_id'], data['nome_pet'])
+            if data['user_id'] not in usuarios_existentes:
+                resultados[indice] = {"indice": indice, "status": 404, "message": "Usuário não encontrado."}
+            elif data['raca_id'] not in racas_existentes:
+                resultados[indice] = {"indice": indice, "status": 404, "message": "Raça não encontrada."}
+            elif par in existentes:
+                resultados[indice] = {
+                    "indice": indice, "status": 409,
+                    "message": "Cachorro já registrado para este usuário.",
+                    "cachorro": existentes[par]
+                }
+            elif par in novos:
+                repetidos.append((indice, par))
+            else:
+                novos[par] = (indice, data)
+
+        if novos:
+            # Um único INSERT com executemany para todos os cachorros válidos; o RETURNING traz
+            # só as linhas gravadas (ids e datas), sem reler os registros criados
+            comando = sqlite.insert(Cachorro).on_conflict_do_nothing().returning(Cachorro)
+            criados = db.session.execute(comando, [{
+                'nome_pet': data['nome_pet'],
+                'idade': data.get('idade'),
+                'peso': data.get('peso'),
+                'info_extra': data.get('info_extra'),
+                'user_id': data['user_id'],
+                'raca_id': data['raca_id']
+            } for _, data in novos.values()]).scalars()
+            pulados = dict(novos)
+            for cachorro in criados:
+                indice = pulados.pop((cachorro.user_id, cachorro.nome_pet))[0]
+                resultados[indice] = {"indice": indice, "status": 201, "cachorro": cachorro_com_raca(cachorro)}
+            # Os que sobraram foram cadastrados por outra requisição depois da consulta de conflitos
+            for indice, _ in pulados.values():
+                resultados[indice] = {"indice": indice, "status": 409, "message": "Cachorro já registrado para este usuário."}
+            for filtro in filtros_por_dono(pulados):
+                for cachorro in db.session.execute(select(Cachorro).where(filtro)).scalars():
+                    indice = pulados[(cachorro.user_id, cachorro.nome_pet)][0]
+                    resultados[indice]['cachorro'] = cachorro_com_raca(cachorro)
+        # Repetições dentro do lote recebem 409 com os dados do cachorro criado pelo primeiro item
+        for indice, par in repetidos:
+            resultados[indice] = {
+                "indice": indice, "status": 409,
+                "message": "Cachorro já registrado para este usuário.",
+                "cachorro": resultados[novos[par][0]].get('cachorro')
+            }
+
+    # Rota POST para cadastrar vários cachorros de uma vez (importações de parceiros)
+    @app.route('/cachorros/batch', methods=['POST'])
+    @grupo.escrita
+    def create_cachorros_batch():
+        """Cadastra vários cachorros em uma única transação.
+
+        Payload esperado (JSON): uma lista de objetos no formato de `POST /cachorros`
+        (ou {"cachorros": [...]}), com no máximo TAMANHO_MAXIMO_LOTE itens.
+
+        A validação é feita por conjuntos: uma consulta para todos os `user_id`,
+        as raças vêm do catálogo em memória e uma consulta para todos os pares
+        (user_id, nome_pet) já cadastrados. Os cachorros válidos são gravados
+        com um único INSERT (executemany) e um único commit. Como em
+        `POST /usuarios/batch`, um par gravado por outra requisição entre a
+        consulta e o INSERT (`ON CONFLICT DO NOTHING`) vira um 409 do item.
+
+        Respostas:
+            201: todos os cachorros foram criados
+            207: parte dos itens falhou; cada resultado traz seu próprio status
+                 (201, 400, 404 usuário/raça não encontrados, 409 duplicado,
+                 incluindo o cachorro existente como em `POST /cachorros`)
+            400: corpo inválido, vazio ou grande demais
+        """
+
+        itens = ler_lote('cachorros')
+        if itens is None:
+            return jsonify({"message": "Envie uma lista de cachorros (máximo de %d itens)." % TAMANHO_MAXIMO_LOTE}), 400
+
+        resultados = [None] * len(itens)
+        validos = []
+        for indice, data in enumerate(itens):
+            # Mesmas verificações de `POST /cachorros`, antes de qualquer INSERT
+            erro = validar_cadastro(data, 'cachorro', ['nome_pet'], ['user_id', 'raca_id'], CAMPOS_OPCIONAIS_CACHORRO)
+            if erro:
+                resultados[indice] = {"indice": indice, "status": 400, "message": erro}
+                continue
+            # Normaliza os ids para que as comparações com o banco sejam feitas entre inteiros
+            validos.append((indice, dict(data, user_id=int(data['user_id']), raca_id=int(data['raca_id']))))
+
+        try:
+            gravar_cachorros(validos, resultados)
+        except IntegrityError as erro:
+            # Dono ou raça removidos por outra requisição entre as consultas e o INSERT:
+            # desfaz e refaz as verificações uma vez (os itens afetados recebem 404)
+            desfazer()
+            if violacao(erro) != 'foreign_key':
+                raise
+            gravar_cachorros(validos, resultados)
+        confirmar()
+        return resposta_lote(resultados, 'resultados')
 
     # Rota GET para buscar todos os cachorros de um usuário específico
     # O ID do usuário é passado como parte da URL (ex: /usuarios/1/cachorros)
@@ -220,39 +843,141 @@ def create_app():
     def get_cachorros_by_user(user_id):
         """Retorna todos os cachorros pertencentes a um usuário.
 
-        Uso: GET /usuarios/{user_id}/cachorros
+        Uso: GET /usuarios/{user_id}/cachorros?fields=id,nome_pet,breed.nome&embed=ref
         Responde 200 com uma lista de `CachorroWithBreed` ou 404 se o usuário não existir.
+        Parâmetros opcionais (query string; ver `campos.py`):
+            fields: campos de cada cachorro (`breed` ou `breed.<campo>` para a raça);
+            embed:  'breed' (padrão, a raça em cada cachorro) ou 'ref' (responde
+                    {"cachorros": [...], "breeds": {"<raca_id>": raça}}, cada raça uma vez).
         """
 
-        user = User.query.get(user_id)
-        if not user:
+        try:
+            representacao = ler_representacao('cachorro', permite_ref=True)
+        except ValueError as erro:
+            return jsonify({"message": str(erro)}), 400
+        if representacao.padrao:
+            # O ETag da lista termina com o do catálogo: uma raça alterada invalida a entrada
+            sufixo_catalogo = '.' + catalogo.snapshot().etag
+            entrada = cache.obter(chave_cachorros(user_id), lambda entrada: entrada.etag.endswith(sufixo_catalogo))
+            if entrada is not None:
+                return resposta_do_cache(entrada)
+        geracao = cache.geracao()  # Antes da consulta (ver `cache.py`)
+
+        if tem_condicional():
+            # Requisição condicional: uma única consulta agregada (sem carregar os cachorros)
+            # confirma que o usuário existe e calcula o resumo de versões da lista.
+            resumo = db.session.execute(select(
+                exists().where(User.id == user_id),
+                func.count(Cachorro.id), func.sum(Cachorro.id),
+                func.sum(Cachorro.id * Cachorro.id), func.sum(Cachorro.versao),
+                func.max(type_coerce(Cachorro.data_registro, String))
+            ).where(Cachorro.user_id == user_id)).one()
+            if resumo[0]:
+                etag = etag_lista_cachorros(user_id, resumo[1:], representacao.variante)
+                if nao_modificado(etag):
+                    return resposta_nao_modificada(app.response_class, etag)
+
+        if executar(select(User.id).where(User.id == user_id)).first() is None:
             return jsonify({"message": "Usuário não encontrado."}), 404
         
         # Busca todos os cachorros associados a este user_id
-        cachorros = Cachorro.query.filter_by(user_id=user_id).all()
+        racas = {}
+        consulta, de_linha = serializador_cachorros(representacao, racas)
+        linhas = executar(consulta(Cachorro.id, Cachorro.versao, type_coerce(Cachorro.data_registro, String))
+                          .where(Cachorro.user_id == user_id)).all()
         # Retorna a lista de cachorros, incluindo os dados da raça para cada um
-        return jsonify([c.to_dict(include_breed=True) for c in cachorros])
+        # (a raça vem do catálogo, então são sempre 2 consultas, independente da quantidade)
+        cachorros = [de_linha(linha) for linha in linhas]
+        if representacao.embed == 'ref':
+            cachorros = {'cachorros': cachorros, 'breeds': representacao.mapa_racas(racas)}
+        versoes = [tuple(linha[-3:]) for linha in linhas]
+        etag = etag_lista_cachorros(user_id, resumo_cachorros(versoes), representacao.variante)
+        response = aplicar_validadores(jsonify(cachorros), etag)
+        if not representacao.padrao:
+            return response
+        return guardar_no_cache(chave_cachorros(user_id), response, geracao)
+
+    # Rota GET de sincronização incremental (só o que mudou desde o último cursor)
+    @app.route('/usuarios/<int:user_id>/cachorros/changes', methods=['GET'])
+    def get_cachorros_changes(user_id):
+        """Retorna os cachorros de um usuário criados, alterados ou removidos desde um cursor.
+
+        Uso: GET /usuarios/{user_id}/cachorros/changes?since={cursor}
+        Parâmetros opcionais (query string):
+            since: o `cursor` da resposta anterior (sem ele, vem a lista completa);
+            limit: alterações por resposta (1 a 1000, padrão 500);
+            fields, embed: como em GET /usuarios/{user_id}/cachorros (com 'ref', o
+                    mapa `breeds` traz as raças dos cachorros desta resposta).
+
+        Responde 200 com `cachorros` (`CachorroWithBreed`), `removidos` (ids dos
+        cachorros excluídos ou transferidos para outro dono), `cursor`, `completo`
+        (a lista é inteira: substitua a cópia local) e `mais` (há mais alterações;
+        consulte de novo com o novo cursor), ou 404 se o usuário não existir.
+        O custo depende do número de alterações (ver `sincronizacao.py`).
+        Nota: esta rota tem prioridade sobre um cachorro chamado "changes" na rota por nome.
+        """
+
+        try:
+            since = parametro_inteiro('since', minimo=0)
+            limit = parametro_inteiro('limit', minimo=1, maximo=ALTERACOES_POR_RESPOSTA_MAXIMO)
+        except ValueError:
+            return jsonify({"message": "Parâmetros inválidos (since: cursor recebido; limit: 1 a 1000)."}), 400
+        try:
+            representacao = ler_representacao('cachorro', permite_ref=True)
+        except ValueError as erro:
+            return jsonify({"message": str(erro)}), 400
+
+        # A raça vem do catálogo, como na lista completa
+        racas = {}
+        consulta, de_linha = serializador_cachorros(representacao, racas)
+        alteracoes = consultar_alteracoes(db.session.connection(), user_id, since, limit or ALTERACOES_POR_RESPOSTA,
+                                          consulta, de_linha)
+        if alteracoes is None:
+            return jsonify({"message": "Usuário não encontrado."}), 404
+        if representacao.embed == 'ref':
+            alteracoes['breeds'] = representacao.mapa_racas(racas)
+        return jsonify(alteracoes)
 
     # Rota GET para buscar um cachorro específico de um usuário pelo nome do pet
     @app.route('/usuarios/<int:user_id>/cachorros/<string:nome_pet>', methods=['GET'])
     def get_cachorro_by_user_and_name(user_id, nome_pet):
         """Busca um cachorro específico de um usuário pelo nome do pet.
 
-        Uso: GET /usuarios/{user_id}/cachorros/{nome_pet}
+        Uso: GET /usuarios/{user_id}/cachorros/{nome_pet}?fields=id,nome_pet,breed.nome
         Nota: o `nome_pet` deve ser exatamente igual ao cadastrado (case-sensitive).
+        Com `fields` a resposta traz só os campos pedidos (ver `campos.py`).
         """
 
-        user = User.query.get(user_id)
-        if not user:
+        try:
+            representacao = ler_representacao('cachorro')
+        except ValueError as erro:
+            return jsonify({"message": str(erro)}), 400
+
+        if tem_condicional():
+            # Requisição condicional: consulta só a versão do cachorro
+            versao = db.session.execute(
+                select(Cachorro.id, Cachorro.versao, Cachorro.atualizado_em, Cachorro.data_registro)
+                .where(Cachorro.user_id == user_id, Cachorro.nome_pet == nome_pet)
+            ).first()
+            if versao is not None:
+                etag = etag_cachorro(versao.id, versao.versao, versao.data_registro, representacao.variante)
+                modificado_em = versao.atualizado_em or versao.data_registro
+                if nao_modificado(etag, modificado_em):
+                    return resposta_nao_modificada(app.response_class, etag, modificado_em)
+
+        if executar(select(User.id).where(User.id == user_id)).first() is None:
             return jsonify({"message": "Usuário não encontrado."}), 404
         # Procura pelo nome exato (não formatamos aqui, assumimos nome_pet enviado corretamente)
-        cachorro = Cachorro.query.filter_by(user_id=user_id, nome_pet=nome_pet).first()
-        if cachorro:
-            return jsonify(cachorro.to_dict(include_breed=True))
+        consulta, de_linha = serializador_cachorros(representacao)
+        linha = executar(consulta(*VALIDADORES_CACHORRO)
+                         .where(Cachorro.user_id == user_id, Cachorro.nome_pet == nome_pet)).first()
+        if linha:
+            return responder_linha_cachorro(linha, de_linha, representacao.variante)
         return jsonify({"message": "Cachorro não encontrado."}), 404
 
     # Rota DELETE para remover um cachorro (exemplo de exclusão)
     @app.route('/cachorros/<int:cachorro_id>', methods=['DELETE'])
+    @grupo.escrita
     def delete_cachorro(cachorro_id):
         """Exclui um cachorro pelo seu ID.
 
@@ -265,7 +990,7 @@ def create_app():
             return jsonify({"message": "Cachorro não encontrado."}), 404
         
         db.session.delete(cachorro) # Remove o cachorro da sessão
-        db.session.commit() # Salva a exclusão
+        confirmar() # Salva a exclusão
         return jsonify({"message": "Cachorro removido com sucesso."}), 200 # 200 (OK)
 
     # Rota GET para buscar um cachorro por ID
@@ -273,16 +998,36 @@ def create_app():
     def get_cachorro_by_id(cachorro_id):
         """Retorna um cachorro por ID incluindo os dados da raça.
 
-        Uso: GET /cachorros/{cachorro_id}
+        Uso: GET /cachorros/{cachorro_id}?fields=id,nome_pet,breed.nome
+        Com `fields` a resposta traz só os campos pedidos (ver `campos.py`).
         """
 
-        cachorro = Cachorro.query.get(cachorro_id)
-        if not cachorro:
+        try:
+            representacao = ler_representacao('cachorro')
+        except ValueError as erro:
+            return jsonify({"message": str(erro)}), 400
+
+        if tem_condicional():
+            # Requisição condicional: consulta só a versão do cachorro
+            versao = db.session.execute(
+                select(Cachorro.versao, Cachorro.atualizado_em, Cachorro.data_registro)
+                .where(Cachorro.id == cachorro_id)
+            ).first()
+            if versao is not None:
+                etag = etag_cachorro(cachorro_id, versao.versao, versao.data_registro, representacao.variante)
+                modificado_em = versao.atualizado_em or versao.data_registro
+                if nao_modificado(etag, modificado_em):
+                    return resposta_nao_modificada(app.response_class, etag, modificado_em)
+
+        consulta, de_linha = serializador_cachorros(representacao)
+        linha = executar(consulta(*VALIDADORES_CACHORRO).where(Cachorro.id == cachorro_id)).first()
+        if not linha:
             return jsonify({"message": "Cachorro não encontrado."}), 404
-        return jsonify(cachorro.to_dict(include_breed=True))
+        return responder_linha_cachorro(linha, de_linha, representacao.variante)
 
     # Rota PUT para atualizar um cachorro por ID
     @app.route('/cachorros/<int:cachorro_id>', methods=['PUT'])
+    @grupo.escrita
     def update_cachorro(cachorro_id):
         """Atualiza os campos de um cachorro existente.
 
@@ -296,45 +1041,100 @@ def create_app():
                 "user_id": 2
             }
 
-        Verificamos a existência da `raca_id` e `user_id` caso sejam fornecidos.
+        Verificamos a existência da `raca_id` e `user_id` caso sejam fornecidos
+        (404) e a duplicidade de nome para o usuário de destino (409).
+
+        Com o cabeçalho `If-Match` (ETag obtido num GET), a alteração só é aplicada
+        se o cachorro ainda estiver naquela versão; caso contrário responde 412.
         """
 
-        cachorro = Cachorro.query.get(cachorro_id)
-        if not cachorro:
-            return jsonify({"message": "Cachorro não encontrado."}), 404
-        data = request.get_json()
-        # Atualiza campos se fornecidos
-        cachorro.nome_pet = data.get('nome_pet', cachorro.nome_pet)
-        cachorro.idade = data.get('idade', cachorro.idade)
-        cachorro.peso = data.get('peso', cachorro.peso)
-        cachorro.info_extra = data.get('info_extra', cachorro.info_extra)
-        # Se estiver alterando a raça ou user_id, verificar existência
-        if 'raca_id' in data:
-            if not Raca.query.get(data['raca_id']):
-                return jsonify({"message": "Raça não encontrada."}), 404
-            cachorro.raca_id = data['raca_id']
-        if 'user_id' in data:
-            if not User.query.get(data['user_id']):
-                return jsonify({"message": "Usuário não encontrado."}), 404
-            cachorro.user_id = data['user_id']
-        db.session.commit()
-        return jsonify(cachorro.to_dict(include_breed=True))
+        versoes = versoes_if_match('c', cachorro_id)
+        if versoes == set():
+            return resposta_precondicao()
+        data = request.get_json(silent=True) or {}
+        campos = ['nome_pet', 'idade', 'peso', 'info_extra', 'raca_id', 'user_id']
+        valores = {campo: data[campo] for campo in campos if campo in data}
+        if not valores:
+            # Nada para alterar: apenas retorna o cachorro atual
+            cachorro = db.session.get(Cachorro, cachorro_id)
+            if not cachorro:
+                return jsonify({"message": "Cachorro não encontrado."}), 404
+            return responder_cachorro(cachorro)
+
+        # Atualiza com um único comando (UPDATE ... WHERE EXISTS ... RETURNING). A existência
+        # da `raca_id` e do `user_id` informados é verificada pelo banco no mesmo comando.
+        # `versao` e `atualizado_em` são atualizadas automaticamente (onupdate do modelo).
+        comando = update(Cachorro).where(Cachorro.id == cachorro_id) \
+            .where(*existe_usuario_e_raca(valores.get('user_id'), valores.get('raca_id'))) \
+            .values(**valores).returning(Cachorro)
+        if isinstance(versoes, set):
+            comando = comando.where(tuple_(Cachorro.versao, Cachorro.data_registro).in_(versoes))
+        try:
+            cachorro = db.session.execute(comando).scalar_one_or_none()
+        except IntegrityError as erro:
+            if violacao(erro) == 'unique':
+                # Já existe outro cachorro com esse nome para o usuário de destino
+                atual = db.session.get(Cachorro, cachorro_id)
+                return resposta_duplicado(valores.get('user_id', atual.user_id), valores.get('nome_pet', atual.nome_pet))
+            desfazer()
+            if violacao(erro) == 'foreign_key':
+                return motivo_404(valores.get('user_id'), valores.get('raca_id'))
+            return jsonify({"message": "Dados inválidos para atualização do cachorro."}), 400
+
+        if cachorro is None:
+            # Nenhuma linha alterada: descobre qual registro não existe ou se a versão mudou
+            atual = db.session.get(Cachorro, cachorro_id)
+            if atual is None:
+                return jsonify({"message": "Cachorro não encontrado."}), 404
+            if isinstance(versoes, set) and (atual.versao, atual.data_registro) not in versoes:
+                return resposta_precondicao()
+            return motivo_404(valores.get('user_id'), valores.get('raca_id'))
+        response = responder_cachorro(cachorro) # Serializa antes do commit para não recarregar o objeto
+        confirmar()
+        return response
 
     # Rota GET para buscar um usuário por ID
     @app.route('/usuarios/<int:user_id>', methods=['GET'])
     def get_user_by_id(user_id):
         """Retorna um usuário pelo ID.
 
-        Uso: GET /usuarios/{user_id}
+        Uso: GET /usuarios/{user_id}?fields=id,nome_completo
+        Com `fields` a resposta traz só os campos pedidos (ver `campos.py`).
         """
 
-        user = User.query.get(user_id)
-        if not user:
+        try:
+            representacao = ler_representacao('usuario')
+        except ValueError as erro:
+            return jsonify({"message": str(erro)}), 400
+        if representacao.padrao:
+            entrada = cache.obter(chave_usuario(user_id))
+            if entrada is not None:
+                return resposta_do_cache(entrada)
+        geracao = cache.geracao()  # Antes da consulta (ver `cache.py`)
+
+        if tem_condicional():
+            # Requisição condicional: consulta só a versão do usuário
+            versao = db.session.execute(
+                select(User.versao, User.atualizado_em, User.data_cadastro).where(User.id == user_id)
+            ).first()
+            if versao is not None:
+                etag = etag_usuario(user_id, versao.versao, versao.data_cadastro, representacao.variante)
+                modificado_em = versao.atualizado_em or versao.data_cadastro
+                if nao_modificado(etag, modificado_em):
+                    return resposta_nao_modificada(app.response_class, etag, modificado_em)
+
+        consulta, de_linha = serializador_usuarios(representacao)
+        linha = executar(consulta(*VALIDADORES_USUARIO).where(User.id == user_id)).first()
+        if not linha:
             return jsonify({"message": "Usuário não encontrado."}), 404
-        return jsonify(user.to_dict())
+        response = responder_linha_usuario(linha, de_linha, representacao.variante)
+        if not representacao.padrao:
+            return response
+        return guardar_no_cache(chave_usuario(user_id), response, geracao, linha[-2] or linha[-1])
 
     # Rota DELETE para remover um usuário
     @app.route('/usuarios/<int:user_id>', methods=['DELETE'])
+    @grupo.escrita
     def delete_user(user_id):
         """Remove um usuário e todos os cachorros associados (cascade).
 
@@ -346,52 +1146,269 @@ def create_app():
             return jsonify({"message": "Usuário não encontrado."}), 404
         # Remove usuário e seus cachorros via cascade
         db.session.delete(user)
-        db.session.commit()
+        confirmar()
         return jsonify({"message": "Usuário removido com sucesso."}), 200
 
     # Rota PUT para atualizar um usuário por ID
     @app.route('/usuarios/<int:user_id>', methods=['PUT'])
+    @grupo.escrita
     def update_user(user_id):
         """Atualiza os dados de um usuário.
 
         Payload aceito (parcial):
             { "nome_completo": "Novo nome", "email": "novo@example.com", "telefone": "..." }
+
+        Respostas: 200, 404 (usuário não encontrado), 409 (e-mail já cadastrado),
+        412 (o ETag enviado em `If-Match` não é mais a versão atual).
         """
 
-        user = User.query.get(user_id)
-        if not user:
+        versoes = versoes_if_match('u', user_id)
+        if versoes == set():
+            return resposta_precondicao()
+        data = request.get_json(silent=True) or {}
+        valores = {campo: data[campo] for campo in ['nome_completo', 'email', 'telefone'] if campo in data}
+        if not valores:
+            user = db.session.get(User, user_id)
+            if not user:
+                return jsonify({"message": "Usuário não encontrado."}), 404
+            return responder_usuario(user)
+
+        # Atualiza com um único comando; e-mail repetido é detectado pela restrição UNIQUE
+        comando = update(User).where(User.id == user_id).values(**valores).returning(User)
+        if isinstance(versoes, set):
+            comando = comando.where(tuple_(User.versao, User.data_cadastro).in_(versoes))
+        try:
+            user = db.session.execute(comando).scalar_one_or_none()
+        except IntegrityError as erro:
+            desfazer()
+            if violacao(erro) == 'unique':
+                return jsonify({"message": "Este e-mail já está cadastrado."}), 409
+            return jsonify({"message": "Dados inválidos para atualização do usuário."}), 400
+        if user is None:
+            if isinstance(versoes, set) and db.session.get(User, user_id) is not None:
+                return resposta_precondicao()
             return jsonify({"message": "Usuário não encontrado."}), 404
-        data = request.get_json() or {}
-        user.nome_completo = data.get('nome_completo', user.nome_completo)
-        user.email = data.get('email', user.email)
-        user.telefone = data.get('telefone', user.telefone)
-        db.session.commit()
-        return jsonify(user.to_dict())
+        response = responder_usuario(user) # Serializa antes do commit para não recarregar o objeto
+        confirmar()
+        return response
+
+    # Rota GET com as estatísticas dos cachorros (relatórios)
+    @app.route('/estatisticas', methods=['GET'])
+    def get_estatisticas():
+        """Estatísticas dos cachorros por raça e por porte e os usuários com mais cachorros.
+
+        Uso: GET /estatisticas?top=10
+
+        Lê as tabelas de resumo mantidas pelos gatilhos de `estatisticas.py`:
+        o custo depende do número de raças, não do número de cachorros.
+        Peso e idade trazem quantidade (preenchidos), média e desvio padrão.
+        """
+        try:
+            top = parametro_inteiro('top', minimo=1, maximo=100) or 10
+        except ValueError:
+            return jsonify({"message": "Parâmetro 'top' inválido (use de 1 a 100)."}), 400
+        return jsonify(consultar_estatisticas(db.session.connection(), top))
+
+    def resposta_exportacao(recurso, inclusoes_validas=()):
+        """Valida os parâmetros de `/export/<recurso>` e transmite o arquivo em partes."""
+        formato = request.args.get('format', 'ndjson')
+        if formato not in MIMETYPES_EXPORTACAO:
+            return jsonify({"message": "Formato inválido (use 'ndjson' ou 'csv')."}), 400
+        include = tuple(parte for parte in request.args.get('include', '').split(',') if parte)
+        if any(parte not in inclusoes_validas for parte in include):
+            return jsonify({"message": "Parâmetro 'include' inválido."}), 400
+        try:
+            filtros = {
+                'id_min': parametro_inteiro('id_min', minimo=0),
+                'id_max': parametro_inteiro('id_max', minimo=0),
+                'since': ler_data(request.args['since']) if 'since' in request.args else None,
+                'until': ler_data(request.args['until']) if 'until' in request.args else None,
+            }
+        except ValueError:
+            return jsonify({"message": "Filtros inválidos (id_min/id_max inteiros, since/until em ISO 8601)."}), 400
+
+        # A consulta só é executada quando o streaming começa (dentro do contexto do stream)
+        partes = exportar(recurso, formato, include, app.json.dumps, **filtros)
+        response = app.response_class(stream_with_context(partes), mimetype=MIMETYPES_EXPORTACAO[formato])
+        response.headers['Content-Disposition'] = f'attachment; filename={recurso}.{formato}'
+        return response
+
+    # Rotas GET de exportação (NDJSON ou CSV, com memória constante)
+    @app.route('/export/usuarios', methods=['GET'])
+    def export_usuarios():
+        """Exporta os usuários em ordem de id.
+
+        Uso: GET /export/usuarios?format=csv&since=2025-11-01
+        Parâmetros opcionais (query string):
+            format:         'ndjson' (padrão) ou 'csv';
+            id_min/id_max:  faixa de ids (inclusiva);
+            since/until:    faixa de `data_cadastro` em ISO 8601 (since inclusivo, until exclusivo).
+
+        O cursor do banco é lido em blocos (`export.py`): a memória não cresce com o número de usuários.
+        """
+        return resposta_exportacao('usuarios')
+
+    @app.route('/export/cachorros', methods=['GET'])
+    def export_cachorros():
+        """Exporta os cachorros em ordem de id, opcionalmente com o dono e a raça.
+
+        Uso: GET /export/cachorros?format=csv&include=owner,breed&id_min=1001
+        Parâmetros opcionais (query string):
+            format:         'ndjson' (padrão) ou 'csv';
+            include:        'owner', 'breed' ou 'owner,breed' (no CSV: colunas owner_* e breed_*);
+            id_min/id_max:  faixa de ids (inclusiva);
+            since/until:    faixa de `data_registro` em ISO 8601 (since inclusivo, until exclusivo).
+        """
+        return resposta_exportacao('cachorros', INCLUSOES)
+
+    # Rejeições listadas na resposta das importações (o total vem no resumo)
+    REJEICOES_NA_RESPOSTA = 100
+
+    def resposta_importacao(recurso):
+        """Lê o corpo de `/import/<recurso>` como um fluxo e importa em lotes (ver `importacao.py`)."""
+        formato = request.args.get('format') or ('csv' if request.mimetype == 'text/csv' else 'ndjson')
+        if formato not in MIMETYPES_EXPORTACAO:
+            return jsonify({"message": "Formato inválido (use 'ndjson' ou 'csv')."}), 400
+        try:
+            lote = parametro_inteiro('lote', minimo=1, maximo=REGISTROS_POR_LOTE_MAXIMO) or REGISTROS_POR_LOTE
+            inicio = parametro_inteiro('inicio', minimo=0) or 0
+        except ValueError:
+            return jsonify({"message": "Parâmetros inválidos (lote de 1 a %d, inicio >= 0)."
+                            % REGISTROS_POR_LOTE_MAXIMO}), 400
+
+        rejeicoes = []
+        resumo = {'registros': inicio}
+
+        def rejeitar(numero, motivo, registro):
+            if len(rejeicoes) < REJEICOES_NA_RESPOSTA:
+                rejeicoes.append({"registro": numero, "motivo": motivo, "message": MOTIVOS[motivo]})
+
+        # O corpo é lido aos poucos (não é carregado inteiro na memória)
+        entrada = abrir_corpo(request.stream)
+        try:
+            resumo = importar(recurso, entrada, formato, lote, inicio, resumo.update, rejeitar)
+        except UnicodeDecodeError:
+            return jsonify({"message": "O corpo deve estar em UTF-8.", **resumo, "rejeicoes": rejeicoes}), 400
+        except Exception:
+            app.logger.exception('Falha na importação de %s', recurso)
+            # `registros` é o checkpoint: reenviar com ?inicio=<registros> retoma do lote que falhou
+            return jsonify({"message": "Falha na importação; os lotes anteriores foram gravados.",
+                            **resumo, "rejeicoes": rejeicoes}), 500
+        return jsonify({**resumo, "rejeicoes": rejeicoes})
+
+    # Rotas POST de importação em massa (NDJSON ou CSV, com memória constante)
+    @app.route('/import/usuarios', methods=['POST'])
+    def import_usuarios():
+        """Importa usuários de um corpo NDJSON ou CSV, com deduplicação por e-mail.
+
+        Uso: POST /import/usuarios?format=csv&lote=1000&inicio=0 (corpo: o arquivo)
+        Parâmetros opcionais (query string):
+            format: 'ndjson' ou 'csv' (padrão: pelo Content-Type; text/csv é CSV);
+            lote:   registros por transação (padrão 1000);
+            inicio: registros a pular, para retomar uma importação (checkpoint).
+
+        Cada lote é gravado na sua própria transação. A resposta traz o resumo
+        (`registros` lidos, `inseridos`, `duplicados`, `rejeitados`) e as
+        primeiras rejeições. Não passa pelo commit em grupo: a rota faz os
+        seus próprios commits, um por lote.
+        """
+        return resposta_importacao('usuarios')
+
+    @app.route('/import/cachorros', methods=['POST'])
+    def import_cachorros():
+        """Importa cachorros de um corpo NDJSON ou CSV, com deduplicação por (user_id, nome_pet).
+
+        Uso: POST /import/cachorros?format=ndjson (corpo: o arquivo)
+        O dono é resolvido por `owner_email` (ou `user_id`) e a raça por nome/slug
+        em `raca` (ou `raca_id`). Parâmetros e resposta como em `POST /import/usuarios`.
+        """
+        return resposta_importacao('cachorros')
 
     # Rota GET para buscar todos os usuários (útil para debug ou admin, mas não essencial no frontend MVP)
     @app.route('/usuarios', methods=['GET'])
     def get_all_users():
-        """Retorna todos os usuários cadastrados (útil para administração).
+        """Retorna os usuários cadastrados (útil para administração).
 
         Uso: GET /usuarios
+        Parâmetros opcionais (query string):
+            limit:  tamanho da página (1 a 1000);
+            after:  cursor da página (id do último usuário recebido);
+            stream: 'json' ou 'ndjson' para transmitir os usuários em partes,
+                    com memória constante (exportações administrativas);
+            fields: campos de cada usuário (ver `campos.py`).
+
+        A paginação é por "keyset" no `id` (WHERE id > after ORDER BY id), então
+        o custo de cada página não cresce com a posição. Quando existe uma próxima
+        página, ela é indicada nos cabeçalhos `Link` (rel="next") e `X-Next-Cursor`.
+        Sem parâmetros, retorna todos os usuários (comportamento original).
         """
 
-        users = User.query.all()
-        return jsonify([user.to_dict() for user in users])
+        try:
+            limit = parametro_inteiro('limit', minimo=1, maximo=1000)
+            after = parametro_inteiro('after', minimo=0)
+        except ValueError:
+            return jsonify({"message": "Parâmetros de paginação inválidos."}), 400
+        try:
+            consulta_campos, de_linha = serializador_usuarios(ler_representacao('usuario'))
+        except ValueError as erro:
+            return jsonify({"message": str(erro)}), 400
+
+        # O id vem no fim da linha para o cursor (com `fields=` pode não estar entre os campos)
+        consulta = consulta_campos(User.id).order_by(User.id)
+        if after is not None:
+            consulta = consulta.where(User.id > after)
+
+        # Modo streaming: lê o cursor do banco em blocos (`yield_per`) e envia o JSON aos poucos
+        formato = request.args.get('stream')
+        if formato:
+            if formato not in MIMETYPES:
+                return jsonify({"message": "Formato de stream inválido (use 'json' ou 'ndjson')."}), 400
+            if limit is not None:
+                consulta = consulta.limit(limit)
+
+            def usuarios():
+                # A consulta só é executada quando o streaming começa (dentro do contexto do stream)
+                for linha in executar(consulta, yield_per=ITENS_POR_PARTE):
+                    yield de_linha(linha)
+
+            return resposta_em_partes(usuarios(), app.json.dumps, formato)
+
+        if limit is None and after is None:
+            return jsonify([de_linha(linha) for linha in executar(consulta_campos())])
+
+        limit = limit or 100
+        # Busca um registro a mais só para saber se existe uma próxima página
+        linhas = executar(consulta.limit(limit + 1)).all()
+        tem_proxima = len(linhas) > limit
+        users = [de_linha(linha) for linha in linhas[:limit]]
+        response = jsonify(users)
+        if tem_proxima:
+            cursor = linhas[limit - 1][-1]
+            response.headers['X-Next-Cursor'] = str(cursor)
+            # A próxima página mantém os campos pedidos
+            campos = {'fields': request.args['fields']} if 'fields' in request.args else {}
+            response.headers['Link'] = f'<{url_for("get_all_users", limit=limit, after=cursor, **campos)}>; rel="next"'
+        return response
 
     # --- Servir Frontend estático (catch-all) ---
-    # Define o diretório do frontend (pasta `frontend` no nível do projeto)
-    frontend_dir = os.path.abspath(os.path.join(basedir, '..', 'frontend'))
+    # Define o diretório do frontend (pasta `frontend` no nível do projeto, ou FRONTEND_DIR)
+    frontend_dir = app.config.get('FRONTEND_DIR') or os.path.abspath(os.path.join(basedir, '..', 'frontend'))
+    # O diretório é lido uma única vez para um manifesto em memória (ver `static_manifest.py`).
+    # FRONTEND_RECARREGAR: segundos entre verificações de arquivos alterados (útil em desenvolvimento).
+    manifesto = ManifestoFrontend(frontend_dir,
+                                  intervalo_verificacao=app.config.get('FRONTEND_RECARREGAR',
+                                                                       1.0 if app.debug else None))
+    app.extensions['manifesto_frontend'] = manifesto
 
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
     def serve_frontend(path):
-        # Se o arquivo pedido existir na pasta frontend (ex: CSS/JS/imagens), retorna ele
-        target = os.path.join(frontend_dir, path)
-        if path and os.path.exists(target):
-            return send_from_directory(frontend_dir, path)
-        # Caso contrário, retorna o index.html (SPA)
-        return send_from_directory(frontend_dir, 'index.html')
+        # Arquivos do frontend (CSS/JS/imagens) saem do manifesto; qualquer outro
+        # caminho recebe o index.html (SPA), servido da memória.
+        response = manifesto.responder(path, app.response_class)
+        if response is None:
+            return jsonify({'error': 'Frontend não encontrado'}), 404
+        return response
 
     return app # Retorna a instância do aplicativo Flask configurada
 
@@ -0,0 +1,146 @@
+# backend/bench_grupo_commit.py
+"""
+Benchmark do commit em grupo (`group_commit.py`) com cadastros simultâneos.
+
+Para cada perfil SQLite ('padrao' e 'producao', ver `sqlite_config.py`) e
+com o commit em grupo desligado e ligado, o script cria um banco temporário
+e dispara `--clientes` threads que, durante alguns segundos, repetem o fluxo
+de cadastro do frontend pelas rotas da API (test_client do Flask):
+`POST /usuarios` e em seguida `POST /cachorros` para o usuário criado.
+Uma fração dos cachorros (`--duplicados`) repete o nome do anterior do
+mesmo usuário, para exercitar o 409 de `uix_user_pet`.
+
+Ao final mostra, por combinação, as escritas/s, a latência p50/p99, os
+409 recebidos e a conferência com o banco (linhas gravadas = respostas 201).
+
+Uso:
+    python bench_grupo_commit.py
+    python bench_grupo_commit.py --clientes 32 --duracao 10 --perfis padrao --json
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from sqlalchemy import func, insert, select
+from app import create_app
+from bench_sqlite import percentil
+from database import db, User, Raca, Cachorro
+
+
+def executar_caso(perfil, grupo, args):
+    diretorio = tempfile.mkdtemp(prefix='bench_grupo_')
+    try:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(diretorio, 'bench.db')}",
+            'SQLITE_PERFIL': perfil,
+            'GRUPO_COMMIT': grupo,
+            'GRUPO_COMMIT_JANELA_MS': args.janela_ms,
+            'METRICAS_ATIVAS': False,
+        })
+        with app.app_context():
+            db.create_all()
+            db.session.execute(insert(Raca), [{'nome': f'Raça {i}'} for i in range(10)])
+            db.session.commit()
+
+        fim = time.perf_counter() + args.duracao
+        lock = threading.Lock()
+        contagem = {201: 0, 409: 0, 'outros': 0, 'duplicados_enviados': 0}
+        criados = {'usuarios': 0, 'cachorros': 0}
+        latencias = []
+
+        def cliente(numero):
+            rng = random.Random(numero)
+            http = app.test_client()
+            locais, status, enviados = [], [], 0
+            usuarios = cachorros = 0
+            contador = 0
+            while time.perf_counter() < fim:
+                contador += 1
+                inicio = time.perf_counter()
+                resposta = http.post('/usuarios', json={
+                    'nome_completo': f'Cliente {numero}', 'email': f'c{numero}-{contador}@bench.local'})
+                locais.append(time.perf_counter() - inicio)
+                status.append(resposta.status_code)
+                if resposta.status_code != 201:
+                    continue
+                usuarios += 1
+                user_id = resposta.get_json()['id']
+                nomes = ['Rex']
+                if rng.random() < args.duplicados:
+                    nomes.append('Rex')  # Mesmo nome para o mesmo usuário: deve responder 409
+                    enviados += 1
+                for nome in nomes:
+                    inicio = time.perf_counter()
+                    resposta = http.post('/cachorros', json={
+                        'nome_pet': nome, 'user_id': user_id, 'raca_id': rng.randint(1, 10)})
+                    locais.append(time.perf_counter() - inicio)
+                    status.append(resposta.status_code)
+                    cachorros += resposta.status_code == 201
+            with lock:
+                latencias.extend(locais)
+                for codigo in status:
+                    contagem[codigo if codigo in (201, 409) else 'outros'] += 1
+                contagem['duplicados_enviados'] += enviados
+                criados['usuarios'] += usuarios
+                criados['cachorros'] += cachorros
+
+        threads = [threading.Thread(target=cliente, args=(i,)) for i in range(args.clientes)]
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duracao = time.perf_counter() - inicio
+
+        with app.app_context():
+            no_banco = (db.session.execute(select(func.count(User.id))).scalar(),
+                        db.session.execute(select(func.count(Cachorro.id))).scalar())
+            db.engine.dispose()
+        extensao = app.extensions['grupo_commit']
+        return {
+            'perfil': perfil,
+            'grupo_commit': grupo,
+            'escritas_por_s': round(len(latencias) / duracao, 1),
+            'p50_ms': round(percentil(latencias, 50) * 1000, 2),
+            'p99_ms': round(percentil(latencias, 99) * 1000, 2),
+            'conflitos_409': contagem[409],
+            'duplicados_enviados': contagem['duplicados_enviados'],
+            'erros': contagem['outros'],
+            'ops_por_transacao': round(extensao.operacoes / extensao.lotes, 1) if extensao.lotes else 1.0,
+            'confere': no_banco == (criados['usuarios'], criados['cachorros'])
+                       and contagem[409] == contagem['duplicados_enviados'],
+        }
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara cadastros simultâneos com e sem commit em grupo.')
+    parser.add_argument('--clientes', type=int, default=16, help='threads de cadastro (padrão: 16)')
+    parser.add_argument('--duracao', type=float, default=5.0, help='segundos por caso (padrão: 5)')
+    parser.add_argument('--duplicados', type=float, default=0.1,
+                        help='fração de cachorros com nome repetido (409), 0 a 1 (padrão: 0.1)')
+    parser.add_argument('--janela-ms', type=float, default=2, help='GRUPO_COMMIT_JANELA_MS (padrão: 2)')
+    parser.add_argument('--perfis', nargs='+', default=['padrao', 'producao'], help='perfis a comparar')
+    parser.add_argument('--json', action='store_true', help='imprime o resultado em JSON')
+    args = parser.parse_args()
+
+    resultados = [executar_caso(perfil, grupo, args) for perfil in args.perfis for grupo in (False, True)]
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+        return
+    print(f"{'perfil':<10} {'grupo':>6} {'escritas/s':>11} {'p50 (ms)':>9} {'p99 (ms)':>9} "
+          f"{'409':>6} {'erros':>6} {'ops/tx':>7} {'confere':>8}")
+    for r in resultados:
+        print(f"{r['perfil']:<10} {'sim' if r['grupo_commit'] else 'não':>6} {r['escritas_por_s']:>11} "
+              f"{r['p50_ms']:>9} {r['p99_ms']:>9} {r['conflitos_409']:>6} {r['erros']:>6} "
+              f"{r['ops_por_transacao']:>7} {'sim' if r['confere'] else 'NÃO':>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,507 @@
+# backend/bench_rotas.py
+"""
+Benchmark de carga e latência de todas as rotas documentadas em `swagger.yaml`.
+
+O script sobe a aplicação (`create_app()`) sobre um banco gerado com
+`gerar_dados.py` (ou sobre um banco existente, com --banco) e dispara, com
+vários clientes concorrentes, todas as operações da API: raças, CRUD de
+usuários, CRUD de cachorros e as listagens por usuário. A proporção entre
+leituras e escritas é configurável (--escrita).
+
+Tudo roda localmente, sem rede externa:
+- modo 'teste' (padrão): usa o `test_client()` do Flask, sem sockets;
+- modo 'wsgi': sobe um servidor WSGI local (werkzeug) em 127.0.0.1 e usa
+  conexões HTTP reais (inclui o custo de parsing HTTP e de sockets);
+- modo 'gunicorn': sobe `serve.py` (gunicorn, --workers processos com
+  --threads threads) em 127.0.0.1, para medir como a vazão escala com os
+  núcleos sobre o mesmo arquivo SQLite.
+
+O resultado (vazão e latências p50/p95/p99 por rota) sai em JSON. Com
+--baseline, o resultado é comparado com uma execução anterior e as rotas que
+pioraram além da tolerância são apontadas (código de saída 1).
+
+Ao iniciar, o script confere se todas as operações do `swagger.yaml` têm um
+"driver" aqui; se surgir uma rota nova sem driver, ele avisa e termina com erro.
+
+Uso:
+    python bench_rotas.py --duracao 20 --concorrencia 8 --saida resultado.json
+    python bench_rotas.py --salvar-baseline bench_rotas_baseline.json
+    python bench_rotas.py --baseline bench_rotas_baseline.json --tolerancia 0.25
+    python bench_rotas.py --modo wsgi --escrita 0.3 --gzip
+    python bench_rotas.py --modo gunicorn --workers 4 --threads 4 --concorrencia 16
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import quote
+from werkzeug.serving import make_server
+from app import create_app
+from bench_sqlite import percentil
+from gerar_dados import preparar_esquema, carregar
+
+BASEDIR = os.path.abspath(os.path.dirname(__file__))
+SWAGGER = os.path.join(BASEDIR, 'swagger.yaml')
+
+
+# --- Clientes ---
+
+class ClienteTeste:
+    """Requisições pelo `test_client()` do Flask (sem sockets)."""
+
+    def __init__(self, app, cabecalhos):
+        self.cliente = app.test_client()
+        self.cabecalhos = cabecalhos
+
+    def requisitar(self, metodo, caminho, corpo=None):
+        if isinstance(corpo, str):  # Corpo NDJSON (importações)
+            resposta = self.cliente.open(caminho, method=metodo, data=corpo, headers=self.cabecalhos,
+                                         content_type='application/x-ndjson')
+        else:
+            resposta = self.cliente.open(caminho, method=metodo, json=corpo, headers=self.cabecalhos)
+        return resposta.status_code, resposta.get_data()
+
+
+class ClienteHTTP:
+    """Requisições HTTP/1.1 reais para o servidor WSGI local (conexão persistente)."""
+
+    def __init__(self, porta, cabecalhos):
+        self.porta = porta
+        self.cabecalhos = cabecalhos
+        self.conexao = None
+
+    def requisitar(self, metodo, caminho, corpo=None):
+        cabecalhos = dict(self.cabecalhos)
+        dados = None
+        if isinstance(corpo, str):  # Corpo NDJSON (importações)
+            dados = corpo.encode()
+            cabecalhos['Content-Type'] = 'application/x-ndjson'
+        elif corpo is not None:
+            dados = json.dumps(corpo).encode()
+            cabecalhos['Content-Type'] = 'application/json'
+        for tentativa in range(2):
+            if self.conexao is None:
+                self.conexao = http.client.HTTPConnection('127.0.0.1', self.porta, timeout=30)
+            try:
+                self.conexao.request(metodo, caminho, body=dados, headers=cabecalhos)
+                resposta = self.conexao.getresponse()
+                return resposta.status, resposta.read()
+            except (http.client.HTTPException, ConnectionError):
+                # O servidor pode fechar a conexão persistente: reconecta uma vez
+                self.conexao.close()
+                self.conexao = None
+                if tentativa:
+                    raise
+
+
+# --- Dados de apoio ---
+
+class Amostra:
+    """Ids, e-mails, nomes de pets e raças existentes, usados para montar as requisições."""
+
+    def __init__(self, banco, limite=20000):
+        conexao = sqlite3.connect(banco)
+        try:
+            self.usuarios = conexao.execute('SELECT id, email FROM user ORDER BY id LIMIT ?', (limite,)).fetchall()
+            self.cachorros = conexao.execute('SELECT id, user_id, nome_pet FROM cachorro ORDER BY id LIMIT ?',
+                                             (limite,)).fetchall()
+            self.racas = conexao.execute('SELECT id, nome FROM raca ORDER BY id').fetchall()
+        finally:
+            conexao.close()
+        if not self.usuarios or not self.cachorros or not self.racas:
+            raise SystemExit('O banco precisa ter usuários, cachorros e raças (veja gerar_dados.py).')
+
+
+class Estado:
+    """Estado de um cliente: registros criados por ele (alvos dos PUT/DELETE)."""
+
+    def __init__(self, numero, semente):
+        self.numero = numero
+        self.rng = random.Random(f'{semente}:{numero}')
+        self.contador = 0
+        self.usuarios = []   # ids de usuários criados por este cliente
+        self.cachorros = []  # ids de cachorros criados por este cliente
+        self.cursor = None   # último cursor de `/cachorros/changes` (a sequência é global)
+
+    def unico(self):
+        self.contador += 1
+        return f'{self.numero}-{self.contador}-{self.rng.randrange(10 ** 9)}'
+
+
+def _json(corpo):
+    try:
+        return json.loads(corpo)
+    except ValueError:
+        return None
+
+
+# --- Operações ---
+# Cada operação recebe (estado, amostra) e devolve (método, caminho, corpo JSON
+# ou texto NDJSON, função que registra o resultado). As chaves seguem o formato "MÉTODO /rota" do swagger.
+
+def _novo_usuario(estado):
+    chave = estado.unico()
+    return {'nome_completo': f'Bench {chave}', 'email': f'bench-{chave}@bench.local', 'telefone': '(11) 90000-0000'}
+
+
+def _novo_cachorro(estado, amostra):
+    # O dono vem da amostra (nunca é removido): um DELETE de usuário do benchmark
+    # apagaria em cascata os cachorros dele, e os PUT/DELETE seguintes dariam 404.
+    return {'nome_pet': f'Bench {estado.unico()}', 'idade': estado.rng.randrange(16),
+            'peso': round(estado.rng.uniform(2, 50), 1), 'user_id': estado.rng.choice(amostra.usuarios)[0],
+            'raca_id': estado.rng.choice(amostra.racas)[0]}
+
+
+def _ndjson(registros):
+    return ''.join(json.dumps(registro) + '\n' for registro in registros)
+
+
+def _guardar(lista, chave):
+    def registrar(status, dados):
+        if status == 201 and dados:
+            lista.append(dados['id'] if chave is None else dados[chave]['id'])
+    return registrar
+
+
+def _changes(e, a):
+    def registrar(status, dados):
+        if status == 200 and dados:
+            e.cursor = dados['cursor']
+    since = '' if e.cursor is None else f'?since={e.cursor}'
+    return ('GET', f'/usuarios/{e.rng.choice(a.cachorros)[1]}/cachorros/changes{since}', None, registrar)
+
+
+def _guardar_lote(lista, chave, campo):
+    def registrar(status, dados):
+        if status in (201, 207) and dados:
+            lista.extend(r[campo]['id'] for r in dados[chave] if r['status'] == 201)
+    return registrar
+
+
+LEITURAS = {
+    'GET /racas': lambda e, a: ('GET', '/racas', None, None),
+    'GET /racas/search': lambda e, a: ('GET', '/racas/search?q=' + quote(
+        e.rng.choice(a.racas)[1][:e.rng.randint(2, 5)]), None, None),
+    'GET /racas/{nome_raca}': lambda e, a: ('GET', '/racas/' + quote(e.rng.choice(a.racas)[1]), None, None),
+    'GET /usuarios': lambda e, a: ('GET', f'/usuarios?limit=50&after={e.rng.choice(a.usuarios)[0]}', None, None),
+    'GET /usuarios/email/{email}': lambda e, a: ('GET', '/usuarios/email/' + quote(e.rng.choice(a.usuarios)[1]),
+                                                 None, None),
+    'GET /usuarios/{user_id}': lambda e, a: ('GET', f'/usuarios/{e.rng.choice(a.usuarios)[0]}', None, None),
+    'GET /cachorros/{cachorro_id}': lambda e, a: ('GET', f'/cachorros/{e.rng.choice(a.cachorros)[0]}', None, None),
+    'GET /usuarios/{user_id}/cachorros': lambda e, a: ('GET', f'/usuarios/{e.rng.choice(a.cachorros)[1]}/cachorros',
+                                                       None, None),
+    # Sincronização incremental: a primeira recebe a lista completa, as seguintes só o que mudou
+    'GET /usuarios/{user_id}/cachorros/changes': _changes,
+    'GET /usuarios/{user_id}/cachorros/{nome_pet}': lambda e, a: (
+        lambda c: ('GET', f'/usuarios/{c[1]}/cachorros/{quote(c[2])}', None, None))(e.rng.choice(a.cachorros)),
+    'GET /estatisticas': lambda e, a: ('GET', '/estatisticas', None, None),
+    # Exportações limitadas a uma faixa de 100 ids (o custo cresce com a faixa, não com a tabela)
+    'GET /export/usuarios': lambda e, a: (lambda i: (
+        'GET', f'/export/usuarios?format=csv&id_min={i}&id_max={i + 99}', None, None))(e.rng.choice(a.usuarios)[0]),
+    'GET /export/cachorros': lambda e, a: (lambda i: (
+        'GET', f'/export/cachorros?include=owner,breed&id_min={i}&id_max={i + 99}', None, None))(
+        e.rng.choice(a.cachorros)[0]),
+    'GET /metrics': lambda e, a: ('GET', '/metrics', None, None),
+}
+
+
+def _put_usuario(e, a):
+    if not e.usuarios:
+        return ESCRITAS['POST /usuarios'](e, a)
+    return ('PUT', f'/usuarios/{e.rng.choice(e.usuarios)}', {'telefone': f'(11) 9{e.rng.randrange(10 ** 8):08d}'},
+            None)
+
+
+def _delete_usuario(e, a):
+    if not e.usuarios:
+        return ESCRITAS['POST /usuarios'](e, a)
+    user_id = e.usuarios.pop(e.rng.randrange(len(e.usuarios)))
+    return ('DELETE', f'/usuarios/{user_id}', None, None)
+
+
+def _put_cachorro(e, a):
+    if not e.cachorros:
+        return ESCRITAS['POST /cachorros'](e, a)
+    return ('PUT', f'/cachorros/{e.rng.choice(e.cachorros)}', {'peso': round(e.rng.uniform(2, 50), 1)}, None)
+
+
+def _delete_cachorro(e, a):
+    if not e.cachorros:
+        return ESCRITAS['POST /cachorros'](e, a)
+    cachorro_id = e.cachorros.pop(e.rng.randrange(len(e.cachorros)))
+    return ('DELETE', f'/cachorros/{cachorro_id}', None, None)
+
+
+ESCRITAS = {
+    'POST /usuarios': lambda e, a: ('POST', '/usuarios', _novo_usuario(e), _guardar(e.usuarios, None)),
+    'POST /usuarios/batch': lambda e, a: ('POST', '/usuarios/batch', [_novo_usuario(e) for _ in range(10)],
+                                          _guardar_lote(e.usuarios, 'resultados', 'usuario')),
+    'PUT /usuarios/{user_id}': _put_usuario,
+    'DELETE /usuarios/{user_id}': _delete_usuario,
+    'POST /cachorros': lambda e, a: ('POST', '/cachorros', _novo_cachorro(e, a), _guardar(e.cachorros, None)),
+    'POST /cachorros/batch': lambda e, a: ('POST', '/cachorros/batch', [_novo_cachorro(e, a) for _ in range(10)],
+                                           _guardar_lote(e.cachorros, 'resultados', 'cachorro')),
+    'PUT /cachorros/{cachorro_id}': _put_cachorro,
+    'DELETE /cachorros/{cachorro_id}': _delete_cachorro,
+    # Importações de 10 registros em NDJSON (a resposta não traz os ids criados)
+    'POST /import/usuarios': lambda e, a: ('POST', '/import/usuarios', _ndjson(_novo_usuario(e) for _ in range(10)),
+                                           None),
+    'POST /import/cachorros': lambda e, a: ('POST', '/import/cachorros',
+                                            _ndjson(_novo_cachorro(e, a) for _ in range(10)), None),
+}
+
+
+def operacoes_swagger(caminho=SWAGGER):
+    """Lista as operações ("MÉTODO /rota") declaradas no swagger.yaml (leitura simples, sem PyYAML)."""
+    operacoes, rota = [], None
+    with open(caminho, encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            encontrado = re.match(r'^  (/\S*):', linha)
+            if encontrado:
+                rota = encontrado.group(1)
+                continue
+            encontrado = re.match(r'^    (get|post|put|delete|patch):', linha)
+            if encontrado and rota:
+                operacoes.append(f'{encontrado.group(1).upper()} {rota}')
+    return operacoes
+
+
+def identificar(metodo, caminho):
+    """Nome da operação a partir de uma requisição feita (as escritas podem trocar de operação)."""
+    for nome in list(LEITURAS) + list(ESCRITAS):
+        metodo_op, rota = nome.split(' ', 1)
+        padrao = '^' + re.sub(r'\\{[^}]+\\}', '[^/]+', re.escape(rota)) + '$'
+        if metodo_op == metodo and re.match(padrao, caminho.split('?', 1)[0]):
+            return nome
+    return f'{metodo} {caminho}'
+
+
+# --- Execução ---
+
+def executar(fabrica_cliente, amostra, args):
+    """Roda os clientes concorrentes; retorna {operação: [(latência, status), ...]} e a duração."""
+    medicoes = defaultdict(list)
+    lock = threading.Lock()
+    leituras, escritas = list(LEITURAS), list(ESCRITAS)
+    inicio = time.perf_counter()
+    fim = inicio + args.duracao
+
+    def trabalhador(numero):
+        estado = Estado(numero, args.semente)
+        cliente = fabrica_cliente()
+        locais = defaultdict(list)
+        nomes = {}
+        while time.perf_counter() < fim:
+            if estado.rng.random() < args.escrita:
+                metodo, caminho, corpo, registrar = ESCRITAS[estado.rng.choice(escritas)](estado, amostra)
+            else:
+                metodo, caminho, corpo, registrar = LEITURAS[estado.rng.choice(leituras)](estado, amostra)
+            t0 = time.perf_counter()
+            status, dados = cliente.requisitar(metodo, caminho, corpo)
+            latencia = time.perf_counter() - t0
+            chave = (metodo, caminho.split('?', 1)[0])
+            nome = nomes.get(chave) or nomes.setdefault(chave, identificar(metodo, chave[1]))
+            locais[nome].append((latencia, status))
+            if registrar is not None:
+                registrar(status, _json(dados))
+        with lock:
+            for nome, valores in locais.items():
+                medicoes[nome].extend(valores)
+
+    threads = [threading.Thread(target=trabalhador, args=(i,)) for i in range(args.concorrencia)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return medicoes, time.perf_counter() - inicio
+
+
+def resumir(medicoes, duracao):
+    """Vazão, latências e status por operação (em ms)."""
+    rotas = {}
+    for nome in sorted(medicoes):
+        latencias = [latencia for latencia, _ in medicoes[nome]]
+        status = defaultdict(int)
+        for _, codigo in medicoes[nome]:
+            status[str(codigo)] += 1
+        rotas[nome] = {
+            'requisicoes': len(latencias),
+            'por_s': round(len(latencias) / duracao, 1),
+            'p50_ms': round(percentil(latencias, 50) * 1000, 3),
+            'p95_ms': round(percentil(latencias, 95) * 1000, 3),
+            'p99_ms': round(percentil(latencias, 99) * 1000, 3),
+            'erros': sum(n for codigo, n in status.items() if int(codigo) >= 400),
+            'status': dict(status),
+        }
+    total = sum(r['requisicoes'] for r in rotas.values())
+    return {
+        'total': {
+            'requisicoes': total,
+            'por_s': round(total / duracao, 1),
+            'erros': sum(r['erros'] for r in rotas.values()),
+        },
+        'rotas': rotas,
+    }
+
+
+def comparar(resultado, baseline, tolerancia):
+    """Lista as regressões em relação ao baseline (p95 maior ou vazão menor além da tolerância)."""
+    regressoes = []
+    for nome, atual in resultado['rotas'].items():
+        anterior = baseline.get('rotas', {}).get(nome)
+        if not anterior or anterior['requisicoes'] < 20:
+            continue  # Pouca amostra no baseline: comparação não é confiável
+        if atual['p95_ms'] > anterior['p95_ms'] * (1 + tolerancia):
+            regressoes.append(f"{nome}: p95 {anterior['p95_ms']} ms -> {atual['p95_ms']} ms")
+        if atual['por_s'] < anterior['por_s'] * (1 - tolerancia):
+            regressoes.append(f"{nome}: vazão {anterior['por_s']}/s -> {atual['por_s']}/s")
+    return regressoes
+
+
+def iniciar_gunicorn(banco, args):
+    """Sobe `serve.py` numa porta livre e espera até ele aceitar conexões."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        porta = sock.getsockname()[1]
+    processo = subprocess.Popen([
+        sys.executable, os.path.join(BASEDIR, 'serve.py'), '--bind', f'127.0.0.1:{porta}',
+        '--workers', str(args.workers), '--threads', str(args.threads), '--banco', banco, '--log-level', 'warning',
+        *(['--grupo-commit'] if args.grupo_commit else []),
+        *(['--cache', 'compartilhado', '--cache-arquivo', banco + '.cache'] if args.cache else []),
+    ])
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise SystemExit('serve.py terminou antes de aceitar conexões.')
+        try:
+            with socket.create_connection(('127.0.0.1', porta), timeout=1):
+                return processo, porta
+        except OSError:
+            time.sleep(0.2)
+    processo.terminate()
+    raise SystemExit('serve.py não respondeu a tempo.')
+
+
+def preparar_dados(args, diretorio):
+    """Banco do benchmark: uma cópia do --banco informado ou um banco gerado."""
+    banco = os.path.join(diretorio, 'bench.db')
+    if args.banco:
+        # Trabalha numa cópia: as escritas do benchmark não alteram o banco original
+        origem = sqlite3.connect(args.banco)
+        destino = sqlite3.connect(banco)
+        origem.backup(destino)
+        origem.close()
+        destino.close()
+        return banco
+    racas = preparar_esquema(banco)
+    geracao = argparse.Namespace(usuarios=args.usuarios, media_cachorros=2.0, maximo_cachorros=100,
+                                 semente=args.semente, lote=10000, transacao=500000, processos=1,
+                                 sem_analyze=False)
+    carregar(banco, geracao, racas)
+    return banco
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de carga e latência das rotas da API.')
+    parser.add_argument('--modo', choices=['teste', 'wsgi', 'gunicorn'], default='teste',
+                        help="'teste' (test_client do Flask), 'wsgi' (servidor HTTP local) ou 'gunicorn' (serve.py)")
+    parser.add_argument('--workers', type=int, default=2, help="processos no modo 'gunicorn' (padrão: 2)")
+    parser.add_argument('--threads', type=int, default=4, help="threads por processo no modo 'gunicorn' (padrão: 4)")
+    parser.add_argument('--banco', help='banco SQLite de origem (é copiado); sem ele, um banco é gerado')
+    parser.add_argument('--usuarios', type=int, default=20000, help='usuários do banco gerado (padrão: 20000)')
+    parser.add_argument('--concorrencia', type=int, default=4, help='clientes simultâneos (padrão: 4)')
+    parser.add_argument('--duracao', type=float, default=10.0, help='segundos de carga (padrão: 10)')
+    parser.add_argument('--escrita', type=float, default=0.1, help='fração de escritas, 0 a 1 (padrão: 0.1)')
+    parser.add_argument('--semente', type=int, default=42, help='semente dos dados e das requisições')
+    parser.add_argument('--gzip', action='store_true', help='envia Accept-Encoding: gzip')
+    parser.add_argument('--grupo-commit', action='store_true', help='liga o commit em grupo das escritas (GRUPO_COMMIT)')
+    parser.add_argument('--cache', action='store_true',
+                        help="liga o cache das respostas (CACHE_RESPOSTAS; compartilhado no modo 'gunicorn')")
+    parser.add_argument('--saida', help='grava o resultado JSON neste arquivo (além de imprimir)')
+    parser.add_argument('--baseline', help='resultado anterior para comparação')
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help='piora aceitável em relação ao baseline (padrão: 0.2 = 20%%)')
+    parser.add_argument('--salvar-baseline', help='grava o resultado como novo baseline neste arquivo')
+    args = parser.parse_args()
+
+    sem_driver = [op for op in operacoes_swagger() if op not in LEITURAS and op not in ESCRITAS]
+    if sem_driver:
+        print('Operações do swagger.yaml sem driver no benchmark: ' + ', '.join(sem_driver), file=sys.stderr)
+        sys.exit(2)
+
+    cabecalhos = {'Accept-Encoding': 'gzip'} if args.gzip else {}
+    diretorio = tempfile.mkdtemp(prefix='bench_rotas_')
+    servidor = processo = None
+    try:
+        banco = preparar_dados(args, diretorio)
+        amostra = Amostra(banco)
+        if args.modo == 'gunicorn':
+            processo, porta = iniciar_gunicorn(banco, args)
+            fabrica = lambda: ClienteHTTP(porta, cabecalhos)
+        else:
+            app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{banco}', 'GRUPO_COMMIT': args.grupo_commit,
+                              'CACHE_RESPOSTAS': args.cache})
+            if args.modo == 'wsgi':
+                servidor = make_server('127.0.0.1', 0, app, threaded=True)
+                threading.Thread(target=servidor.serve_forever, daemon=True).start()
+                fabrica = lambda: ClienteHTTP(servidor.server_port, cabecalhos)
+            else:
+                fabrica = lambda: ClienteTeste(app, cabecalhos)
+
+        medicoes, duracao = executar(fabrica, amostra, args)
+        resultado = {
+            'configuracao': {
+                'modo': args.modo, 'concorrencia': args.concorrencia, 'duracao_s': args.duracao,
+                'escrita': args.escrita, 'gzip': args.gzip, 'grupo_commit': args.grupo_commit, 'cache': args.cache,
+                'semente': args.semente,
+                'banco': args.banco or f'gerado ({args.usuarios} usuários)',
+                **({'workers': args.workers, 'threads': args.threads} if args.modo == 'gunicorn' else {}),
+            },
+            **resumir(medicoes, duracao),
+        }
+    finally:
+        if servidor is not None:
+            servidor.shutdown()
+        if processo is not None:
+            processo.terminate()  # SIGTERM: desligamento gracioso do gunicorn
+            processo.wait(timeout=60)
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+    regressoes = []
+    if args.baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as arquivo:
+                baseline = json.load(arquivo)
+            diferentes = [chave for chave, valor in resultado['configuracao'].items()
+                          if baseline.get('configuracao', {}).get(chave) != valor]
+            if diferentes:
+                print('Aviso: configuração diferente do baseline em ' + ', '.join(diferentes), file=sys.stderr)
+            regressoes = comparar(resultado, baseline, args.tolerancia)
+            resultado['regressoes'] = regressoes
+        else:
+            print(f'Baseline {args.baseline} não encontrado; nada a comparar.', file=sys.stderr)
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    print(texto)
+    for caminho in filter(None, [args.saida, args.salvar_baseline]):
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + '\n')
+    if regressoes:
+        print('Regressões em relação ao baseline:\n  ' + '\n  '.join(regressoes), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
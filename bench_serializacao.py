@@ -0,0 +1,181 @@
+# backend/bench_serializacao.py
+"""
+Microbenchmark da serialização das leituras: ORM + `to_dict()` contra os
+serializadores de linhas de `database.py` (`select()` de colunas, sem objetos ORM).
+
+O script cria um banco temporário com usuários, raças e cachorros e mede,
+para cada caminho, quantas linhas por segundo viram dicionários JSON:
+- usuários: `User.to_dict()` x `usuario_de_linha()`;
+- cachorros com dono e raça: `Cachorro.to_dict(include_owner=True, include_breed=True)`
+  (com dono e raça carregados antecipadamente, sem N+1) x `cachorro_de_linha()`.
+
+Antes de medir, confere que os dois caminhos produzem exatamente os mesmos dados.
+
+Com `--representacoes`, compara as representações de `GET /usuarios/<id>/cachorros`
+para um usuário com `--cachorros-lista` cachorros de 3 raças: bytes e tempo da
+resposta completa, com `embed=ref` e com campos esparsos (`fields=`; ver `campos.py`).
+
+Uso:
+    python bench_serializacao.py
+    python bench_serializacao.py --usuarios 20000 --cachorros-por-usuario 3 --repeticoes 5 --json
+    python bench_serializacao.py --representacoes --cachorros-lista 500
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from sqlalchemy import insert, select
+from sqlalchemy.orm import joinedload
+from app import create_app
+from database import (db, User, Raca, Cachorro, consulta_usuarios, consulta_cachorros,
+                      usuario_de_linha, cachorro_de_linha, executar)
+
+
+def preparar_banco(app, usuarios, cachorros_por_usuario, cachorros_lista):
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(Raca), [
+            {'nome': f'Raça {i}', 'porte': 'Médio', 'grupo': 'Grupo de teste', 'imagem': f'raca-{i}.png',
+             'cuidados': 'Escovação semanal e passeios diários. ' * 3,
+             'comportamento': 'Dócil, brincalhão e companheiro. ' * 3,
+             'racao': 'Ração premium para cães adultos de porte médio.'}
+            for i in range(20)
+        ])
+        db.session.execute(insert(User), [
+            {'nome_completo': f'Usuário {i}', 'email': f'usuario{i}@bench.local', 'telefone': '(11) 90000-0000'}
+            for i in range(usuarios)
+        ])
+        db.session.execute(insert(Cachorro), [
+            {'nome_pet': f'Pet {j}', 'idade': j % 15, 'peso': 5.0 + j, 'info_extra': None,
+             'user_id': u + 1, 'raca_id': (u + j) % 20 + 1}
+            for u in range(usuarios) for j in range(cachorros_por_usuario)
+        ])
+        if cachorros_lista:
+            # Um usuário a mais (id = usuarios + 1) com uma lista longa de só 3 raças
+            db.session.execute(insert(User), [{'nome_completo': 'Canil', 'email': 'canil@bench.local'}])
+            db.session.execute(insert(Cachorro), [
+                {'nome_pet': f'Filhote {j}', 'idade': 1, 'peso': 3.5, 'info_extra': None,
+                 'user_id': usuarios + 1, 'raca_id': j % 3 + 1}
+                for j in range(cachorros_lista)
+            ])
+        db.session.commit()
+
+
+def medir(funcao, repeticoes):
+    """Executa `funcao` várias vezes; retorna (melhor tempo em s, quantidade de linhas)."""
+    melhor, linhas = None, 0
+    for _ in range(repeticoes):
+        db.session.remove()  # Mapa de identidade vazio a cada repetição
+        inicio = time.perf_counter()
+        linhas = len(funcao())
+        duracao = time.perf_counter() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor, linhas
+
+
+def usuarios_orm():
+    return [user.to_dict() for user in db.session.execute(select(User).order_by(User.id)).scalars()]
+
+
+def usuarios_linhas():
+    return [usuario_de_linha(linha) for linha in executar(consulta_usuarios().order_by(User.id))]
+
+
+def cachorros_orm():
+    consulta = select(Cachorro).options(joinedload(Cachorro.owner), joinedload(Cachorro.breed)).order_by(Cachorro.id)
+    return [c.to_dict(include_owner=True, include_breed=True) for c in db.session.execute(consulta).scalars()]
+
+
+def cachorros_linhas():
+    consulta = consulta_cachorros(include_owner=True, include_breed=True).order_by(Cachorro.id)
+    return [cachorro_de_linha(linha, include_owner=True, include_breed=True) for linha in executar(consulta)]
+
+
+CENARIOS = [
+    ('usuarios', usuarios_orm, usuarios_linhas),
+    ('cachorros+dono+raca', cachorros_orm, cachorros_linhas),
+]
+
+REPRESENTACOES = [
+    ('completa', ''),
+    ('embed=ref', '?embed=ref'),
+    ('fields', '?fields=id,nome_pet,breed.nome'),
+    ('fields+embed=ref', '?fields=id,nome_pet,breed.nome&embed=ref'),
+]
+
+
+def comparar_representacoes(app, user_id, repeticoes):
+    """Bytes e melhor tempo de cada representação da lista de cachorros de `user_id`."""
+    cliente = app.test_client()
+    resultados = []
+    for nome, parametros in REPRESENTACOES:
+        url = f'/usuarios/{user_id}/cachorros{parametros}'
+        melhor, tamanho = None, 0
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            resposta = cliente.get(url)
+            duracao = time.perf_counter() - inicio
+            tamanho = len(resposta.get_data())
+            melhor = duracao if melhor is None else min(melhor, duracao)
+        resultados.append({'representacao': nome, 'bytes': tamanho, 'ms': round(melhor * 1000, 2)})
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara a serialização via ORM e via linhas (Core).')
+    parser.add_argument('--usuarios', type=int, default=5000, help='usuários no banco (padrão: 5000)')
+    parser.add_argument('--cachorros-por-usuario', type=int, default=2, help='cachorros por usuário (padrão: 2)')
+    parser.add_argument('--representacoes', action='store_true',
+                        help='compara as representações da lista de cachorros (fields=, embed=ref)')
+    parser.add_argument('--cachorros-lista', type=int, default=200,
+                        help='cachorros do usuário da comparação de representações (padrão: 200)')
+    parser.add_argument('--repeticoes', type=int, default=3, help='repetições; vale a melhor (padrão: 3)')
+    parser.add_argument('--json', action='store_true', help='imprime o resultado em JSON')
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix='bench_serializacao_')
+    try:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(diretorio, 'bench.db')}",
+                          'CACHE_RESPOSTAS': False})
+        preparar_banco(app, args.usuarios, args.cachorros_por_usuario,
+                       args.cachorros_lista if args.representacoes else 0)
+        resultados = []
+        if args.representacoes:
+            resultados = comparar_representacoes(app, args.usuarios + 1, args.repeticoes)
+        with app.app_context():
+            for nome, orm, linhas in [] if args.representacoes else CENARIOS:
+                if orm() != linhas():
+                    raise SystemExit(f'{nome}: os dois caminhos produziram dados diferentes')
+                tempo_orm, quantidade = medir(orm, args.repeticoes)
+                tempo_linhas, _ = medir(linhas, args.repeticoes)
+                resultados.append({
+                    'cenario': nome,
+                    'linhas': quantidade,
+                    'orm_linhas_por_s': round(quantidade / tempo_orm),
+                    'core_linhas_por_s': round(quantidade / tempo_linhas),
+                    'ganho': round(tempo_orm / tempo_linhas, 2),
+                })
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+        return
+    if args.representacoes:
+        print(f"GET /usuarios/<id>/cachorros com {args.cachorros_lista} cachorros de 3 raças")
+        print(f"{'representação':<22} {'bytes':>10} {'ms':>8}")
+        for r in resultados:
+            print(f"{r['representacao']:<22} {r['bytes']:>10} {r['ms']:>8}")
+        return
+    print(f"{'cenário':<22} {'linhas':>8} {'ORM linhas/s':>14} {'Core linhas/s':>14} {'ganho':>7}")
+    for r in resultados:
+        print(f"{r['cenario']:<22} {r['linhas']:>8} {r['orm_linhas_por_s']:>14} "
+              f"{r['core_linhas_por_s']:>14} {r['ganho']:>6}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+# backend/bench_sqlite.py
+"""
+Benchmark dos perfis SQLite definidos em `sqlite_config.py`.
+
+Para cada perfil ('padrao' e 'producao') o script cria um banco temporário
+com a fábrica `create_app()`, insere usuários iniciais e então executa,
+ao mesmo tempo, threads leitoras (busca de usuário por id, como numa
+requisição GET) e escritoras (cadastro de usuário com um commit cada)
+durante alguns segundos.
+
+Cada perfil roda duas vezes: com as leituras no engine principal e com o
+engine somente leitura separado (`SQLITE_LEITURA`, ver `sqlite_config.py`).
+
+Ao final mostra, por caso, as leituras/s e escritas/s obtidas, a latência
+p50/p99 das leituras e quantas operações falharam (ex: "database is locked").
+
+Uso:
+    python bench_sqlite.py
+    python bench_sqlite.py --leitores 8 --escritores 4 --duracao 10 --json
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from sqlalchemy import insert
+from app import create_app
+from database import db, User
+
+
+def percentil(valores, p):
+    """Percentil `p` (0-100) de uma lista de valores (aproximação por posição)."""
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p / 100))]
+
+
+def preparar_banco(app, usuarios_iniciais):
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(User), [
+            {'nome_completo': f'Usuário {i}', 'email': f'inicial{i}@bench.local', 'telefone': None}
+            for i in range(usuarios_iniciais)
+        ])
+        db.session.commit()
+
+
+def executar_perfil(perfil, leitura_separada, args):
+    diretorio = tempfile.mkdtemp(prefix='bench_sqlite_')
+    try:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(diretorio, 'bench.db')}",
+            'SQLITE_PERFIL': perfil,
+            'SQLITE_LEITURA': leitura_separada,
+        })
+        preparar_banco(app, args.usuarios)
+
+        fim = time.perf_counter() + args.duracao
+        lock = threading.Lock()
+        leituras, escritas, erros = [0], [0], [0]
+        latencias_leitura = []
+
+        def leitor(semente):
+            rng = random.Random(semente)
+            locais = []
+            # Contexto de uma requisição GET: a sessão escolhe o engine de leitura, se houver
+            with app.test_request_context('/', method='GET'):
+                while time.perf_counter() < fim:
+                    inicio = time.perf_counter()
+                    try:
+                        db.session.get(User, rng.randint(1, args.usuarios))
+                        db.session.rollback()  # Encerra a transação de leitura
+                    except Exception:
+                        db.session.rollback()
+                        with lock:
+                            erros[0] += 1
+                        continue
+                    locais.append(time.perf_counter() - inicio)
+            with lock:
+                leituras[0] += len(locais)
+                latencias_leitura.extend(locais)
+
+        def escritor(numero):
+            contador = 0
+            with app.app_context():
+                while time.perf_counter() < fim:
+                    try:
+                        db.session.add(User(nome_completo='Novo', email=f'w{numero}-{contador}@bench.local'))
+                        db.session.commit()
+                        contador += 1
+                    except Exception:
+                        db.session.rollback()
+                        with lock:
+                            erros[0] += 1
+            with lock:
+                escritas[0] += contador
+
+        threads = [threading.Thread(target=leitor, args=(i,)) for i in range(args.leitores)]
+        threads += [threading.Thread(target=escritor, args=(i,)) for i in range(args.escritores)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with app.app_context():
+            db.engine.dispose()
+        if 'engine_leitura' in app.extensions:
+            app.extensions['engine_leitura'].dispose()
+        return {
+            'perfil': perfil,
+            'leitura_separada': leitura_separada,
+            'leituras_por_s': round(leituras[0] / args.duracao, 1),
+            'escritas_por_s': round(escritas[0] / args.duracao, 1),
+            'leitura_p50_ms': round(percentil(latencias_leitura, 50) * 1000, 3),
+            'leitura_p99_ms': round(percentil(latencias_leitura, 99) * 1000, 3),
+            'erros': erros[0],
+        }
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara os perfis SQLite sob clientes concorrentes.')
+    parser.add_argument('--leitores', type=int, default=8, help='threads de leitura (padrão: 8)')
+    parser.add_argument('--escritores', type=int, default=2, help='threads de escrita (padrão: 2)')
+    parser.add_argument('--duracao', type=float, default=5.0, help='segundos por perfil (padrão: 5)')
+    parser.add_argument('--usuarios', type=int, default=1000, help='usuários iniciais (padrão: 1000)')
+    parser.add_argument('--perfis', nargs='+', default=['padrao', 'producao'], help='perfis a comparar')
+    parser.add_argument('--json', action='store_true', help='imprime o resultado em JSON')
+    args = parser.parse_args()
+
+    resultados = [executar_perfil(perfil, separada, args) for perfil in args.perfis for separada in (False, True)]
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+        return
+    print(f"{'perfil':<10} {'leitura':>9} {'leituras/s':>12} {'escritas/s':>12} "
+          f"{'leitura p50 (ms)':>17} {'leitura p99 (ms)':>17} {'erros':>6}")
+    for r in resultados:
+        print(f"{r['perfil']:<10} {'separada' if r['leitura_separada'] else 'comum':>9} {r['leituras_por_s']:>12} "
+              f"{r['escritas_por_s']:>12} {r['leitura_p50_ms']:>17} {r['leitura_p99_ms']:>17} {r['erros']:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,439 @@
+# backend/cache.py
+"""
+Cache das respostas mais acessadas por usuário (LRU com TTL).
+
+`GET /usuarios/<id>`, `GET /usuarios/email/<email>` e
+`GET /usuarios/<id>/cachorros` são as rotas mais chamadas pelos clientes e
+cada uma ia ao SQLite e serializava o resultado a cada requisição. Com o
+cache ligado, o corpo JSON já codificado (bytes) fica guardado junto com o
+ETag e o Last-Modified, com as chaves:
+
+- `u:<id>`: o usuário (GET /usuarios/<id>);
+- `e:<email>`: o usuário (GET /usuarios/email/<email>);
+- `c:<user_id>`: a lista de cachorros do usuário, com as raças.
+
+O tamanho é limitado (`CACHE_RESPOSTAS_MAXIMO` entradas; as menos usadas
+recentemente saem primeiro) e cada entrada vale por `CACHE_RESPOSTAS_TTL`
+segundos. Respostas 404 não são guardadas.
+
+Invalidação: gatilhos TEMP, criados em cada conexão de escrita, anotam numa
+tabela temporária as chaves afetadas por qualquer INSERT, UPDATE ou DELETE
+em `user` e `cachorro`, venha de onde vier (rotas, lotes, importações, a
+cascata de `DELETE /usuarios/<id>`): o dono antigo e o novo quando um
+cachorro muda de dono, o e-mail antigo e o novo quando um usuário muda de
+e-mail. As chaves são lidas antes do commit e removidas do cache depois
+dele (no commit em grupo, depois do commit do lote); um rollback as
+descarta junto com a transação.
+
+Uma leitura que começou antes de uma invalidação não guarda o que leu: cada
+invalidação avança um número de geração, e `guardar` só grava se a geração
+ainda for a mesma do início da leitura (senão o valor pode ser anterior ao
+commit).
+
+Armazéns:
+- memória (padrão): um OrderedDict por processo;
+- arquivo (`CACHE_RESPOSTAS_ARQUIVO`): um banco SQLite local, de preferência
+  em memória compartilhada (ex: `/dev/shm/pet-cache.db`), usado por todos os
+  workers do gunicorn. É o modo a usar com vários processos: no armazém em
+  memória uma escrita só invalida o cache do processo que a fez, e os outros
+  podem servir a versão antiga até o TTL. Nele a ordem LRU é aproximada (o
+  último uso é regravado no máximo uma vez por segundo por entrada).
+
+Os contadores (acertos, falhas, expiradas, removidas por tamanho,
+invalidadas e descartadas por corrida com uma escrita), por tipo de chave,
+aparecem em `GET /metrics`. São de cada processo, como as demais métricas.
+
+Configuração (em `app.config` ou pelo parâmetro `config` de `create_app`):
+    CACHE_RESPOSTAS:          liga o cache (padrão: False; também pela variável
+                              de ambiente CACHE_RESPOSTAS=1 ou ao definir o arquivo)
+    CACHE_RESPOSTAS_MAXIMO:   número máximo de entradas (padrão: 10000)
+    CACHE_RESPOSTAS_TTL:      validade de cada entrada, em segundos (padrão: 30)
+    CACHE_RESPOSTAS_ARQUIVO:  arquivo do armazém compartilhado entre processos
+                              (padrão: None = memória; também pela variável de
+                              ambiente CACHE_RESPOSTAS_ARQUIVO)
+
+Observação: escritas feitas sem o cache configurado (ex: `gerar_dados.py`, ou
+um script com o armazém em memória) não invalidam o cache do servidor; as
+entradas antigas valem até o TTL. O armazém é esvaziado ao criar a app.
+
+Uso:
+    cache = CacheRespostas(app, db.engine)
+    entrada = cache.obter(chave_usuario(user_id))
+    geracao = cache.geracao()  # antes de consultar o banco
+    cache.guardar(chave_usuario(user_id), Entrada(corpo, etag, modificado_em), geracao)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict, namedtuple
+from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Corpo JSON (bytes), ETag e data de modificação (ou None) de uma resposta
+Entrada = namedtuple('Entrada', ['corpo', 'etag', 'modificado_em'])
+
+TIPOS = {'u': 'usuario', 'e': 'email', 'c': 'cachorros'}
+EVENTOS = ('acerto', 'falha', 'expirada', 'removida', 'invalidada', 'descartada')
+
+# Intervalo mínimo (s) entre duas regravações do último uso de uma entrada no armazém em arquivo
+INTERVALO_USO = 1.0
+
+
+def chave_usuario(user_id):
+    return f'u:{user_id}'
+
+
+def chave_email(email):
+    return f'e:{email}'
+
+
+def chave_cachorros(user_id):
+    return f'c:{user_id}'
+
+
+# Gatilhos TEMP (de cada conexão) que anotam as chaves afetadas pelas escritas.
+# `||` com NULL dá NULL, então colunas vazias não geram chaves.
+GATILHOS = [
+    'CREATE TEMP TABLE IF NOT EXISTS cache_alterado (chave TEXT PRIMARY KEY) WITHOUT ROWID',
+    """CREATE TEMP TRIGGER IF NOT EXISTS cache_user_insert AFTER INSERT ON main.user BEGIN
+        INSERT OR IGNORE INTO cache_alterado VALUES ('u:' || new.id), ('e:' || new.email);
+    END""",
+    """CREATE TEMP TRIGGER IF NOT EXISTS cache_user_update AFTER UPDATE ON main.user BEGIN
+        INSERT OR IGNORE INTO cache_alterado VALUES ('u:' || old.id), ('u:' || new.id),
+            ('e:' || old.email), ('e:' || new.email);
+    END""",
+    """CREATE TEMP TRIGGER IF NOT EXISTS cache_user_delete AFTER DELETE ON main.user BEGIN
+        INSERT OR IGNORE INTO cache_alterado VALUES ('u:' || old.id), ('e:' || old.email), ('c:' || old.id);
+    END""",
+    """CREATE TEMP TRIGGER IF NOT EXISTS cache_cachorro_insert AFTER INSERT ON main.cachorro BEGIN
+        INSERT OR IGNORE INTO cache_alterado VALUES ('c:' || new.user_id);
+    END""",
+    """CREATE TEMP TRIGGER IF NOT EXISTS cache_cachorro_update AFTER UPDATE ON main.cachorro BEGIN
+        INSERT OR IGNORE INTO cache_alterado VALUES ('c:' || old.user_id), ('c:' || new.user_id);
+    END""",
+    """CREATE TEMP TRIGGER IF NOT EXISTS cache_cachorro_delete AFTER DELETE ON main.cachorro BEGIN
+        INSERT OR IGNORE INTO cache_alterado VALUES ('c:' || old.user_id);
+    END""",
+]
+
+
+class ArmazemMemoria:
+    """Entradas num OrderedDict do processo, em ordem de uso (LRU)."""
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self._entradas = OrderedDict()  # chave -> (Entrada, expira)
+        self._geracao = 0
+        self._lock = threading.Lock()
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._geracao += 1
+
+    def geracao(self):
+        return self._geracao
+
+    def quantidade(self):
+        return len(self._entradas)
+
+    def obter(self, chave, agora):
+        """Retorna (Entrada ou None, expirou)."""
+        with self._lock:
+            item = self._entradas.get(chave)
+            if item is None:
+                return None, False
+            if item[1] <= agora:
+                del self._entradas[chave]
+                return None, True
+            self._entradas.move_to_end(chave)
+            return item[0], False
+
+    def guardar(self, chave, entrada, expira, geracao):
+        """Grava a entrada se a geração não mudou; retorna (gravou, chaves removidas por tamanho)."""
+        with self._lock:
+            if geracao != self._geracao:
+                return False, []
+            self._entradas[chave] = (entrada, expira)
+            self._entradas.move_to_end(chave)
+            removidas = []
+            while len(self._entradas) > self.maximo:
+                removidas.append(self._entradas.popitem(last=False)[0])
+            return True, removidas
+
+    def invalidar(self, chaves):
+        """Remove as chaves e avança a geração; retorna as chaves que estavam no cache."""
+        with self._lock:
+            self._geracao += 1
+            return [chave for chave in chaves if self._entradas.pop(chave, None) is not None]
+
+
+class ArmazemArquivo:
+    """Entradas num banco SQLite local, compartilhado pelos processos do servidor."""
+
+    ESQUEMA = [
+        """CREATE TABLE IF NOT EXISTS entrada (
+            chave TEXT PRIMARY KEY,
+            corpo BLOB NOT NULL,
+            etag TEXT NOT NULL,
+            modificado TEXT,
+            expira REAL NOT NULL,
+            usado REAL NOT NULL
+        ) WITHOUT ROWID""",
+        'CREATE INDEX IF NOT EXISTS ix_entrada_usado ON entrada (usado)',
+        """CREATE TABLE IF NOT EXISTS estado (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            geracao INTEGER NOT NULL,
+            quantidade INTEGER NOT NULL
+        )""",
+        'INSERT OR IGNORE INTO estado (id, geracao, quantidade) VALUES (1, 0, 0)',
+        """CREATE TRIGGER IF NOT EXISTS entrada_insert AFTER INSERT ON entrada BEGIN
+            UPDATE estado SET quantidade = quantidade + 1 WHERE id = 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS entrada_delete AFTER DELETE ON entrada BEGIN
+            UPDATE estado SET quantidade = quantidade - 1 WHERE id = 1;
+        END""",
+    ]
+
+    def __init__(self, caminho, maximo):
+        self.caminho = caminho
+        self.maximo = maximo
+        self._local = threading.local()
+        conexao = self._conexao()
+        for comando in self.ESQUEMA:
+            conexao.execute(comando)
+
+    def _conexao(self):
+        # Uma conexão por thread e por processo (as herdadas do mestre no fork não são reutilizadas)
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            conexao = sqlite3.connect(self.caminho, timeout=5, isolation_level=None, check_same_thread=False)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=OFF')  # É só um cache: perder as últimas gravações não importa
+            local.conexao, local.pid = conexao, os.getpid()
+        return local.conexao
+
+    def limpar(self):
+        conexao = self._conexao()
+        conexao.execute('BEGIN IMMEDIATE')
+        conexao.execute('DELETE FROM entrada')
+        conexao.execute('UPDATE estado SET geracao = geracao + 1 WHERE id = 1')
+        conexao.execute('COMMIT')
+
+    def geracao(self):
+        return self._conexao().execute('SELECT geracao FROM estado WHERE id = 1').fetchone()[0]
+
+    def quantidade(self):
+        return self._conexao().execute('SELECT quantidade FROM estado WHERE id = 1').fetchone()[0]
+
+    def obter(self, chave, agora):
+        conexao = self._conexao()
+        linha = conexao.execute('SELECT corpo, etag, modificado, expira, usado FROM entrada WHERE chave = ?',
+                                (chave,)).fetchone()
+        if linha is None:
+            return None, False
+        corpo, etag, modificado, expira, usado = linha
+        if expira <= agora:
+            conexao.execute('DELETE FROM entrada WHERE chave = ? AND expira <= ?', (chave, agora))
+            return None, True
+        if usado < agora - INTERVALO_USO:
+            conexao.execute('UPDATE entrada SET usado = ? WHERE chave = ?', (agora, chave))
+        return Entrada(corpo, etag, datetime.fromisoformat(modificado) if modificado else None), False
+
+    def guardar(self, chave, entrada, expira, geracao):
+        conexao = self._conexao()
+        modificado = entrada.modificado_em.isoformat() if entrada.modificado_em else None
+        # A verificação da geração e a gravação são um único comando (atômico entre os processos)
+        gravou = conexao.execute(
+            'INSERT INTO entrada (chave, corpo, etag, modificado, expira, usado) '
+            'SELECT ?, ?, ?, ?, ?, ? WHERE (SELECT geracao FROM estado WHERE id = 1) = ? '
+            'ON CONFLICT (chave) DO UPDATE SET corpo = excluded.corpo, etag = excluded.etag, '
+            'modificado = excluded.modificado, expira = excluded.expira, usado = excluded.usado',
+            (chave, entrada.corpo, entrada.etag, modificado, expira, time.time(), geracao)).rowcount > 0
+        removidas = []
+        if gravou:
+            excesso = self.quantidade() - self.maximo
+            if excesso > 0:
+                removidas = [linha[0] for linha in conexao.execute(
+                    'DELETE FROM entrada WHERE chave IN (SELECT chave FROM entrada ORDER BY usado LIMIT ?) '
+                    'RETURNING chave', (excesso,))]
+        return gravou, removidas
+
+    def invalidar(self, chaves):
+        conexao = self._conexao()
+        chaves = list(chaves)
+        conexao.execute('BEGIN IMMEDIATE')
+        try:
+            removidas = []
+            for inicio in range(0, len(chaves), 500):
+                parte = chaves[inicio:inicio + 500]
+                removidas += [linha[0] for linha in conexao.execute(
+                    f"DELETE FROM entrada WHERE chave IN ({','.join('?' * len(parte))}) RETURNING chave", parte)]
+            conexao.execute('UPDATE estado SET geracao = geracao + 1 WHERE id = 1')
+            conexao.execute('COMMIT')
+        except BaseException:
+            conexao.execute('ROLLBACK')
+            raise
+        return removidas
+
+
+class CacheRespostas:
+    """Extensão Flask com o cache das respostas por usuário (ver a documentação do módulo)."""
+
+    def __init__(self, app=None, engine=None):
+        self.ativo = False
+        self.armazem = None
+        self.engine = None
+        self._contadores = Counter()  # (tipo, evento) -> quantidade
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app, engine)
+
+    def init_app(self, app, engine):
+        app.config.setdefault('CACHE_RESPOSTAS_ARQUIVO', os.environ.get('CACHE_RESPOSTAS_ARQUIVO') or None)
+        app.config.setdefault('CACHE_RESPOSTAS', os.environ.get('CACHE_RESPOSTAS', '') not in ('', '0')
+                              or bool(app.config['CACHE_RESPOSTAS_ARQUIVO']))
+        app.config.setdefault('CACHE_RESPOSTAS_MAXIMO', 10000)
+        app.config.setdefault('CACHE_RESPOSTAS_TTL', 30)
+        app.extensions['cache_respostas'] = self
+        self.ativo = bool(app.config['CACHE_RESPOSTAS']) and engine is not None and engine.dialect.name == 'sqlite'
+        if not self.ativo:
+            return
+        self.ttl = app.config['CACHE_RESPOSTAS_TTL']
+        maximo = max(1, app.config['CACHE_RESPOSTAS_MAXIMO'])
+        arquivo = app.config['CACHE_RESPOSTAS_ARQUIVO']
+        self.armazem = ArmazemArquivo(arquivo, maximo) if arquivo else ArmazemMemoria(maximo)
+        self.armazem.limpar()  # O banco pode ter mudado enquanto o servidor estava desligado
+        self.engine = engine
+        event.listen(engine, 'checkout', _preparar_conexao)
+        metricas = app.extensions.get('metricas')
+        if metricas is not None:
+            metricas.adicionar_coletor(self.texto_prometheus)
+
+    def _contar(self, chave, evento, quantidade=1):
+        with self._lock:
+            self._contadores[(chave[0], evento)] += quantidade
+
+    def geracao(self):
+        """Número da geração; pegue-o antes de consultar o banco e passe-o para `guardar`."""
+        return self.armazem.geracao() if self.ativo else None
+
+    def obter(self, chave, valida=None):
+        """Retorna a Entrada guardada ou None.
+
+        `valida(entrada)` pode recusar uma entrada que depende de outro dado (ex: o catálogo de raças).
+        """
+        if not self.ativo:
+            return None
+        entrada, expirou = self.armazem.obter(chave, time.time())
+        if entrada is not None and valida is not None and not valida(entrada):
+            entrada, expirou = None, True
+        self._contar(chave, 'acerto' if entrada is not None else 'expirada' if expirou else 'falha')
+        return entrada
+
+    def guardar(self, chave, entrada, geracao):
+        """Guarda a entrada, a menos que alguma escrita tenha invalidado o cache depois de `geracao`."""
+        if not self.ativo:
+            return
+        gravou, removidas = self.armazem.guardar(chave, entrada, time.time() + self.ttl, geracao)
+        if not gravou:
+            self._contar(chave, 'descartada')
+        for removida in removidas:
+            self._contar(removida, 'removida')
+
+    def invalidar(self, chaves):
+        """Remove as chaves do cache (e faz as leituras em andamento não guardarem o que leram)."""
+        if not self.ativo:
+            return
+        for chave in self.armazem.invalidar(chaves):
+            self._contar(chave, 'invalidada')
+
+    def estatisticas(self):
+        """Contadores por tipo de chave e número de entradas."""
+        with self._lock:
+            contadores = dict(self._contadores)
+        return {
+            'entradas': self.armazem.quantidade() if self.ativo else 0,
+            **{nome: {evento: contadores.get((tipo, evento), 0) for evento in EVENTOS}
+               for tipo, nome in TIPOS.items()},
+        }
+
+    def texto_prometheus(self):
+        """Linhas das métricas do cache para `GET /metrics`."""
+        estatisticas = self.estatisticas()
+        linhas = [
+            '# HELP response_cache_events_total Consultas e alterações do cache de respostas por tipo e evento.',
+            '# TYPE response_cache_events_total counter',
+        ]
+        for nome in TIPOS.values():
+            for evento in EVENTOS:
+                linhas.append(f'response_cache_events_total{{kind="{nome}",event="{evento}"}} '
+                              f'{estatisticas[nome][evento]}')
+        linhas += [
+            '# HELP response_cache_entries Entradas no cache de respostas.',
+            '# TYPE response_cache_entries gauge',
+            f'response_cache_entries {estatisticas["entradas"]}',
+        ]
+        return linhas
+
+
+# --- Invalidação ---
+
+def _preparar_conexao(dbapi_connection, connection_record, connection_proxy):
+    # Cria os gatilhos TEMP uma vez por conexão; antes de `db.create_all()` as tabelas
+    # ainda não existem e a criação é tentada de novo na próxima vez.
+    if connection_record.info.get('cache_gatilhos'):
+        return
+    try:
+        for comando in GATILHOS:
+            dbapi_connection.execute(comando)
+    except sqlite3.OperationalError:
+        return
+    connection_record.info['cache_gatilhos'] = True
+
+
+def _cache_ativo():
+    if not has_app_context():
+        return None
+    cache = current_app.extensions.get('cache_respostas')
+    return cache if cache is not None and cache.ativo else None
+
+
+# Os eventos da sessão também disparam nos SAVEPOINTs (commit em grupo);
+# só a transação principal conta, pois só o commit dela torna as escritas visíveis.
+
+@event.listens_for(Session, 'before_commit')
+def _coletar_alteracoes(session):
+    cache = _cache_ativo()
+    if cache is None or session.in_nested_transaction():
+        return
+    # O commit só faz o flush depois deste evento; sem isto as exclusões
+    # pendentes na sessão ainda não teriam passado pelos gatilhos.
+    session.flush()
+    conexao = session.connection(bind_arguments={'bind': cache.engine})
+    if not conexao.info.get('cache_gatilhos'):
+        return
+    chaves = [chave for (chave,) in conexao.exec_driver_sql('SELECT chave FROM temp.cache_alterado')]
+    if chaves:
+        conexao.exec_driver_sql('DELETE FROM temp.cache_alterado')
+        session.info.setdefault('cache_invalidar', set()).update(chaves)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_apos_commit(session):
+    if session.in_nested_transaction():
+        return
+    chaves = session.info.pop('cache_invalidar', None)
+    cache = _cache_ativo()
+    if chaves and cache is not None:
+        cache.invalidar(chaves)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_alteracoes(session):
+    if not session.in_nested_transaction():
+        session.info.pop('cache_invalidar', None)
@@ -0,0 +1,142 @@
+# backend/campos.py
+"""
+Campos esparsos (`fields=`) e raças por referência (`embed=ref`) nas
+leituras de usuários e cachorros.
+
+Cada cachorro serializado por completo carrega a raça inteira, com os três
+textos longos (cuidados, comportamento, ração): numa lista de 200 cachorros
+da mesma raça, os mesmos kilobytes se repetem 200 vezes. Com os parâmetros
+abaixo o cliente pede só o que vai usar, e o SELECT lê só essas colunas:
+
+- `fields=id,nome_pet,breed.nome`: lista dos campos da resposta. Nos
+  cachorros, `breed` inclui a raça inteira e `breed.<campo>` só aquele campo
+  da raça; sem nenhum dos dois a raça fica de fora.
+- `embed=breed` (padrão): a raça vem dentro de cada cachorro, como antes.
+- `embed=ref` (listas de cachorros): cada cachorro traz só o `raca_id`, e
+  as raças vêm uma vez por resposta num mapa `breeds` ({"<raca_id>": raça}).
+
+Sem `fields` nem `embed` as rotas seguem o caminho completo de antes
+(serializadores de `database.py` e o cache das respostas). Nos outros casos
+o ETag ganha a `variante` (hash curto dos campos e do modo): cada
+representação tem o seu ETag, e um 304 ou um corpo comprimido guardado de
+uma não serve para a outra.
+
+Uso:
+    representacao = Representacao.de_parametros(request.args, 'cachorro', permite_ref=True)
+    linhas = executar(representacao.consulta().where(Cachorro.user_id == 1))
+    racas = {}
+    cachorros = [representacao.montar(linha, buscar_raca, racas) for linha in linhas]
+    breeds = representacao.mapa_racas(racas)
+"""
+
+from sqlalchemy import select
+from catalog import hash_conteudo
+from database import Cachorro, CACHORRO_COLUNAS, USUARIO_COLUNAS, data_iso
+
+# Nomes na mesma ordem das colunas de `database.py` (e dos campos de `to_dict()`)
+COLUNAS = {
+    'usuario': dict(zip(('id', 'nome_completo', 'email', 'telefone', 'data_cadastro'), USUARIO_COLUNAS)),
+    'cachorro': dict(zip(('id', 'nome_pet', 'idade', 'peso', 'info_extra', 'data_registro', 'user_id', 'raca_id'),
+                         CACHORRO_COLUNAS)),
+}
+CAMPOS_RACA = ('id', 'nome', 'porte', 'grupo', 'imagem', 'cuidados', 'comportamento', 'racao')
+CAMPOS_DATA = ('data_cadastro', 'data_registro')
+EMBEDS = ('breed', 'ref')
+
+
+class Representacao:
+    """Campos pedidos para um recurso ('usuario' ou 'cachorro') e o modo da raça."""
+
+    def __init__(self, recurso, campos=None, campos_raca=None, com_raca=True, embed='breed'):
+        self.recurso = recurso
+        self.campos = list(campos) if campos is not None else list(COLUNAS[recurso])
+        self.campos_raca = campos_raca  # None = todos os campos da raça
+        self.com_raca = recurso == 'cachorro' and com_raca
+        self.embed = embed
+        self.padrao = campos is None and embed == 'breed'
+        if self.com_raca and embed == 'ref' and 'raca_id' not in self.campos:
+            self.campos.append('raca_id')  # No modo ref o cachorro aponta para o mapa `breeds`
+        # A raça é procurada pelo `raca_id`: lido mesmo quando não foi pedido
+        self._selecionadas = self.campos + (['raca_id'] if self.com_raca and 'raca_id' not in self.campos else [])
+        self._posicao_raca = self._selecionadas.index('raca_id') if self.com_raca else None
+        self._datas = [campo for campo in CAMPOS_DATA if campo in self.campos]
+        self.variante = '' if self.padrao else self._calcular_variante()
+
+    def _calcular_variante(self):
+        """Hash curto da representação normalizada (a ordem dos campos em `fields` não importa)."""
+        raca = ('*' if self.campos_raca is None else ','.join(sorted(self.campos_raca))) if self.com_raca else '-'
+        return hash_conteudo(f"{','.join(sorted(self.campos))}|{raca}|{self.embed}".encode())[:8]
+
+    @classmethod
+    def de_parametros(cls, parametros, recurso, permite_ref=False):
+        """Lê `fields` e `embed` da query string; ValueError (com a mensagem para o 400) se inválidos."""
+        embed = parametros.get('embed', 'breed')
+        if embed not in EMBEDS or (embed == 'ref' and not (permite_ref and recurso == 'cachorro')):
+            raise ValueError("Parâmetro 'embed' inválido (use 'breed' ou, nas listas de cachorros, 'ref').")
+        if 'fields' not in parametros:
+            return cls(recurso, embed=embed)
+
+        validos = COLUNAS[recurso]
+        campos, campos_raca, com_raca = [], [], False
+        for nome in parametros['fields'].split(','):
+            nome = nome.strip()
+            if nome in validos:
+                if nome not in campos:
+                    campos.append(nome)
+            elif recurso == 'cachorro' and nome == 'breed':
+                com_raca, campos_raca = True, None
+            elif recurso == 'cachorro' and nome.startswith('breed.') and nome[6:] in CAMPOS_RACA:
+                if campos_raca is not None and nome[6:] not in campos_raca:
+                    campos_raca.append(nome[6:])
+                com_raca = True
+            else:
+                extras = ', breed, breed.<campo>' if recurso == 'cachorro' else ''
+                raise ValueError(f"Campo inválido em 'fields': {nome!r} (use {', '.join(validos)}{extras}).")
+        return cls(recurso, campos, campos_raca, com_raca, embed)
+
+    def consulta(self, *extras):
+        """SELECT só das colunas pedidas; `extras` são colunas adicionais no fim da linha."""
+        colunas = COLUNAS[self.recurso]
+        consulta = select(*(colunas[nome] for nome in self._selecionadas), *extras)
+        return consulta.select_from(Cachorro) if self.recurso == 'cachorro' else consulta
+
+    def de_linha(self, linha):
+        """Dicionário com os campos pedidos, a partir de uma linha de `consulta()` (sem a raça)."""
+        data = dict(zip(self.campos, linha))
+        for campo in self._datas:
+            data[campo] = data_iso(data[campo])
+        return data
+
+    def racas_de(self, raca):
+        """Os campos pedidos de uma raça no formato de `Raca.to_dict()`."""
+        if self.campos_raca is None:
+            return raca
+        return {campo: raca[campo] for campo in self.campos_raca}
+
+    def montar(self, linha, buscar_raca, racas=None):
+        """Cachorro/usuário de uma linha de `consulta()`, com a raça conforme `embed`.
+
+        `buscar_raca(raca_id)` devolve a raça completa ou None. No modo ref as raças
+        vão para o dicionário `racas` (uma por id) em vez de entrar no cachorro.
+        """
+        data = self.de_linha(linha)
+        if self.com_raca:
+            self.anexar_raca(data, linha[self._posicao_raca], buscar_raca, racas)
+        return data
+
+    def anexar_raca(self, data, raca_id, buscar_raca, racas=None):
+        """Põe a raça `raca_id` no cachorro (embed=breed) ou no mapa `racas` (embed=ref)."""
+        if self.embed == 'ref':
+            if raca_id not in racas:
+                raca = buscar_raca(raca_id)
+                racas[raca_id] = self.racas_de(raca) if raca is not None else None
+            return data
+        raca = buscar_raca(raca_id)
+        if raca is not None:
+            data['breed'] = self.racas_de(raca)
+        return data
+
+    @staticmethod
+    def mapa_racas(racas):
+        """Mapa `breeds` da resposta no modo ref (chaves em texto, como no JSON)."""
+        return {str(raca_id): raca for raca_id, raca in racas.items() if raca is not None}
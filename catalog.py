@@ -0,0 +1,168 @@
+# backend/catalog.py
+"""
+Catálogo de raças pré-calculado em memória.
+
+As raças mudam muito pouco (na prática só quando `seed_db.py` roda), mas
+`GET /racas` é a rota mais acessada pelo frontend. Em vez de consultar o
+SQLite, montar objetos ORM e serializar tudo a cada requisição, o catálogo
+guarda um "snapshot" com o JSON já codificado (bytes) da lista completa e
+de cada raça individualmente.
+
+Cada snapshot tem uma `versao`. Quando alguma `Raca` é inserida, alterada
+ou removida pela sessão do SQLAlchemy, o catálogo é invalidado após o
+commit e reconstruído de forma preguiçosa na próxima leitura.
+
+O snapshot também traz um índice de "slugs" (nome sem acentos, minúsculo e
+com hífens, como nos arquivos de `imagem`) para que `GET /racas/<nome_raca>`
+seja resolvido com um acesso a dicionário.
+
+Para as requisições condicionais (ETag), o snapshot guarda um hash do
+conteúdo da lista e de cada raça. Por depender só do conteúdo, o hash é o
+mesmo em todos os processos do servidor.
+
+Observação: escritas feitas por outro processo (ex: rodar `seed_db.py`
+com o servidor ligado) não são percebidas; nesse caso reinicie o servidor.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, object_session
+from database import Raca
+
+
+def hash_conteudo(dados):
+    """Hash curto (hexadecimal) de um conteúdo em bytes, usado nos ETags."""
+    return hashlib.sha1(dados).hexdigest()[:20]
+
+
+def slugify(texto):
+    """Normaliza um nome para o formato de slug usado nas URLs e imagens.
+
+    Ex: "Bulldog Francês" -> "bulldog-frances"
+        "Dachshund (Salsicha)" -> "dachshund-salsicha"
+    """
+    sem_acentos = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', sem_acentos.lower()).strip('-')
+
+
+class SnapshotCatalogo:
+    """Conteúdo imutável de uma versão do catálogo."""
+
+    def __init__(self, versao, racas, lista, por_id, por_slug):
+        self.versao = versao    # Número da versão (muda a cada reconstrução)
+        self.racas = racas      # Dicionários das raças indexados por id
+        self.lista = lista      # Bytes do JSON da lista completa (GET /racas)
+        self.por_id = por_id    # Bytes do JSON de cada raça, por id
+        self.por_slug = por_slug  # Slug normalizado -> id
+        self.etag = hash_conteudo(lista)  # Muda sempre que qualquer raça muda
+        self.etags = {raca_id: hash_conteudo(dados) for raca_id, dados in por_id.items()}
+
+    def buscar_slug(self, nome):
+        """Retorna o id da raça para um nome/slug qualquer, ou None."""
+        return self.por_slug.get(slugify(nome))
+
+
+class CatalogoRacas:
+    """Mantém o snapshot do catálogo de raças de uma aplicação Flask.
+
+    Uso:
+        catalogo = CatalogoRacas(app)
+        snapshot = catalogo.snapshot()  # dentro de um contexto de aplicação
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._versao = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['catalogo_racas'] = self
+
+    @property
+    def versao(self):
+        return self._versao
+
+    def carregar(self):
+        """Tenta montar o snapshot agora (usado na criação da app).
+
+        Se as tabelas ainda não existirem (ex: antes do `seed_db.py`), o
+        catálogo fica vazio e será montado na primeira leitura.
+        """
+        try:
+            self.snapshot()
+        except OperationalError:
+            pass
+
+    def snapshot(self):
+        """Retorna o snapshot atual, reconstruindo-o se foi invalidado."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._construir()
+            return self._snapshot
+
+    def invalidar(self):
+        """Descarta o snapshot atual; a próxima leitura monta uma nova versão."""
+        with self._lock:
+            self._snapshot = None
+            self._versao += 1
+
+    def _construir(self):
+        json = self.app.json
+        racas = {raca.id: raca.to_dict() for raca in Raca.query.order_by(Raca.id).all()}
+        # `json.response(...)` gera exatamente os mesmos bytes que `jsonify`
+        lista = json.response(list(racas.values())).get_data()
+        por_id = {raca_id: json.response(dados).get_data() for raca_id, dados in racas.items()}
+        return SnapshotCatalogo(self._versao, racas, lista, por_id, self._indexar_slugs(racas))
+
+    @staticmethod
+    def _indexar_slugs(racas):
+        # Indexa o slug do nome e o nome do arquivo da imagem (sem extensão),
+        # pois alguns arquivos usam um nome mais curto (ex: "labrador.png").
+        # O slug do nome tem prioridade em caso de colisão.
+        por_slug = {}
+        for raca_id, dados in racas.items():
+            por_slug.setdefault(slugify(dados['nome']), raca_id)
+        for raca_id, dados in racas.items():
+            if dados['imagem']:
+                stem = os.path.splitext(dados['imagem'])[0]
+                por_slug.setdefault(slugify(stem), raca_id)
+        return por_slug
+
+
+# --- Invalidação automática em escritas de Raca ---
+# Os eventos de mapper marcam a sessão; a invalidação só acontece depois do
+# commit, para que um rollback não descarte o snapshot sem necessidade.
+
+def _marcar_alteracao(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info['racas_alteradas'] = True
+
+
+for _evento in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(Raca, _evento, _marcar_alteracao)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_apos_commit(session):
+    if session.info.pop('racas_alteradas', False) and has_app_context():
+        catalogo = current_app.extensions.get('catalogo_racas')
+        if catalogo is not None:
+            catalogo.invalidar()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_marcacao(session):
+    session.info.pop('racas_alteradas', None)
@@ -0,0 +1,219 @@
+# backend/compression.py
+"""
+Compressão das respostas HTTP (gzip e, se instalados, brotli/zstd).
+
+As respostas da API são em boa parte textos longos em português (dados das
+raças, repetidos em cada cachorro), então comprimem muito bem. A extensão
+registra um `after_request` que:
+- negocia o algoritmo a partir do cabeçalho `Accept-Encoding`;
+- ignora respostas pequenas (`COMPRESSAO_TAMANHO_MINIMO`) e tipos que já
+  são comprimidos (imagens, por exemplo);
+- guarda em cache os corpos comprimidos das respostas marcadas com
+  `comprimir_com_cache` (arquivos estáticos do frontend e o catálogo de
+  raças, cujo ETag identifica o conteúdo em qualquer URL), evitando
+  recomprimir o mesmo conteúdo a cada requisição. As respostas dinâmicas
+  da API não entram no cache: são comprimidas a cada vez;
+- comprime respostas em streaming parte por parte, sem juntá-las.
+
+Os pacotes `brotli` e `zstandard` são opcionais: se não estiverem
+instalados, apenas gzip é oferecido.
+"""
+
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+from flask import request
+from conditional import etag_codificado
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependência opcional
+    zstandard = None
+
+
+MIMETYPES_COMPRIMIVEIS = {
+    'application/json', 'application/x-ndjson', 'application/javascript',
+    'application/yaml', 'application/x-yaml', 'text/html', 'text/css',
+    'text/plain', 'text/csv', 'text/javascript', 'text/yaml', 'image/svg+xml',
+}
+
+
+class _Gzip:
+    nome = 'gzip'
+
+    def __init__(self, nivel):
+        self.nivel = nivel
+
+    def comprimir(self, dados):
+        # mtime=0 deixa a saída determinística (mesmo conteúdo -> mesmos bytes)
+        return gzip.compress(dados, compresslevel=self.nivel, mtime=0)
+
+    def fluxo(self, partes):
+        compressor = zlib.compressobj(self.nivel, zlib.DEFLATED, 31)  # 31 = formato gzip
+        for parte in partes:
+            dados = compressor.compress(parte) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if dados:
+                yield dados
+        yield compressor.flush()
+
+
+class _Brotli:
+    nome = 'br'
+
+    def __init__(self, nivel):
+        # A escala do brotli vai até 11; níveis baixos já comprimem bem e são rápidos.
+        self.nivel = min(nivel, 11)
+
+    def comprimir(self, dados):
+        return brotli.compress(dados, quality=self.nivel)
+
+    def fluxo(self, partes):
+        compressor = brotli.Compressor(quality=self.nivel)
+        for parte in partes:
+            dados = compressor.process(parte) + compressor.flush()
+            if dados:
+                yield dados
+        yield compressor.finish()
+
+
+class _Zstd:
+    nome = 'zstd'
+
+    def __init__(self, nivel):
+        self.nivel = nivel
+
+    def comprimir(self, dados):
+        return zstandard.ZstdCompressor(level=self.nivel).compress(dados)
+
+    def fluxo(self, partes):
+        compressor = zstandard.ZstdCompressor(level=self.nivel).compressobj()
+        for parte in partes:
+            dados = compressor.compress(parte) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            if dados:
+                yield dados
+        yield compressor.flush()
+
+
+def comprimir_com_cache(response):
+    """Marca uma resposta para o cache de corpos comprimidos e a devolve.
+
+    Só para conteúdo identificado pelo ETag (o mesmo ETag é sempre o mesmo
+    corpo): arquivos estáticos e o catálogo de raças.
+    """
+    response.comprimir_com_cache = True
+    return response
+
+
+class CacheComprimidos:
+    """Cache LRU (limitado em bytes) de corpos comprimidos, por (ETag, algoritmo)."""
+
+    def __init__(self, limite_bytes):
+        self.limite_bytes = limite_bytes
+        self._itens = OrderedDict()
+        self._tamanho = 0
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        with self._lock:
+            dados = self._itens.get(chave)
+            if dados is not None:
+                self._itens.move_to_end(chave)
+            return dados
+
+    def guardar(self, chave, dados):
+        if len(dados) > self.limite_bytes:
+            return
+        with self._lock:
+            if chave in self._itens:
+                return
+            self._itens[chave] = dados
+            self._tamanho += len(dados)
+            while self._tamanho > self.limite_bytes:
+                _, removido = self._itens.popitem(last=False)
+                self._tamanho -= len(removido)
+
+
+class Compressao:
+    """Extensão Flask que comprime as respostas conforme o `Accept-Encoding`.
+
+    Configuração:
+        COMPRESSAO_ATIVA:           liga/desliga a compressão (padrão: True)
+        COMPRESSAO_NIVEL:           nível de compressão (padrão: 6)
+        COMPRESSAO_TAMANHO_MINIMO:  tamanho mínimo do corpo, em bytes (padrão: 500)
+        COMPRESSAO_CACHE_BYTES:     limite do cache de corpos comprimidos (padrão: 32 MB)
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESSAO_ATIVA', True)
+        app.config.setdefault('COMPRESSAO_NIVEL', 6)
+        app.config.setdefault('COMPRESSAO_TAMANHO_MINIMO', 500)
+        app.config.setdefault('COMPRESSAO_CACHE_BYTES', 32 * 1024 * 1024)
+        self.tamanho_minimo = app.config['COMPRESSAO_TAMANHO_MINIMO']
+        nivel = app.config['COMPRESSAO_NIVEL']
+        # Ordem de preferência do servidor quando o cliente aceita mais de um
+        self.algoritmos = OrderedDict()
+        if brotli is not None:
+            self.algoritmos['br'] = _Brotli(nivel)
+        if zstandard is not None:
+            self.algoritmos['zstd'] = _Zstd(nivel)
+        self.algoritmos['gzip'] = _Gzip(nivel)
+        self.cache = CacheComprimidos(app.config['COMPRESSAO_CACHE_BYTES'])
+        app.extensions['compressao'] = self
+        if app.config['COMPRESSAO_ATIVA']:
+            app.after_request(self._comprimir)
+
+    def escolher_algoritmo(self):
+        """Escolhe o algoritmo a partir do `Accept-Encoding` da requisição (ou None)."""
+        aceitos = request.accept_encodings
+        for nome, algoritmo in self.algoritmos.items():
+            if aceitos[nome] > 0:  # Considera também o curinga '*'
+                return algoritmo
+        return None
+
+    def _comprimir(self, response):
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or request.method == 'HEAD'
+                or response.mimetype not in MIMETYPES_COMPRIMIVEIS
+                or 'Content-Encoding' in response.headers
+                or 'no-transform' in response.headers.get('Cache-Control', '')):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        algoritmo = self.escolher_algoritmo()
+        if algoritmo is None:
+            return response
+
+        if response.is_streamed and not response.direct_passthrough:
+            # Streaming (ex: exportações): comprime cada parte assim que é gerada
+            response.response = algoritmo.fluxo(response.iter_encoded())
+            response.headers.pop('Content-Length', None)
+        else:
+            # Corpo completo. Arquivos enviados com send_file são lidos uma única vez
+            # e, se marcados com `comprimir_com_cache`, o resultado comprimido fica no cache.
+            response.direct_passthrough = False
+            etag, _ = response.get_etag()
+            chave = (etag, algoritmo.nome) if etag and getattr(response, 'comprimir_com_cache', False) else None
+            comprimido = self.cache.obter(chave) if chave else None
+            if comprimido is None:
+                dados = response.get_data()
+                if len(dados) < self.tamanho_minimo:
+                    return response
+                comprimido = algoritmo.comprimir(dados)
+                if chave:
+                    self.cache.guardar(chave, comprimido)
+            response.set_data(comprimido)
+            if etag:
+                # Cada codificação é uma representação diferente: recebe um ETag próprio
+                response.set_etag(etag_codificado(etag, algoritmo.nome))
+        response.headers['Content-Encoding'] = algoritmo.nome
+        return response
@@ -0,0 +1,89 @@
+# backend/conditional.py
+"""
+Requisições HTTP condicionais (ETag / Last-Modified / 304 / 412).
+
+O frontend consulta as mesmas rotas repetidamente. Cada resposta de leitura
+leva um ETag forte (derivado da versão do registro) e, quando existe, um
+Last-Modified. Se o cliente reenviar esses valores em `If-None-Match` ou
+`If-Modified-Since` e nada tiver mudado, a rota responde 304 sem corpo.
+
+Nas rotas PUT, o cabeçalho `If-Match` permite controle de concorrência
+otimista: a atualização só é aplicada se a versão do cliente for a atual.
+"""
+
+from datetime import timezone
+from flask import request
+
+# Codificações de conteúdo usadas pela compressão (ver `compression.py`).
+# A versão comprimida de uma resposta recebe o ETag "<etag>-<codificação>".
+CODIFICACOES = ('gzip', 'br', 'zstd')
+
+
+def etag_codificado(etag, codificacao):
+    """ETag da representação comprimida de uma resposta."""
+    return f'{etag}-{codificacao}'
+
+
+def tem_condicional():
+    """Indica se a requisição trouxe `If-None-Match` ou `If-Modified-Since`."""
+    return bool(request.if_none_match) or request.if_modified_since is not None
+
+
+def _utc(data):
+    # As datas do banco são gravadas em UTC sem fuso; o HTTP trabalha em segundos inteiros.
+    return data.replace(tzinfo=timezone.utc, microsecond=0) if data is not None else None
+
+
+def _etag_do_cliente(etag):
+    """Qual ETag do recurso (o simples ou o de uma versão comprimida) veio em `If-None-Match`, ou None."""
+    for candidato in (etag, *(etag_codificado(etag, c) for c in CODIFICACOES)):
+        if request.if_none_match.contains_weak(candidato):
+            return candidato
+    return None
+
+
+def nao_modificado(etag, modificado_em=None):
+    """Retorna True se a cópia do cliente ainda é válida (resposta 304).
+
+    Quando `If-None-Match` está presente ele tem prioridade sobre
+    `If-Modified-Since`, como determina a RFC 9110.
+    """
+    if request.if_none_match:
+        # O cliente pode reenviar o ETag da versão comprimida que recebeu
+        return _etag_do_cliente(etag) is not None
+    if modificado_em is not None and request.if_modified_since is not None:
+        return _utc(modificado_em) <= request.if_modified_since
+    return False
+
+
+def aplicar_validadores(response, etag, modificado_em=None):
+    """Adiciona `ETag` (e `Last-Modified`, se houver) a uma resposta."""
+    response.set_etag(etag)
+    if modificado_em is not None:
+        response.last_modified = _utc(modificado_em)
+    return response
+
+
+def resposta_nao_modificada(response_class, etag, modificado_em=None):
+    """Cria a resposta 304 (sem corpo) com os mesmos validadores.
+
+    O ETag é o da representação que o cliente tem: se ele revalidou a versão
+    comprimida ("<etag>-gzip"), o 304 traz esse mesmo ETag, como o 200 trouxe.
+    """
+    if request.if_none_match:
+        etag = _etag_do_cliente(etag) or etag
+    return aplicar_validadores(response_class(status=304), etag, modificado_em)
+
+
+def etags_if_match():
+    """Retorna as ETags enviadas em `If-Match`.
+
+    - None: cabeçalho ausente (sem pré-condição);
+    - '*': qualquer versão existente serve;
+    - lista de strings: as ETags aceitas pelo cliente.
+    """
+    if not request.if_match:
+        return None
+    if request.if_match.star_tag:
+        return '*'
+    return list(request.if_match)
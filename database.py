@@ -12,13 +12,52 @@ permite usar os modelos em scripts de seed ou testes sem criar uma
 instância global do Flask imediatamente.
 """
 
+from flask import current_app, has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import String, inspect, select, type_coerce
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
 from datetime import datetime
 
+# Métodos HTTP cujas consultas podem ir para o engine somente leitura
+METODOS_LEITURA = ('GET', 'HEAD')
+
+
+class SessaoRoteada(Session):
+    """Sessão que envia as consultas das requisições GET para o engine de leitura.
+
+    O engine somente leitura (`app.extensions['engine_leitura']`, criado por
+    `sqlite_config.criar_engine_leitura`) tem um pool próprio; assim as
+    leituras não disputam conexões com as escritas. Tudo o mais (POST/PUT/
+    DELETE, scripts sem requisição) usa o engine principal.
+
+    Leia-o-que-escreveu: assim que a sessão tem algo a gravar ou executa um
+    INSERT/UPDATE/DELETE, ela passa a usar o engine principal até o fim da
+    requisição (a sessão é descartada ao fim do contexto da aplicação).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._usar_leitura(clause):
+            engine = current_app.extensions.get('engine_leitura')
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _usar_leitura(self, clause):
+        if self.info.get('escreveu') or not has_request_context() or request.method not in METODOS_LEITURA:
+            return False
+        if isinstance(clause, UpdateBase) or self.new or self.dirty or self.deleted or (
+                isinstance(clause, TextClause) and not clause.text.lstrip().upper().startswith(('SELECT', 'WITH'))):
+            self.info['escreveu'] = True
+            return False
+        return True
+
+
 # Inicializa o objeto SQLAlchemy, mas não o vincula a um aplicativo Flask ainda.
 # O vínculo é feito pela fábrica de aplicação em `app.py` para permitir testes
 # e execução de scripts auxiliares (por exemplo, `seed_db.py`).
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': SessaoRoteada})
 
 # Modelo para o Usuário - Representa a tabela 'user' no banco de dados
 class User(db.Model):
@@ -35,6 +74,11 @@ class User(db.Model):
     
     data_cadastro = db.Column(db.DateTime, nullable=False, default=datetime.utcnow) # Data de cadastro, preenchida automaticamente em UTC
 
+    # Controle de versão do registro (usado nos ETags e no If-Match das rotas).
+    # 'versao' é incrementada pelo próprio UPDATE; 'atualizado_em' guarda a data da última alteração.
+    versao = db.Column(db.Integer, nullable=False, default=1, server_default='1', onupdate=db.text('versao + 1'))
+    atualizado_em = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+
     # Método para converter o objeto User em um dicionário, útil para JSON.
     def to_dict(self):
         return {
@@ -87,6 +131,10 @@ class Cachorro(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False) # ID do usuário proprietário
     raca_id = db.Column(db.Integer, db.ForeignKey('raca.id'), nullable=False) # ID da raça do cachorro
 
+    # Controle de versão do registro (ver comentário em User)
+    versao = db.Column(db.Integer, nullable=False, default=1, server_default='1', onupdate=db.text('versao + 1'))
+    atualizado_em = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+
     # Método para converter o objeto Cachorro em um dicionário.
     # 'include_owner' e 'include_breed' permitem incluir os dados completos do owner/breed no dicionário, se necessário.
     def to_dict(self, include_owner=False, include_breed=False):
@@ -107,3 +155,156 @@ class Cachorro(db.Model):
         if include_breed and self.breed:
             data['breed'] = self.breed.to_dict()
         return data
+
+
+# --- Serialização direta de linhas (leitura rápida, sem objetos ORM) ---
+# As rotas GET só precisam dos dados em JSON. Montar instâncias do ORM (mapa de
+# identidade, estado de cada atributo) para jogá-las fora logo depois do
+# `to_dict()` custa caro em listas longas. Aqui as consultas são `select()`
+# de colunas, e cada tupla vira diretamente o mesmo dicionário do `to_dict()`.
+#
+# As datas são lidas como o texto gravado pelo SQLite ('AAAA-MM-DD HH:MM:SS.ffffff')
+# e convertidas para o formato ISO 8601 com 'Z' apenas com operações de string,
+# sem criar objetos datetime.
+#
+# Uso:
+#     linhas = executar(consulta_cachorros(include_breed=True).where(Cachorro.user_id == 1))
+#     dados = [cachorro_de_linha(linha, include_breed=True) for linha in linhas]
+
+def _como_texto(coluna):
+    """Lê a coluna DateTime como texto (evita o parse para datetime)."""
+    return type_coerce(coluna, String)
+
+
+def data_iso(texto):
+    """Converte a data gravada no SQLite para o formato de `isoformat() + 'Z'`."""
+    if texto is None:
+        return None
+    if len(texto) >= 19 and texto[10] == ' ':
+        texto = texto[:10] + 'T' + texto[11:]
+        # isoformat() omite os microssegundos quando são zero
+        return (texto[:-7] if texto.endswith('.000000') else texto) + 'Z'
+    return datetime.fromisoformat(texto).isoformat() + 'Z'  # Formato inesperado: caminho lento
+
+
+USUARIO_COLUNAS = (User.id, User.nome_completo, User.email, User.telefone, _como_texto(User.data_cadastro))
+RACA_COLUNAS = (Raca.id, Raca.nome, Raca.porte, Raca.grupo, Raca.imagem,
+                Raca.cuidados, Raca.comportamento, Raca.racao)
+CACHORRO_COLUNAS = (Cachorro.id, Cachorro.nome_pet, Cachorro.idade, Cachorro.peso, Cachorro.info_extra,
+                    _como_texto(Cachorro.data_registro), Cachorro.user_id, Cachorro.raca_id)
+
+
+def usuario_de_linha(linha, inicio=0):
+    """Mesmo formato de `User.to_dict()`, a partir das colunas `USUARIO_COLUNAS`."""
+    id_, nome_completo, email, telefone, data_cadastro = linha[inicio:inicio + 5]
+    return {
+        'id': id_,
+        'nome_completo': nome_completo,
+        'email': email,
+        'telefone': telefone,
+        'data_cadastro': data_iso(data_cadastro),
+    }
+
+
+def raca_de_linha(linha, inicio=0):
+    """Mesmo formato de `Raca.to_dict()`, a partir das colunas `RACA_COLUNAS`."""
+    id_, nome, porte, grupo, imagem, cuidados, comportamento, racao = linha[inicio:inicio + 8]
+    return {
+        'id': id_,
+        'nome': nome,
+        'porte': porte,
+        'grupo': grupo,
+        'imagem': imagem,
+        'cuidados': cuidados,
+        'comportamento': comportamento,
+        'racao': racao,
+    }
+
+
+def consulta_usuarios(*extras):
+    """SELECT das colunas de `User.to_dict()`; `extras` são colunas adicionais no fim da linha."""
+    return select(*USUARIO_COLUNAS, *extras)
+
+
+def consulta_cachorros(include_owner=False, include_breed=False, *extras):
+    """SELECT das colunas de `Cachorro.to_dict(include_owner, include_breed)`.
+
+    O dono e a raça vêm por LEFT JOIN (como no `to_dict`, ficam de fora se não
+    existirem). `extras` são colunas adicionais colocadas no fim da linha.
+    """
+    colunas = list(CACHORRO_COLUNAS)
+    if include_owner:
+        colunas.extend(USUARIO_COLUNAS)
+    if include_breed:
+        colunas.extend(RACA_COLUNAS)
+    consulta = select(*colunas, *extras).select_from(Cachorro)
+    if include_owner:
+        consulta = consulta.outerjoin(User, User.id == Cachorro.user_id)
+    if include_breed:
+        consulta = consulta.outerjoin(Raca, Raca.id == Cachorro.raca_id)
+    return consulta
+
+
+def cachorro_de_linha(linha, include_owner=False, include_breed=False):
+    """Mesmo formato de `Cachorro.to_dict()`, a partir de uma linha de `consulta_cachorros()`."""
+    id_, nome_pet, idade, peso, info_extra, data_registro, user_id, raca_id = linha[:8]
+    data = {
+        'id': id_,
+        'nome_pet': nome_pet,
+        'idade': idade,
+        'peso': peso,
+        'info_extra': info_extra,
+        'data_registro': data_iso(data_registro),
+        'user_id': user_id,
+        'raca_id': raca_id
+    }
+    inicio = 8
+    if include_owner:
+        if linha[inicio] is not None:
+            data['owner'] = usuario_de_linha(linha, inicio)
+        inicio += len(USUARIO_COLUNAS)
+    if include_breed and linha[inicio] is not None:
+        data['breed'] = raca_de_linha(linha, inicio)
+    return data
+
+
+def executar(consulta, **opcoes):
+    """Executa uma consulta de colunas direto na conexão da sessão (sem o ORM).
+
+    `opcoes` são opções de execução, ex: `yield_per=500` para ler em blocos.
+    """
+    if opcoes:
+        consulta = consulta.execution_options(**opcoes)
+    return db.session.connection().execute(consulta)
+
+
+# Colunas adicionadas aos modelos depois que as tabelas já existiam em produção.
+# `db.create_all()` não altera tabelas existentes, então `atualizar_esquema()`
+# adiciona essas colunas com ALTER TABLE quando estiverem faltando.
+COLUNAS_ADICIONADAS = {
+    'user': {
+        'versao': 'INTEGER NOT NULL DEFAULT 1',
+        'atualizado_em': 'DATETIME',
+    },
+    'cachorro': {
+        'versao': 'INTEGER NOT NULL DEFAULT 1',
+        'atualizado_em': 'DATETIME',
+    },
+}
+
+
+def atualizar_esquema():
+    """Adiciona às tabelas existentes as colunas novas dos modelos (migração leve).
+
+    Deve ser chamada dentro de um contexto de aplicação. Tabelas que ainda não
+    existem são ignoradas: elas serão criadas completas por `db.create_all()`.
+    """
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for tabela, colunas in COLUNAS_ADICIONADAS.items():
+            if not inspector.has_table(tabela):
+                continue
+            existentes = {coluna['name'] for coluna in inspector.get_columns(tabela)}
+            for nome, definicao in colunas.items():
+                if nome not in existentes:
+                    conn.exec_driver_sql(f'ALTER TABLE "{tabela}" ADD COLUMN {nome} {definicao}')
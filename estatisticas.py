@@ -0,0 +1,214 @@
+# backend/estatisticas.py
+"""
+Estatísticas dos cachorros mantidas de forma incremental.
+
+Relatórios como "cachorros por raça", "peso/idade média por porte" e
+"usuários com mais cachorros" exigiriam varrer todos os cachorros a cada
+consulta. Em vez disso, duas tabelas de resumo guardam os agregados:
+
+- `estatistica_raca`: por `raca_id`, a quantidade de cachorros e, para
+  `peso` e `idade`, quantos têm o valor preenchido, a soma e a soma dos
+  quadrados (dá a média e o desvio padrão sem reler os cachorros);
+- `estatistica_usuario`: por `user_id`, a quantidade de cachorros (com um
+  índice para o ranking).
+
+Gatilhos (triggers) em `cachorro` atualizam os resumos dentro da mesma
+transação de cada INSERT, UPDATE ou DELETE, inclusive os cachorros
+removidos em cascata por `DELETE /usuarios/<id>`. As estatísticas por porte
+são somadas a partir das raças na consulta (O(raças)), de modo que mudar o
+porte de uma raça não exige recalcular nada.
+
+As tabelas são criadas junto com a tabela `cachorro` (`db.create_all()`) e,
+em bancos antigos, por `create_app()` (`garantir_estatisticas`). A
+reconstrução recalcula tudo a partir de `cachorro` (ex: depois de uma carga
+feita com os gatilhos desligados, como em `gerar_dados.py`).
+
+Uso:
+    python estatisticas.py                      # mostra as estatísticas (JSON)
+    python estatisticas.py --reconstruir        # recalcula os resumos
+    python estatisticas.py --banco /tmp/grande.db --reconstruir
+"""
+
+import argparse
+import json
+import math
+import os
+from sqlalchemy import event, text
+from database import Cachorro
+
+TABELAS = [
+    """CREATE TABLE IF NOT EXISTS estatistica_raca (
+        raca_id INTEGER PRIMARY KEY,
+        quantidade INTEGER NOT NULL DEFAULT 0,
+        qtd_peso INTEGER NOT NULL DEFAULT 0,
+        soma_peso REAL NOT NULL DEFAULT 0,
+        soma_peso2 REAL NOT NULL DEFAULT 0,
+        qtd_idade INTEGER NOT NULL DEFAULT 0,
+        soma_idade REAL NOT NULL DEFAULT 0,
+        soma_idade2 REAL NOT NULL DEFAULT 0
+    )""",
+    """CREATE TABLE IF NOT EXISTS estatistica_usuario (
+        user_id INTEGER PRIMARY KEY,
+        quantidade INTEGER NOT NULL
+    )""",
+    'CREATE INDEX IF NOT EXISTS ix_estatistica_usuario_quantidade ON estatistica_usuario (quantidade DESC, user_id)',
+]
+
+
+def _somar(registro, sinal):
+    """Comandos que somam (sinal '+') ou subtraem ('-') um cachorro (`new`/`old`) dos resumos."""
+    r = registro
+    return f"""
+        INSERT INTO estatistica_raca (raca_id) VALUES ({r}.raca_id) ON CONFLICT (raca_id) DO NOTHING;
+        UPDATE estatistica_raca SET
+            quantidade = quantidade {sinal} 1,
+            qtd_peso = qtd_peso {sinal} ({r}.peso IS NOT NULL),
+            soma_peso = soma_peso {sinal} coalesce({r}.peso, 0),
+            soma_peso2 = soma_peso2 {sinal} coalesce({r}.peso * {r}.peso, 0),
+            qtd_idade = qtd_idade {sinal} ({r}.idade IS NOT NULL),
+            soma_idade = soma_idade {sinal} coalesce({r}.idade, 0),
+            soma_idade2 = soma_idade2 {sinal} coalesce({r}.idade * {r}.idade, 0)
+        WHERE raca_id = {r}.raca_id;
+        INSERT INTO estatistica_usuario (user_id, quantidade) VALUES ({r}.user_id, {sinal}1)
+            ON CONFLICT (user_id) DO UPDATE SET quantidade = quantidade {sinal} 1;
+        DELETE FROM estatistica_usuario WHERE user_id = {r}.user_id AND quantidade <= 0;"""
+
+
+GATILHOS = {
+    'estatistica_cachorro_insert': f"""CREATE TRIGGER IF NOT EXISTS estatistica_cachorro_insert
+        AFTER INSERT ON cachorro BEGIN {_somar('new', '+')}
+    END""",
+    'estatistica_cachorro_delete': f"""CREATE TRIGGER IF NOT EXISTS estatistica_cachorro_delete
+        AFTER DELETE ON cachorro BEGIN {_somar('old', '-')}
+    END""",
+    # Só quando muda algo que entra nos resumos (não a cada alteração de nome/info_extra)
+    'estatistica_cachorro_update': f"""CREATE TRIGGER IF NOT EXISTS estatistica_cachorro_update
+        AFTER UPDATE OF peso, idade, raca_id, user_id ON cachorro BEGIN {_somar('old', '-')} {_somar('new', '+')}
+    END""",
+}
+
+RECONSTRUCAO = [
+    'DELETE FROM estatistica_raca',
+    'DELETE FROM estatistica_usuario',
+    """INSERT INTO estatistica_raca
+        (raca_id, quantidade, qtd_peso, soma_peso, soma_peso2, qtd_idade, soma_idade, soma_idade2)
+        SELECT raca_id, count(*), count(peso), coalesce(sum(peso), 0), coalesce(sum(peso * peso), 0),
+               count(idade), coalesce(sum(idade), 0), coalesce(sum(idade * idade), 0)
+        FROM cachorro GROUP BY raca_id""",
+    'INSERT INTO estatistica_usuario (user_id, quantidade) SELECT user_id, count(*) FROM cachorro GROUP BY user_id',
+]
+
+CONSULTA_RACAS = text(
+    'SELECT r.id, r.nome, r.porte, e.quantidade, e.qtd_peso, e.soma_peso, e.soma_peso2, '
+    'e.qtd_idade, e.soma_idade, e.soma_idade2 '
+    'FROM raca r LEFT JOIN estatistica_raca e ON e.raca_id = r.id ORDER BY r.id'
+)
+CONSULTA_RANKING = text(
+    'SELECT e.user_id, u.nome_completo, e.quantidade FROM estatistica_usuario e '
+    'JOIN user u ON u.id = e.user_id ORDER BY e.quantidade DESC, e.user_id LIMIT :limite'
+)
+CONSULTA_USUARIOS = text('SELECT count(*) FROM estatistica_usuario')
+
+
+def criar_estatisticas(conexao):
+    """Cria as tabelas de resumo e os gatilhos, se ainda não existirem.
+
+    Retorna True se as tabelas acabaram de ser criadas (e precisam ser preenchidas).
+    """
+    existia = conexao.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'estatistica_raca'").first() is not None
+    for comando in TABELAS + list(GATILHOS.values()):
+        conexao.exec_driver_sql(comando)
+    return not existia
+
+
+def reconstruir_estatisticas(conexao):
+    """Recalcula os resumos a partir da tabela `cachorro`."""
+    for comando in RECONSTRUCAO:
+        conexao.exec_driver_sql(comando)
+
+
+@event.listens_for(Cachorro.__table__, 'after_create')
+def _criar_com_tabela(tabela, conexao, **kw):
+    # `db.create_all()` cria os resumos junto com a tabela `cachorro`
+    if conexao.dialect.name == 'sqlite':
+        criar_estatisticas(conexao)
+
+
+def garantir_estatisticas(engine):
+    """Cria e preenche os resumos em bancos antigos que já têm cachorros mas não os resumos."""
+    if engine.dialect.name != 'sqlite':
+        return
+    with engine.begin() as conexao:
+        tem_cachorros = conexao.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cachorro'").first() is not None
+        if tem_cachorros and criar_estatisticas(conexao):
+            reconstruir_estatisticas(conexao)
+
+
+def _medidas(quantidade, soma, soma2):
+    """Média e desvio padrão (populacional) a partir da quantidade, soma e soma dos quadrados."""
+    if not quantidade:
+        return {'quantidade': 0, 'media': None, 'desvio_padrao': None}
+    media = soma / quantidade
+    variancia = max(0.0, soma2 / quantidade - media * media)  # Evita negativo por arredondamento
+    return {'quantidade': quantidade, 'media': round(media, 2), 'desvio_padrao': round(math.sqrt(variancia), 2)}
+
+
+def _resumo(quantidade, qtd_peso, soma_peso, soma_peso2, qtd_idade, soma_idade, soma_idade2):
+    return {
+        'cachorros': quantidade,
+        'peso': _medidas(qtd_peso, soma_peso, soma_peso2),
+        'idade': _medidas(qtd_idade, soma_idade, soma_idade2),
+    }
+
+
+def consultar_estatisticas(conexao, top=10):
+    """Monta o relatório: total, por raça, por porte e usuários com mais cachorros.
+
+    Lê só as tabelas de resumo (uma linha por raça e `top` usuários).
+    """
+    por_raca, por_porte = [], {}
+    total = [0] * 7
+    for linha in conexao.execute(CONSULTA_RACAS):
+        raca_id, nome, porte = linha[:3]
+        valores = [valor or 0 for valor in linha[3:]]
+        por_raca.append({'raca_id': raca_id, 'nome': nome, 'porte': porte, **_resumo(*valores)})
+        acumulado = por_porte.setdefault(porte, [0] * 7)
+        for indice, valor in enumerate(valores):
+            acumulado[indice] += valor
+            total[indice] += valor
+    ranking = [{'user_id': user_id, 'nome_completo': nome, 'cachorros': quantidade}
+               for user_id, nome, quantidade in conexao.execute(CONSULTA_RANKING, {'limite': top})]
+    return {
+        'total': {**_resumo(*total), 'usuarios_com_cachorros': conexao.execute(CONSULTA_USUARIOS).scalar()},
+        'por_raca': por_raca,
+        'por_porte': [{'porte': porte, **_resumo(*valores)}
+                      for porte, valores in sorted(por_porte.items(), key=lambda item: item[0] or '')],
+        'usuarios_com_mais_cachorros': ranking,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mostra ou reconstrói as estatísticas dos cachorros.')
+    parser.add_argument('--banco', help='arquivo SQLite alternativo (padrão: instance/site.db)')
+    parser.add_argument('--reconstruir', action='store_true', help='recalcula os resumos a partir de `cachorro`')
+    parser.add_argument('--top', type=int, default=10, help='usuários no ranking (padrão: 10)')
+    args = parser.parse_args()
+
+    from app import create_app  # Importado aqui: `app.py` também importa este módulo
+    from database import db
+    config = {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(args.banco)}'} if args.banco else None
+    app = create_app(config)
+    with app.app_context():
+        if args.reconstruir:
+            with db.engine.begin() as conexao:
+                criar_estatisticas(conexao)
+                reconstruir_estatisticas(conexao)
+            print('Estatísticas reconstruídas.')
+        with db.engine.connect() as conexao:
+            print(json.dumps(consultar_estatisticas(conexao, args.top), indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+# backend/export.py
+"""
+Exportação de usuários e cachorros em NDJSON ou CSV, com memória constante.
+
+Até aqui os dados eram extraídos à mão para CSV (ver `migrations/`). As
+funções daqui leem a tabela em ordem de `id` com um cursor do banco
+consumido em blocos (`yield_per`) e geram o arquivo parte por parte: a
+memória usada depende do tamanho da parte, não do número de registros.
+
+- NDJSON: um objeto por linha, no mesmo formato das rotas GET (`to_dict`),
+  com `owner` e `breed` aninhados quando pedidos;
+- CSV: uma coluna por campo; os campos do dono e da raça entram com os
+  prefixos `owner_` e `breed_`.
+
+Filtros para exportações incrementais: faixa de `id` (`id_min`/`id_max`,
+inclusivos) e de data de registro/cadastro (`since` inclusivo, `until`
+exclusivo). Guardar o maior `id` exportado e usá-lo como `id_min` + 1 na
+próxima vez exporta só o que é novo, usando a chave primária.
+
+Usado pelas rotas `GET /export/usuarios` e `GET /export/cachorros` e pela
+linha de comando.
+
+Uso:
+    python export.py cachorros --formato csv --include owner,breed --saida cachorros.csv
+    python export.py usuarios --since 2025-11-01 > usuarios.ndjson
+    python export.py cachorros --id-min 1001 --banco /tmp/grande.db --saida novos.ndjson
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from database import (User, Cachorro, consulta_usuarios, consulta_cachorros, usuario_de_linha,
+                      cachorro_de_linha, executar)
+
+# Tipos MIME dos formatos de exportação
+MIMETYPES_EXPORTACAO = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Registros lidos do cursor e enviados em cada parte
+REGISTROS_POR_PARTE = 1000
+
+# Campos de cada registro, na ordem das colunas do CSV
+CAMPOS_USUARIO = ['id', 'nome_completo', 'email', 'telefone', 'data_cadastro']
+CAMPOS_RACA = ['id', 'nome', 'porte', 'grupo', 'imagem', 'cuidados', 'comportamento', 'racao']
+CAMPOS_CACHORRO = ['id', 'nome_pet', 'idade', 'peso', 'info_extra', 'data_registro', 'user_id', 'raca_id']
+
+RECURSOS = ('usuarios', 'cachorros')
+INCLUSOES = ('owner', 'breed')
+
+
+def ler_data(texto):
+    """Converte uma data/hora ISO 8601 ('2025-11-17' ou '2025-11-17T05:07:39Z') em datetime UTC sem fuso.
+
+    As datas são gravadas em UTC sem fuso (`datetime.utcnow`); um fuso explícito é convertido para UTC.
+    """
+    data = datetime.fromisoformat(texto.strip().removesuffix('Z').replace(' ', 'T'))
+    if data.tzinfo is not None:
+        data = data.astimezone(timezone.utc).replace(tzinfo=None)
+    return data
+
+
+def consulta_exportacao(recurso, include=(), id_min=None, id_max=None, since=None, until=None):
+    """Monta a consulta (em ordem de id) e a função que converte cada linha em dicionário."""
+    if recurso == 'usuarios':
+        modelo, data = User, User.data_cadastro
+        consulta = consulta_usuarios()
+        serializar = usuario_de_linha
+    else:
+        modelo, data = Cachorro, Cachorro.data_registro
+        include_owner, include_breed = 'owner' in include, 'breed' in include
+        consulta = consulta_cachorros(include_owner, include_breed)
+
+        def serializar(linha):
+            return cachorro_de_linha(linha, include_owner, include_breed)
+
+    if id_min is not None:
+        consulta = consulta.where(modelo.id >= id_min)
+    if id_max is not None:
+        consulta = consulta.where(modelo.id <= id_max)
+    if since is not None:
+        consulta = consulta.where(data >= since)
+    if until is not None:
+        consulta = consulta.where(data < until)
+    return consulta.order_by(modelo.id), serializar
+
+
+def cabecalho_csv(recurso, include=()):
+    """Colunas do CSV de um recurso (com os campos do dono e da raça, se incluídos)."""
+    if recurso == 'usuarios':
+        return list(CAMPOS_USUARIO)
+    colunas = list(CAMPOS_CACHORRO)
+    if 'owner' in include:
+        colunas += ['owner_' + campo for campo in CAMPOS_USUARIO]
+    if 'breed' in include:
+        colunas += ['breed_' + campo for campo in CAMPOS_RACA]
+    return colunas
+
+
+def achatar(registro):
+    """{'id': 1, 'owner': {'email': ...}} -> {'id': 1, 'owner_email': ...} (CSV e `importacao.py`)."""
+    plano = {}
+    for chave, valor in registro.items():
+        if isinstance(valor, dict):
+            for subchave, subvalor in valor.items():
+                plano[f'{chave}_{subchave}'] = subvalor
+        else:
+            plano[chave] = valor
+    return plano
+
+
+def exportar(recurso, formato='ndjson', include=(), dumps=None, registros_por_parte=REGISTROS_POR_PARTE,
+             **filtros):
+    """Gera o conteúdo da exportação (texto), parte por parte.
+
+    - `dumps`: função que serializa um registro no NDJSON (ex: `app.json.dumps`);
+    - `filtros`: `id_min`, `id_max`, `since` e `until` (ver `consulta_exportacao`).
+
+    Deve ser consumido dentro de um contexto de aplicação: a consulta só é
+    executada na primeira iteração e o cursor é lido em blocos.
+    """
+    consulta, serializar = consulta_exportacao(recurso, include, **filtros)
+    linhas = executar(consulta, yield_per=registros_por_parte)
+
+    if formato == 'csv':
+        buffer = io.StringIO()
+        escritor = csv.DictWriter(buffer, fieldnames=cabecalho_csv(recurso, include), lineterminator='\n')
+        escritor.writeheader()
+        for bloco in linhas.partitions():
+            escritor.writerows(achatar(serializar(linha)) for linha in bloco)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()  # Só o cabeçalho (nenhum registro)
+        return
+
+    dumps = dumps or json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    for bloco in linhas.partitions():
+        yield ''.join(dumps(serializar(linha)) + '\n' for linha in bloco)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exporta usuários ou cachorros em NDJSON ou CSV.')
+    parser.add_argument('recurso', choices=RECURSOS)
+    parser.add_argument('--formato', choices=list(MIMETYPES_EXPORTACAO), default='ndjson',
+                        help='ndjson (padrão) ou csv')
+    parser.add_argument('--include', default='', help="cachorros: 'owner', 'breed' ou 'owner,breed'")
+    parser.add_argument('--id-min', type=int, help='menor id exportado (inclusivo)')
+    parser.add_argument('--id-max', type=int, help='maior id exportado (inclusivo)')
+    parser.add_argument('--since', type=ler_data, help='data de registro/cadastro inicial (inclusiva, ISO 8601)')
+    parser.add_argument('--until', type=ler_data, help='data de registro/cadastro final (exclusiva, ISO 8601)')
+    parser.add_argument('--saida', help='arquivo de saída (padrão: saída padrão)')
+    parser.add_argument('--banco', help='arquivo SQLite alternativo (padrão: instance/site.db)')
+    args = parser.parse_args()
+
+    include = tuple(parte for parte in args.include.split(',') if parte)
+    if any(parte not in INCLUSOES for parte in include):
+        parser.error("--include aceita apenas 'owner' e 'breed'")
+
+    from app import create_app  # Importado aqui: `app.py` também importa este módulo
+    config = {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(args.banco)}'} if args.banco else None
+    app = create_app(config)
+    # newline='': as linhas terminam em '\n' também no Windows
+    saida = open(args.saida, 'w', encoding='utf-8', newline='') if args.saida else sys.stdout
+    try:
+        with app.app_context():
+            for parte in exportar(args.recurso, args.formato, include, id_min=args.id_min, id_max=args.id_max,
+                                  since=args.since, until=args.until):
+                saida.write(parte)
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+
+
+if __name__ == '__main__':
+    main()
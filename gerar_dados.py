@@ -0,0 +1,276 @@
+# backend/gerar_dados.py
+"""
+Gerador determinístico de dados sintéticos em grande escala (usuários e cachorros).
+
+O `seed_db.py` cadastra apenas as raças. Para medir desempenho com volumes
+parecidos com os de produção, este script gera milhões de usuários e
+cachorros de forma reprodutível: a mesma semente, aplicada ao mesmo banco,
+produz exatamente os mesmos registros.
+
+Distribuições:
+- cachorros por usuário seguem uma cauda longa (Pareto): muitos usuários
+  têm 0, 1 ou 2 cachorros e poucos têm dezenas (limitado por --maximo-cachorros);
+- as raças também têm popularidade desigual (pesos do tipo Zipf).
+
+Como a carga é rápida:
+- o esquema e as raças são criados pela própria aplicação (`create_app()` e
+  `seed_database()`), mas a inserção em massa usa `sqlite3` diretamente, com
+  `executemany` em lotes e transações grandes;
+- durante a carga os PRAGMAs de durabilidade são relaxados (synchronous=OFF,
+  journal em memória, lock exclusivo) e restaurados ao final. Se o processo
+  for interrompido no meio, o banco pode ficar inconsistente: use em bancos
+  de desenvolvimento/benchmark;
+- os gatilhos das estatísticas (`estatisticas.py`) e da sincronização
+  (`sincronizacao.py`) são desligados durante a carga e os resumos são
+  recalculados uma única vez no final.
+
+Uso:
+    python gerar_dados.py                                   # 100 mil usuários em instance/site.db
+    python gerar_dados.py --usuarios 2000000 --media-cachorros 1.5 --semente 7
+    python gerar_dados.py --banco /tmp/grande.db --usuarios 500000
+"""
+
+import argparse
+import bisect
+import itertools
+import multiprocessing
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from app import create_app
+from database import db, Raca
+from seed_db import seed_database
+from estatisticas import GATILHOS, RECONSTRUCAO
+import sincronizacao
+
+BASEDIR = os.path.abspath(os.path.dirname(__file__))
+BANCO_PADRAO = os.path.join(BASEDIR, 'instance', 'site.db')
+
+PRIMEIROS_NOMES = [
+    'Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Henrique', 'Isabela', 'Joao',
+    'Juliana', 'Lucas', 'Mariana', 'Mateus', 'Natalia', 'Otavio', 'Paula', 'Rafael', 'Sofia', 'Thiago',
+    'Valentina', 'Vinicius', 'Beatriz', 'Caio', 'Larissa', 'Pedro', 'Camila', 'Gustavo', 'Leticia', 'Rodrigo',
+]
+SOBRENOMES = [
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima', 'Gomes',
+    'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes', 'Vieira', 'Barbosa',
+]
+NOMES_PET = [
+    'Thor', 'Mel', 'Bob', 'Luna', 'Max', 'Nina', 'Fred', 'Belinha', 'Toby', 'Pipoca', 'Bidu', 'Amora',
+    'Zeus', 'Lola', 'Billy', 'Maya', 'Paçoca', 'Frida', 'Rex', 'Meg', 'Scooby', 'Cacau', 'Chico', 'Jade',
+]
+INFOS_EXTRAS = [
+    'Alérgico a frango.', 'Castrado.', 'Toma remédio para o coração.', 'Tem medo de fogos.',
+    'Adora brincar de bolinha.', 'Vacinação em dia.',
+]
+DDDS = ['11', '21', '31', '41', '48', '51', '61', '71', '81', '85']
+
+# PRAGMAs usados só durante a carga (ver docstring do módulo)
+PRAGMAS_CARGA = {
+    'synchronous': 'OFF',
+    'journal_mode': 'MEMORY',
+    'locking_mode': 'EXCLUSIVE',
+    'cache_size': -512000,   # ~512 MB de cache de páginas
+    'temp_store': 'MEMORY',
+}
+
+SQL_USUARIO = ('INSERT INTO user (id, nome_completo, email, telefone, data_cadastro, versao, atualizado_em) '
+               'VALUES (?, ?, ?, ?, ?, 1, ?)')
+SQL_CACHORRO = ('INSERT INTO cachorro (nome_pet, idade, peso, info_extra, data_registro, user_id, raca_id, '
+                'versao, atualizado_em) VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)')
+
+
+def preparar_esquema(banco):
+    """Cria as tabelas e as raças usando a aplicação; retorna os ids das raças."""
+    os.makedirs(os.path.dirname(os.path.abspath(banco)), exist_ok=True)
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(banco)}'})
+    with app.app_context():
+        db.create_all()
+        seed_database()
+        racas = list(db.session.execute(db.select(Raca.id).order_by(Raca.id)).scalars())
+        db.session.remove()
+        db.engine.dispose()  # Libera o arquivo para a conexão exclusiva da carga
+    return racas
+
+
+class Gerador:
+    """Produz, de forma determinística, as linhas de usuários e cachorros."""
+
+    def __init__(self, semente, racas, media_cachorros, maximo_cachorros, alfa=1.5):
+        self.semente = semente
+        self.rng = random.Random(semente)
+        self.media_cachorros = media_cachorros
+        self.maximo_cachorros = maximo_cachorros
+        self.alfa = alfa
+        # Popularidade das raças: pesos 1/posição, com a ordem sorteada pela semente
+        ordem = list(racas)
+        self.rng.shuffle(ordem)
+        self.racas = ordem
+        self.pesos_acumulados = list(itertools.accumulate(1 / (posicao + 1) for posicao in range(len(ordem))))
+        self.data_base = datetime(2023, 1, 1)
+        self._dias = {}  # Cache do texto 'AAAA-MM-DD' de cada dia desde data_base
+
+    def quantidade_cachorros(self):
+        # Pareto(alfa) - 1 tem média 1/(alfa-1); escalado para a média pedida
+        valor = self.media_cachorros * (self.alfa - 1) * (self.rng.paretovariate(self.alfa) - 1)
+        return min(self.maximo_cachorros, int(valor + 0.5))
+
+    def raca(self):
+        return self.racas[bisect.bisect(self.pesos_acumulados, self.rng.random() * self.pesos_acumulados[-1])]
+
+    def data(self, segundos, microssegundos):
+        """Texto da data no formato gravado pelo SQLAlchemy, sem criar um datetime por linha."""
+        dia, resto = divmod(segundos, 86400)
+        texto_dia = self._dias.get(dia)
+        if texto_dia is None:
+            texto_dia = self._dias[dia] = (self.data_base + timedelta(days=dia)).date().isoformat()
+        horas, resto = divmod(resto, 3600)
+        minutos, segundos = divmod(resto, 60)
+        return f'{texto_dia} {horas:02d}:{minutos:02d}:{segundos:02d}.{microssegundos:06d}'
+
+    def lote(self, primeiro_id, quantidade):
+        """Linhas (usuários, cachorros) para os usuários primeiro_id .. primeiro_id + quantidade - 1.
+
+        Cada lote tem a própria semente (derivada da semente geral e do primeiro id),
+        então o resultado não depende da ordem nem do processo em que os lotes são gerados.
+        Este é o trecho mais quente da carga: evita `rng.choice` e objetos datetime por linha.
+        """
+        self.rng = random.Random(f'{self.semente}:{primeiro_id}')
+        aleatorio = self.rng.random
+        inteiro = self.rng.randrange
+        quantidade_cachorros, raca, data = self.quantidade_cachorros, self.raca, self.data
+        n_nomes, n_sobrenomes, n_pets, n_infos, n_ddds = (len(PRIMEIROS_NOMES), len(SOBRENOMES), len(NOMES_PET),
+                                                         len(INFOS_EXTRAS), len(DDDS))
+        usuarios, cachorros = [], []
+        for user_id in range(primeiro_id, primeiro_id + quantidade):
+            nome = PRIMEIROS_NOMES[int(aleatorio() * n_nomes)]
+            sobrenome = SOBRENOMES[int(aleatorio() * n_sobrenomes)]
+            telefone = (f'({DDDS[int(aleatorio() * n_ddds)]}) 9{int(aleatorio() * 10 ** 8):08d}'
+                        if aleatorio() < 0.8 else None)
+            segundos = user_id * 30 + int(aleatorio() * 30)
+            data_cadastro = data(segundos, int(aleatorio() * 10 ** 6))
+            usuarios.append((user_id, f'{nome} {sobrenome}', f'{nome.lower()}.{sobrenome.lower()}.{user_id}@exemplo.com',
+                             telefone, data_cadastro, data_cadastro))
+
+            deslocamento = inteiro(n_pets)  # Nomes distintos dentro do mesmo usuário
+            for j in range(quantidade_cachorros()):
+                nome_pet = NOMES_PET[(deslocamento + j) % n_pets]
+                if j >= n_pets:
+                    nome_pet = f'{nome_pet} {j // n_pets + 1}'
+                # Os cachorros são registrados junto com o cadastro do dono (mesma data)
+                cachorros.append((nome_pet, int(aleatorio() * 16), int(15 + aleatorio() * 585) / 10,
+                                  INFOS_EXTRAS[int(aleatorio() * n_infos)] if aleatorio() < 0.1 else None,
+                                  data_cadastro, user_id, raca(), data_cadastro))
+        return usuarios, cachorros
+
+
+# Gerador usado pelos processos auxiliares (criado uma vez por processo)
+_gerador = None
+
+
+def _iniciar_processo(gerador):
+    global _gerador
+    _gerador = gerador
+
+
+def _gerar_lote(intervalo):
+    return _gerador.lote(*intervalo)
+
+
+def lotes(gerador, primeiro_id, total, tamanho_lote, processos):
+    """Gera os lotes em ordem; com `processos` > 1, em paralelo com a gravação."""
+    intervalos = [(primeiro_id + deslocamento, min(tamanho_lote, total - deslocamento))
+                  for deslocamento in range(0, total, tamanho_lote)]
+    if processos <= 1:
+        for intervalo in intervalos:
+            yield gerador.lote(*intervalo)
+        return
+    # Montar as tuplas em Python é tão caro quanto gravá-las: outros processos geram
+    # os próximos lotes enquanto este grava o atual.
+    with multiprocessing.Pool(processos, initializer=_iniciar_processo, initargs=(gerador,)) as pool:
+        yield from pool.imap(_gerar_lote, intervalos)
+
+
+def carregar(banco, args, racas):
+    """Insere os dados gerados; retorna (usuários, cachorros) inseridos."""
+    conexao = sqlite3.connect(banco, isolation_level=None)  # Transações controladas manualmente
+    modo_original = conexao.execute('PRAGMA journal_mode').fetchone()[0]
+    for nome, valor in PRAGMAS_CARGA.items():
+        conexao.execute(f'PRAGMA {nome}={valor}')
+
+    # Os gatilhos das estatísticas e da sincronização (ver `estatisticas.py` e `sincronizacao.py`)
+    # ficam desligados durante a carga; os resumos são recalculados de uma vez no final.
+    for nome in list(GATILHOS) + list(sincronizacao.GATILHOS):
+        conexao.execute(f'DROP TRIGGER IF EXISTS {nome}')
+
+    primeiro_id = (conexao.execute('SELECT max(id) FROM user').fetchone()[0] or 0) + 1
+    gerador = Gerador(args.semente, racas, args.media_cachorros, args.maximo_cachorros)
+    total_usuarios = total_cachorros = desde_commit = 0
+    inicio = time.perf_counter()
+    try:
+        conexao.execute('BEGIN')
+        for usuarios, cachorros in lotes(gerador, primeiro_id, args.usuarios, args.lote, args.processos):
+            conexao.executemany(SQL_USUARIO, usuarios)
+            conexao.executemany(SQL_CACHORRO, cachorros)
+            total_usuarios += len(usuarios)
+            total_cachorros += len(cachorros)
+            desde_commit += len(usuarios)
+            if desde_commit >= args.transacao or total_usuarios == args.usuarios:
+                conexao.execute('COMMIT')
+                desde_commit = 0
+                decorrido = time.perf_counter() - inicio
+                print(f'{total_usuarios} usuários, {total_cachorros} cachorros '
+                      f'({(total_usuarios + total_cachorros) / decorrido:,.0f} linhas/s)')
+                if total_usuarios < args.usuarios:
+                    conexao.execute('BEGIN')
+    except BaseException:
+        if conexao.in_transaction:
+            conexao.execute('ROLLBACK')
+        raise
+    finally:
+        print('Recalculando as estatísticas...')
+        conexao.execute('BEGIN')
+        for comando in (list(GATILHOS.values()) + RECONSTRUCAO +
+                        list(sincronizacao.GATILHOS.values()) + sincronizacao.RECONSTRUCAO):
+            conexao.execute(comando)
+        conexao.execute('COMMIT')
+        # Restaura a durabilidade normal do banco
+        conexao.execute(f'PRAGMA journal_mode={modo_original}')
+        conexao.execute('PRAGMA locking_mode=NORMAL')
+        conexao.execute('SELECT 1 FROM user LIMIT 1').fetchall()  # Libera o lock exclusivo
+    duracao = time.perf_counter() - inicio
+
+    if not args.sem_analyze:
+        print('Atualizando as estatísticas do planejador (ANALYZE)...')
+        conexao.execute('ANALYZE')
+    conexao.close()
+    return total_usuarios, total_cachorros, duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera usuários e cachorros sintéticos em grande volume.')
+    parser.add_argument('--banco', default=BANCO_PADRAO, help='arquivo SQLite (padrão: instance/site.db)')
+    parser.add_argument('--usuarios', type=int, default=100000, help='usuários a gerar (padrão: 100000)')
+    parser.add_argument('--media-cachorros', type=float, default=2.0,
+                        help='média aproximada de cachorros por usuário (padrão: 2.0)')
+    parser.add_argument('--maximo-cachorros', type=int, default=100,
+                        help='máximo de cachorros de um usuário (padrão: 100)')
+    parser.add_argument('--semente', type=int, default=42, help='semente do gerador (padrão: 42)')
+    parser.add_argument('--lote', type=int, default=10000, help='usuários por executemany (padrão: 10000)')
+    parser.add_argument('--transacao', type=int, default=500000,
+                        help='usuários por transação (padrão: 500000)')
+    parser.add_argument('--processos', type=int, default=min(4, max(1, (os.cpu_count() or 1) - 1)),
+                        help='processos que geram os lotes em paralelo (padrão: até 4; 1 = sem paralelismo)')
+    parser.add_argument('--sem-analyze', action='store_true', help='não executa ANALYZE ao final')
+    args = parser.parse_args()
+
+    racas = preparar_esquema(args.banco)
+    usuarios, cachorros, duracao = carregar(args.banco, args, racas)
+    print(f'Concluído: {usuarios} usuários e {cachorros} cachorros em {duracao:.1f} s '
+          f'({(usuarios + cachorros) / duracao:,.0f} linhas/s).')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+# backend/group_commit.py
+"""
+Commit em grupo ("group commit") das rotas de escrita.
+
+O SQLite aceita um único escritor por vez e cada rota de escrita faz o seu
+próprio `commit()`. Com cadastros simultâneos, as threads disputam o lock
+do banco (esperando pelo `busy_timeout`) e cada commit paga a sua própria
+finalização de transação (um fsync no modo rollback journal).
+
+Com `GRUPO_COMMIT` ligado, as rotas marcadas com `@grupo.escrita` não rodam
+na thread da requisição: são enfileiradas para uma única thread escritora,
+que junta as operações que chegam em até `GRUPO_COMMIT_JANELA_MS`
+milissegundos (ou até `GRUPO_COMMIT_MAXIMO` operações) e executa todas numa
+só transação, com um único commit no final.
+
+Cada operação roda dentro do seu próprio SAVEPOINT: um erro (ex: o 409 da
+restrição `uix_user_pet` ou do e-mail repetido) desfaz só aquela operação,
+e cada requisição recebe a sua própria resposta. As respostas só são
+entregues depois do commit do lote; se o commit falhar, as operações são
+refeitas uma a uma, cada uma na sua transação.
+
+As rotas usam `confirmar()` e `desfazer()` no lugar de `db.session.commit()`
+e `db.session.rollback()`: fora do commit em grupo elas fazem exatamente
+isso; dentro da thread escritora agem sobre o SAVEPOINT da operação.
+
+Configuração (em `app.config` ou pelo parâmetro `config` de `create_app`):
+    GRUPO_COMMIT:             liga o commit em grupo (padrão: False; também
+                              pela variável de ambiente GRUPO_COMMIT=1)
+    GRUPO_COMMIT_JANELA_MS:   espera máxima por mais operações (padrão: 2)
+    GRUPO_COMMIT_MAXIMO:      operações por transação (padrão: 64)
+    GRUPO_COMMIT_TIMEOUT:     segundos que a requisição espera o resultado (padrão: 30)
+
+Observação: os comandos SQL executados pela thread escritora não entram nas
+contagens por rota de `/metrics` (a latência das rotas continua medida).
+
+Uso:
+    grupo = GrupoCommit(app)
+
+    @app.route('/usuarios', methods=['POST'])
+    @grupo.escrita
+    def create_user():
+        ...
+        confirmar()
+"""
+
+import functools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from flask import copy_current_request_context, g
+from database import db
+
+
+def _pendente(savepoint):
+    # Ainda aberto (mesmo se desativado por um erro no flush, que exige o rollback)
+    return db.session().get_nested_transaction() is savepoint
+
+
+def confirmar():
+    """Confirma a escrita da rota: commit ou, no commit em grupo, libera o SAVEPOINT."""
+    savepoint = g.get('grupo_commit_savepoint')
+    if savepoint is None:
+        db.session.commit()
+    elif _pendente(savepoint):
+        savepoint.commit()
+
+
+def desfazer():
+    """Desfaz a escrita da rota: rollback ou, no commit em grupo, volta ao SAVEPOINT."""
+    savepoint = g.get('grupo_commit_savepoint')
+    if savepoint is None:
+        db.session.rollback()
+    elif _pendente(savepoint):
+        savepoint.rollback()
+
+
+class GrupoCommit:
+    """Extensão Flask que executa as rotas de escrita numa thread escritora única."""
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._fila = None
+        self._thread = None
+        self.lotes = 0       # Transações feitas pela thread escritora
+        self.operacoes = 0   # Operações executadas nelas
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('GRUPO_COMMIT', os.environ.get('GRUPO_COMMIT', '') not in ('', '0'))
+        app.config.setdefault('GRUPO_COMMIT_JANELA_MS', 2)
+        app.config.setdefault('GRUPO_COMMIT_MAXIMO', 64)
+        app.config.setdefault('GRUPO_COMMIT_TIMEOUT', 30)
+        self.app = app
+        self.ativo = bool(app.config['GRUPO_COMMIT'])
+        self.janela = app.config['GRUPO_COMMIT_JANELA_MS'] / 1000
+        self.maximo = max(1, app.config['GRUPO_COMMIT_MAXIMO'])
+        self.timeout = app.config['GRUPO_COMMIT_TIMEOUT']
+        app.extensions['grupo_commit'] = self
+
+    def escrita(self, funcao):
+        """Decorador das rotas de escrita: envia a rota para a thread escritora se ativo."""
+
+        @functools.wraps(funcao)
+        def rota(*args, **kwargs):
+            if not self.ativo:
+                return funcao(*args, **kwargs)
+            # A rota roda em outra thread com uma cópia do contexto desta requisição
+            return self.executar(copy_current_request_context(funcao), *args, **kwargs)
+
+        return rota
+
+    def executar(self, funcao, *args, **kwargs):
+        """Enfileira `funcao` para a thread escritora e espera o seu resultado."""
+        futuro = Future()
+        self._fila_atual().put((funcao, args, kwargs, futuro))
+        return futuro.result(timeout=self.timeout)
+
+    def _fila_atual(self):
+        # A thread é criada sob demanda e recriada após um fork (workers do gunicorn)
+        with self._lock:
+            if self._pid != os.getpid() or self._thread is None or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._fila = queue.Queue()
+                self._thread = threading.Thread(target=self._escritor, name='grupo-commit', daemon=True)
+                self._thread.start()
+            return self._fila
+
+    def _escritor(self):
+        fila = self._fila
+        while True:
+            lote = [fila.get()]
+            limite = time.perf_counter() + self.janela
+            while len(lote) < self.maximo:
+                try:
+                    restante = limite - time.perf_counter()
+                    lote.append(fila.get(timeout=restante) if restante > 0 else fila.get_nowait())
+                except queue.Empty:
+                    break
+            self._processar(lote)
+
+    def _processar(self, lote):
+        """Executa um lote numa transação e entrega os resultados após o commit."""
+        with self.app.app_context():
+            try:
+                if db.engine.dialect.name == 'sqlite':
+                    # Reserva o lock de escrita já no início (respeitando o busy_timeout). Uma
+                    # transação que lê antes de escrever falharia na hora ("database is locked")
+                    # se outro processo gravasse entre a leitura e a escrita.
+                    db.session.connection().exec_driver_sql('BEGIN IMMEDIATE')
+                resultados = [self._executar_operacao(*operacao[:3]) for operacao in lote]
+                db.session.commit()
+            except Exception as erro:
+                db.session.rollback()
+                if len(lote) > 1:
+                    # Refaz cada operação na sua própria transação
+                    for operacao in lote:
+                        self._processar([operacao])
+                    return
+                resultados = [(None, erro)]
+        self.lotes += 1
+        self.operacoes += len(lote)
+        for (_, _, _, futuro), (resposta, erro) in zip(lote, resultados):
+            if erro is not None:
+                futuro.set_exception(erro)
+            else:
+                futuro.set_result(resposta)
+
+    def _executar_operacao(self, funcao, args, kwargs):
+        """Roda uma rota dentro de um SAVEPOINT; retorna (resposta, erro)."""
+        savepoint = db.session.begin_nested()
+        g.grupo_commit_savepoint = savepoint
+        try:
+            resposta, erro = funcao(*args, **kwargs), None
+        except Exception as excecao:  # Vai para a requisição; o lote continua
+            resposta, erro = None, excecao
+        finally:
+            g.pop('grupo_commit_savepoint', None)
+        if _pendente(savepoint):
+            # A rota não confirmou (ex: respondeu 404): descarta o que ela fez
+            savepoint.rollback()
+        return resposta, erro
@@ -0,0 +1,365 @@
+# backend/importacao.py
+"""
+Importação em massa de usuários e cachorros a partir de NDJSON ou CSV.
+
+O arquivo é lido como um fluxo (uma linha por vez) e processado em lotes de
+`registros_por_lote` registros. Cada lote é uma transação:
+
+1. valida os registros (campos obrigatórios, números e datas);
+2. resolve os donos pelo `email` e as raças pelo nome/slug com consultas em
+   conjunto (uma consulta IN por bloco de valores; as raças vêm do catálogo
+   em memória);
+3. descarta as duplicatas: e-mails já cadastrados (usuários) e pares
+   `(user_id, nome_pet)` já cadastrados ou repetidos no próprio lote
+   (cachorros), os mesmos casos que antes eram limpos à mão (ver
+   `migrations/duplicates_cachorro_*.csv`);
+4. grava os registros válidos com um único INSERT (executemany) e faz o commit.
+
+A memória usada depende do tamanho do lote, não do tamanho do arquivo. Como
+os lotes anteriores já estão no banco, a deduplicação contra o banco também
+cobre repetições entre lotes distantes do arquivo.
+
+Registros aceitos (as mesmas colunas de `export.py`, então um arquivo
+exportado pode ser importado em outro banco):
+- usuários: `nome_completo`, `email`, `telefone` e `data_cadastro` (opcional);
+- cachorros: `nome_pet`, `idade`, `peso`, `info_extra`, `data_registro`
+  (opcional), o dono por `owner_email` (ou `email`, ou `owner` aninhado no
+  NDJSON) ou por `user_id`, e a raça por nome/slug em `raca` (ou
+  `breed_nome`, ou `breed` aninhado) ou por `raca_id`. O e-mail e o nome da
+  raça têm prioridade sobre os ids.
+
+Após cada commit, `ao_confirmar` recebe o resumo (com o número de registros
+já lidos, o "checkpoint") e `ao_rejeitar` recebe os registros descartados.
+Para retomar uma importação interrompida, passe o checkpoint em `inicio`: os
+registros já processados são pulados. Se a interrupção acontecer entre o
+commit e a gravação do checkpoint, o lote é relido e os seus registros saem
+como duplicados (nada é gravado duas vezes).
+
+Usado pelas rotas `POST /import/usuarios` e `POST /import/cachorros` e pela
+linha de comando, que grava o checkpoint e o relatório de rejeitados em
+arquivos ao lado da entrada.
+
+Uso:
+    python importacao.py usuarios parceiros.csv
+    python importacao.py cachorros cachorros.ndjson --lote 5000 --banco /tmp/grande.db
+    python importacao.py cachorros cachorros.ndjson --recomecar   # ignora o checkpoint
+"""
+
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+from flask import current_app
+from sqlalchemy import insert, select
+from database import db, User, Raca, Cachorro
+from export import achatar, ler_data
+
+FORMATOS = ('ndjson', 'csv')
+RECURSOS = ('usuarios', 'cachorros')
+
+# Registros gravados em cada transação
+REGISTROS_POR_LOTE = 1000
+REGISTROS_POR_LOTE_MAXIMO = 10000
+# Quantos valores são enviados em cada cláusula IN (o SQLite limita o número de parâmetros)
+VALORES_POR_CONSULTA = 500
+
+# Motivos do relatório de rejeitados
+MOTIVOS = {
+    'json_invalido': 'Linha não é um objeto JSON.',
+    'dados_incompletos': 'Campos obrigatórios ausentes.',
+    'dados_invalidos': 'Número ou data inválidos.',
+    'usuario_nao_encontrado': 'Usuário não encontrado.',
+    'raca_nao_encontrada': 'Raça não encontrada.',
+    'email_duplicado': 'Este e-mail já está cadastrado.',
+    'duplicado': 'Cachorro já registrado para este usuário.',
+}
+DUPLICADOS = ('email_duplicado', 'duplicado')
+
+
+class _CorpoBruto(io.RawIOBase):
+    """Adapta um fluxo que só tem `read()` (ex: o `wsgi.input` do gunicorn) ao módulo io."""
+
+    def __init__(self, fluxo):
+        self.fluxo = fluxo
+
+    def readable(self):
+        return True
+
+    def readinto(self, destino):
+        dados = self.fluxo.read(len(destino))
+        destino[:len(dados)] = dados
+        return len(dados)
+
+
+def abrir_corpo(fluxo):
+    """Texto UTF-8 (com ou sem BOM) lido aos poucos do corpo de uma requisição."""
+    return io.TextIOWrapper(io.BufferedReader(_CorpoBruto(fluxo)), encoding='utf-8-sig', newline='')
+
+
+def ler_registros(arquivo, formato='ndjson'):
+    """Gera (número, registro) de um arquivo de texto, um registro por vez.
+
+    No NDJSON as linhas em branco são ignoradas e uma linha que não é um
+    objeto JSON é gerada como texto (será rejeitada). No CSV cada linha é um
+    dicionário (valores vazios viram '').
+    """
+    if formato == 'csv':
+        yield from enumerate(csv.DictReader(arquivo), 1)
+        return
+    numero = 0
+    for linha in arquivo:
+        if not linha.strip():
+            continue
+        numero += 1
+        try:
+            registro = json.loads(linha)
+        except ValueError:
+            registro = None
+        yield numero, registro if isinstance(registro, dict) else linha.rstrip('\r\n')
+
+
+def _texto(valor):
+    if valor is None:
+        return None
+    return str(valor).strip() or None
+
+
+def _converter(valor, tipo):
+    valor = _texto(valor)
+    return None if valor is None else tipo(valor)
+
+
+def _em_partes(valores):
+    valores = list(valores)
+    for inicio in range(0, len(valores), VALORES_POR_CONSULTA):
+        yield valores[inicio:inicio + VALORES_POR_CONSULTA]
+
+
+def _em_blocos(iteravel, tamanho):
+    iterador = iter(iteravel)
+    while bloco := list(itertools.islice(iterador, tamanho)):
+        yield bloco
+
+
+def _preparar_usuarios(lote, rejeitar):
+    """Valida e deduplica um lote de usuários; retorna as linhas a inserir."""
+    validos = []
+    for numero, registro in lote:
+        email, nome = _texto(registro.get('email')), _texto(registro.get('nome_completo'))
+        if not email or not nome:
+            rejeitar(numero, 'dados_incompletos', registro)
+            continue
+        linha = {'nome_completo': nome, 'email': email, 'telefone': _texto(registro.get('telefone'))}
+        try:
+            if _texto(registro.get('data_cadastro')):
+                linha['data_cadastro'] = ler_data(registro['data_cadastro'])
+        except ValueError:
+            rejeitar(numero, 'dados_invalidos', registro)
+            continue
+        validos.append((numero, registro, linha))
+
+    # Uma consulta por bloco de e-mails para descobrir quais já estão cadastrados
+    existentes = set()
+    for parte in _em_partes({linha['email'] for _, _, linha in validos}):
+        existentes.update(db.session.execute(select(User.email).where(User.email.in_(parte))).scalars())
+
+    novos = {}
+    for numero, registro, linha in validos:
+        if linha['email'] in existentes or linha['email'] in novos:
+            rejeitar(numero, 'email_duplicado', registro)
+        else:
+            novos[linha['email']] = linha
+    return list(novos.values())
+
+
+def _preparar_cachorros(lote, rejeitar):
+    """Valida, resolve dono e raça e deduplica um lote de cachorros; retorna as linhas a inserir."""
+    snapshot = current_app.extensions['catalogo_racas'].snapshot()
+    validos = []
+    for numero, registro in lote:
+        nome_pet = _texto(registro.get('nome_pet'))
+        email = _texto(registro.get('owner_email') or registro.get('email'))
+        raca = _texto(registro.get('raca') or registro.get('breed_nome') or registro.get('breed'))
+        try:
+            user_id = _converter(registro.get('user_id'), int)
+            raca_id = _converter(registro.get('raca_id'), int)
+            linha = {
+                'nome_pet': nome_pet,
+                'idade': _converter(registro.get('idade'), int),
+                'peso': _converter(registro.get('peso'), float),
+                'info_extra': _texto(registro.get('info_extra')),
+            }
+            if _texto(registro.get('data_registro')):
+                linha['data_registro'] = ler_data(registro['data_registro'])
+        except ValueError:
+            rejeitar(numero, 'dados_invalidos', registro)
+            continue
+        if not nome_pet or (email is None and user_id is None) or (raca is None and raca_id is None):
+            rejeitar(numero, 'dados_incompletos', registro)
+            continue
+        if raca is not None:
+            raca_id = snapshot.buscar_slug(raca)
+        validos.append((numero, registro, linha, email, user_id, raca_id))
+
+    # Donos: uma consulta por bloco de e-mails e uma por bloco de ids
+    ids_por_email, ids_existentes = {}, set()
+    for parte in _em_partes({email for *_, email, _, _ in validos if email is not None}):
+        ids_por_email.update(db.session.execute(select(User.email, User.id).where(User.email.in_(parte))).all())
+    for parte in _em_partes({user_id for *_, email, user_id, _ in validos if email is None}):
+        ids_existentes.update(db.session.execute(select(User.id).where(User.id.in_(parte))).scalars())
+
+    # Raças: vêm do catálogo; só consulta o banco se algum id não estiver no snapshot
+    racas_existentes = set(snapshot.racas)
+    faltando = {raca_id for *_, raca_id in validos if raca_id is not None} - racas_existentes
+    for parte in _em_partes(faltando):
+        racas_existentes.update(db.session.execute(select(Raca.id).where(Raca.id.in_(parte))).scalars())
+
+    resolvidos = []
+    for numero, registro, linha, email, user_id, raca_id in validos:
+        user_id = ids_por_email.get(email) if email is not None else user_id
+        if user_id is None or (email is None and user_id not in ids_existentes):
+            rejeitar(numero, 'usuario_nao_encontrado', registro)
+        elif raca_id not in racas_existentes:
+            rejeitar(numero, 'raca_nao_encontrada', registro)
+        else:
+            resolvidos.append((numero, registro, dict(linha, user_id=user_id, raca_id=raca_id)))
+
+    # Pares (user_id, nome_pet) já cadastrados: uma consulta por bloco de donos. O SQLite
+    # não usa índice em `(user_id, nome_pet) IN (...)` (varre a tabela); `user_id IN (...)`
+    # percorre o índice de `uix_user_pet` e os pares são conferidos aqui.
+    pares = {(linha['user_id'], linha['nome_pet']) for _, _, linha in resolvidos}
+    existentes = set()
+    for parte in _em_partes({user_id for user_id, _ in pares}):
+        consulta = select(Cachorro.user_id, Cachorro.nome_pet).where(Cachorro.user_id.in_(parte))
+        existentes.update(par for par in map(tuple, db.session.execute(consulta)) if par in pares)
+
+    novos = {}
+    for numero, registro, linha in resolvidos:
+        par = (linha['user_id'], linha['nome_pet'])
+        if par in existentes or par in novos:
+            rejeitar(numero, 'duplicado', registro)
+        else:
+            novos[par] = linha
+    return list(novos.values())
+
+
+PREPARAR = {'usuarios': (User, _preparar_usuarios), 'cachorros': (Cachorro, _preparar_cachorros)}
+
+
+def _gravar_lote(recurso, lote, rejeitar):
+    """Grava um lote numa transação; retorna quantos registros foram inseridos."""
+    modelo, preparar = PREPARAR[recurso]
+    try:
+        if db.engine.dialect.name == 'sqlite':
+            # Reserva o lock de escrita antes das consultas: nenhum outro escritor
+            # grava entre a deduplicação e o INSERT (nem outro processo)
+            db.session.connection().exec_driver_sql('BEGIN IMMEDIATE')
+        invalidos = [(numero, registro) for numero, registro in lote if not isinstance(registro, dict)]
+        for numero, registro in invalidos:
+            rejeitar(numero, 'json_invalido', registro)
+        linhas = preparar([(numero, achatar(registro)) for numero, registro in lote
+                           if isinstance(registro, dict)], rejeitar)
+        if linhas:
+            db.session.execute(insert(modelo), linhas)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(linhas)
+
+
+def importar(recurso, arquivo, formato='ndjson', registros_por_lote=REGISTROS_POR_LOTE, inicio=0,
+             ao_confirmar=None, ao_rejeitar=None):
+    """Importa os registros de `arquivo` (texto) em lotes; retorna o resumo.
+
+    - `inicio`: registros a pular (checkpoint de uma importação interrompida);
+    - `ao_confirmar(resumo)`: chamada após o commit de cada lote;
+    - `ao_rejeitar(numero, motivo, registro)`: chamada para cada registro
+      descartado (depois do commit do seu lote).
+
+    O resumo traz `registros` (lidos até o último commit, o checkpoint),
+    `inseridos`, `duplicados` e `rejeitados` (os demais descartados). Deve
+    rodar dentro de um contexto de aplicação.
+    """
+    resumo = {'registros': inicio, 'inseridos': 0, 'duplicados': 0, 'rejeitados': 0}
+    registros = itertools.islice(ler_registros(arquivo, formato), inicio, None)
+    for lote in _em_blocos(registros, registros_por_lote):
+        rejeicoes = []
+        resumo['inseridos'] += _gravar_lote(
+            recurso, lote, lambda numero, motivo, registro: rejeicoes.append((numero, motivo, registro)))
+        resumo['registros'] = lote[-1][0]
+        for numero, motivo, registro in sorted(rejeicoes, key=lambda rejeicao: rejeicao[0]):
+            resumo['duplicados' if motivo in DUPLICADOS else 'rejeitados'] += 1
+            if ao_rejeitar is not None:
+                ao_rejeitar(numero, motivo, registro)
+        if ao_confirmar is not None:
+            ao_confirmar(dict(resumo))
+    return resumo
+
+
+def gravar_checkpoint(caminho, dados):
+    """Grava o checkpoint de forma atômica (arquivo temporário + rename)."""
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(dados, arquivo)
+    os.replace(temporario, caminho)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Importa usuários ou cachorros de um arquivo NDJSON ou CSV.')
+    parser.add_argument('recurso', choices=RECURSOS)
+    parser.add_argument('entrada', help='arquivo NDJSON ou CSV')
+    parser.add_argument('--formato', choices=FORMATOS, help='padrão: pela extensão da entrada (.csv ou NDJSON)')
+    parser.add_argument('--lote', type=int, default=REGISTROS_POR_LOTE,
+                        help=f'registros por transação (padrão: {REGISTROS_POR_LOTE})')
+    parser.add_argument('--checkpoint', help='arquivo do checkpoint (padrão: <entrada>.checkpoint.json)')
+    parser.add_argument('--rejeitados', help='relatório de rejeitados em CSV (padrão: <entrada>.rejeitados.csv)')
+    parser.add_argument('--recomecar', action='store_true', help='ignora o checkpoint e começa do primeiro registro')
+    parser.add_argument('--banco', help='arquivo SQLite alternativo (padrão: instance/site.db)')
+    args = parser.parse_args()
+    if not 1 <= args.lote <= REGISTROS_POR_LOTE_MAXIMO:
+        parser.error(f'--lote deve ficar entre 1 e {REGISTROS_POR_LOTE_MAXIMO}')
+
+    formato = args.formato or ('csv' if args.entrada.lower().endswith('.csv') else 'ndjson')
+    caminho_checkpoint = args.checkpoint or args.entrada + '.checkpoint.json'
+    caminho_rejeitados = args.rejeitados or args.entrada + '.rejeitados.csv'
+    inicio = 0
+    if os.path.exists(caminho_checkpoint) and not args.recomecar:
+        with open(caminho_checkpoint, encoding='utf-8') as arquivo:
+            checkpoint = json.load(arquivo)
+        if checkpoint.get('recurso') != args.recurso:
+            parser.error(f'o checkpoint {caminho_checkpoint} é de outra importação ({checkpoint.get("recurso")})')
+        inicio = checkpoint['registros']
+        print(f'Retomando após o registro {inicio}.', file=sys.stderr)
+
+    from app import create_app  # Importado aqui: `app.py` também importa este módulo
+    config = {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(args.banco)}'} if args.banco else None
+    app = create_app(config)
+
+    # O relatório continua o anterior ao retomar; a linha de cada registro permite achá-lo na entrada
+    novo_relatorio = inicio == 0 or not os.path.exists(caminho_rejeitados)
+    with open(args.entrada, encoding='utf-8-sig', newline='') as entrada, \
+            open(caminho_rejeitados, 'w' if novo_relatorio else 'a', encoding='utf-8', newline='') as relatorio:
+        escritor = csv.writer(relatorio, lineterminator='\n')
+        if novo_relatorio:
+            escritor.writerow(['registro', 'motivo', 'dados'])
+
+        def rejeitar(numero, motivo, registro):
+            escritor.writerow([numero, motivo, registro if isinstance(registro, str)
+                               else json.dumps(registro, ensure_ascii=False)])
+
+        def confirmar(resumo):
+            relatorio.flush()
+            gravar_checkpoint(caminho_checkpoint, {'recurso': args.recurso, 'entrada': args.entrada, **resumo})
+
+        with app.app_context():
+            resumo = importar(args.recurso, entrada, formato, args.lote, inicio, confirmar, rejeitar)
+    print(json.dumps(resumo, ensure_ascii=False))
+    print(f'Rejeitados em {caminho_rejeitados}; checkpoint em {caminho_checkpoint}.', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
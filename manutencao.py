@@ -0,0 +1,377 @@
+# backend/manutencao.py
+"""
+Manutenção do banco SQLite com o servidor no ar.
+
+As cópias em `migrations/` (`site.db.bak-*`) eram feitas copiando o arquivo,
+o que pode gerar um banco corrompido se a aplicação gravar no meio da cópia,
+e nada atualizava as estatísticas do planejador nem devolvia o espaço
+liberado por remoções (ex: `DELETE /usuarios/<id>` com os cachorros em
+cascata). Este script reúne essas tarefas, todas pela fábrica `create_app()`
+(mesmo banco, mesmo perfil e mesmos PRAGMAs da aplicação):
+
+- `backup`: cópia consistente com a API de backup do SQLite, em passos de
+  `--paginas` páginas com uma pausa entre eles para não disputar disco e
+  CPU com as requisições. No modo WAL a cópia lê um snapshot fixo (uma
+  transação de leitura aberta do início ao fim): os escritores continuam
+  gravando e a cópia não precisa recomeçar. Sem WAL, um snapshot fixo
+  bloquearia os escritores, então a cópia é feita num passo só;
+- `verificar`: `quick_check` (ou `integrity_check` com `--completo`),
+  chaves estrangeiras e duplicatas (cachorros com o mesmo nome para o mesmo
+  usuário e e-mails que só diferem em maiúsculas/espaços), cada verificação
+  numa única passada de SQL, pelo engine de leitura quando existir;
+- `otimizar`: `ANALYZE` na primeira vez (ou com `--completo`) e, depois,
+  `PRAGMA optimize`, que só reanalisa as tabelas que mudaram bastante;
+- `vacuum`: vacuum incremental em passos de `--paginas` páginas, cada um na
+  sua transação curta, com pausa entre eles. Exige `auto_vacuum=INCREMENTAL`,
+  o padrão dos bancos novos no perfil `producao`; um banco antigo é
+  convertido uma única vez com `--ativar` (um VACUUM completo, que bloqueia
+  as escritas enquanto roda);
+- `podar`: descarta as lápides da sincronização dos cachorros mais antigas
+  que `--dias` (ver `sincronizacao.py`); clientes com um cursor anterior
+  recebem a lista completa na próxima sincronização;
+- `agenda`: roda as tarefas acima periodicamente (para um serviço ou
+  container ao lado do servidor).
+
+Uso:
+    python manutencao.py backup                           # instance/backups/site-<data>.db
+    python manutencao.py backup --destino /mnt/backup/site.db --paginas 512 --pausa-ms 20
+    python manutencao.py verificar --relatorio migrations # CSVs das duplicatas encontradas
+    python manutencao.py otimizar
+    python manutencao.py vacuum --ativar                  # uma vez, em bancos antigos
+    python manutencao.py podar --dias 30
+    python manutencao.py agenda --backup-horas 24 --manter 7 --vacuum-minutos 60
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from database import db
+from sincronizacao import RETENCAO_DIAS, podar_remocoes
+
+# Páginas copiadas/liberadas por passo e pausa entre os passos
+PAGINAS_POR_PASSO = 256
+PAUSA_MS = 10
+
+DIRETORIO_BACKUPS = 'backups'  # Dentro de instance/
+
+# Duplicatas procuradas por `verificar`, cada uma numa única passada (função de janela)
+DUPLICATAS = {
+    'cachorros': {
+        'arquivo': 'duplicates_cachorro',
+        'colunas': ['user_id', 'nome_pet', 'id', 'data_registro'],
+        'sql': """SELECT user_id, nome_pet, id, data_registro FROM (
+                      SELECT user_id, nome_pet, id, data_registro,
+                             count(*) OVER (PARTITION BY user_id, lower(trim(nome_pet))) AS repeticoes
+                      FROM cachorro)
+                  WHERE repeticoes > 1 ORDER BY user_id, lower(trim(nome_pet)), id""",
+    },
+    'usuarios': {
+        'arquivo': 'duplicates_usuario',
+        'colunas': ['email', 'id', 'data_cadastro'],
+        'sql': """SELECT email, id, data_cadastro FROM (
+                      SELECT email, id, data_cadastro,
+                             count(*) OVER (PARTITION BY lower(trim(email))) AS repeticoes
+                      FROM user)
+                  WHERE repeticoes > 1 ORDER BY lower(trim(email)), id""",
+    },
+}
+EXEMPLOS = 10  # Linhas de cada problema mostradas no resumo
+
+
+def caminho_banco(engine):
+    return os.path.abspath(engine.url.database)
+
+
+def backup(engine, destino, paginas=PAGINAS_POR_PASSO, pausa_ms=PAUSA_MS, verificar=True):
+    """Copia o banco para `destino` com a API de backup do SQLite; retorna um resumo.
+
+    A cópia é gravada em `<destino>.parcial` e renomeada no final, então
+    `destino` nunca fica com uma cópia pela metade.
+    """
+    parcial = destino + '.parcial'
+    if os.path.exists(parcial):
+        os.remove(parcial)
+    inicio = time.perf_counter()
+    passos = 0
+
+    def progresso(status, restantes, total):
+        nonlocal passos
+        passos += 1
+        if pausa_ms and restantes:
+            time.sleep(pausa_ms / 1000)
+
+    bruto = engine.raw_connection()
+    try:
+        origem = bruto.driver_connection
+        wal = origem.execute('PRAGMA journal_mode').fetchone()[0].lower() == 'wal'
+        if wal:
+            # Snapshot fixo: os passos leem sempre a mesma versão do banco, mesmo com
+            # escritas entre eles (no WAL, uma leitura aberta não bloqueia os escritores)
+            origem.execute('BEGIN')
+            origem.execute('SELECT count(*) FROM sqlite_master').fetchone()
+        copia = sqlite3.connect(parcial)
+        try:
+            origem.backup(copia, pages=paginas if wal else -1, progress=progresso)
+            resultado = copia.execute('PRAGMA quick_check').fetchone()[0] if verificar else None
+        finally:
+            copia.close()
+        if wal:
+            origem.rollback()
+    finally:
+        bruto.close()
+
+    if verificar and resultado != 'ok':
+        os.remove(parcial)
+        raise RuntimeError(f'A cópia não passou no quick_check: {resultado}')
+    os.replace(parcial, destino)
+    return {
+        'destino': destino,
+        'bytes': os.path.getsize(destino),
+        'passos': passos,
+        'snapshot': 'wal' if wal else 'passo único',
+        'segundos': round(time.perf_counter() - inicio, 2),
+        'quick_check': resultado,
+    }
+
+
+def remover_antigos(diretorio, manter):
+    """Mantém só os `manter` backups mais recentes (site-*.db) de `diretorio`."""
+    arquivos = sorted(glob.glob(os.path.join(diretorio, 'site-*.db')))
+    removidos = arquivos[:-manter] if manter > 0 else []
+    for arquivo in removidos:
+        os.remove(arquivo)
+    return removidos
+
+
+def verificar(engine, completo=False, relatorio=None):
+    """Verifica a integridade e procura duplicatas; retorna (ok, resumo).
+
+    Com `relatorio` (diretório), grava as duplicatas encontradas em CSV no
+    formato de `migrations/duplicates_cachorro_*.csv`.
+    """
+    resumo = {}
+    carimbo = datetime.now().strftime('%Y%m%d-%H%M%S')
+    with engine.connect() as conexao:
+        pragma = 'integrity_check' if completo else 'quick_check'
+        mensagens = [linha[0] for linha in conexao.exec_driver_sql(f'PRAGMA {pragma}')]
+        resumo[pragma] = {'ok': mensagens == ['ok'], 'mensagens': mensagens[:EXEMPLOS]}
+
+        violacoes = conexao.exec_driver_sql('PRAGMA foreign_key_check').fetchall()
+        resumo['foreign_key_check'] = {
+            'ok': not violacoes,
+            'violacoes': len(violacoes),
+            'exemplos': [{'tabela': tabela, 'rowid': rowid, 'referencia': referencia}
+                         for tabela, rowid, referencia, _ in violacoes[:EXEMPLOS]],
+        }
+
+        for nome, duplicata in DUPLICATAS.items():
+            linhas = conexao.exec_driver_sql(duplicata['sql']).fetchall()
+            resumo[f'duplicatas_{nome}'] = {
+                'ok': not linhas,
+                'linhas': len(linhas),
+                'exemplos': [dict(zip(duplicata['colunas'], linha)) for linha in linhas[:EXEMPLOS]],
+            }
+            if linhas and relatorio:
+                caminho = os.path.join(relatorio, f"{duplicata['arquivo']}_{carimbo}.csv")
+                with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+                    escritor = csv.writer(arquivo)
+                    escritor.writerow(duplicata['colunas'])
+                    escritor.writerows(linhas)
+                resumo[f'duplicatas_{nome}']['arquivo'] = caminho
+    return all(item['ok'] for item in resumo.values()), resumo
+
+
+def otimizar(engine, completo=False):
+    """Atualiza as estatísticas do planejador de consultas; retorna um resumo."""
+    inicio = time.perf_counter()
+    with engine.connect() as conexao:
+        tem_estatisticas = conexao.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").first() is not None
+        if completo or not tem_estatisticas:
+            comando = 'ANALYZE'
+        else:
+            # Reanalisa só as tabelas cujo tamanho mudou bastante desde o último ANALYZE,
+            # lendo no máximo ~1000 linhas por índice
+            conexao.exec_driver_sql('PRAGMA analysis_limit=1000')
+            comando = 'PRAGMA optimize'
+        conexao.exec_driver_sql(comando)
+        conexao.commit()
+        estatisticas = conexao.exec_driver_sql('SELECT count(*) FROM sqlite_stat1').scalar()
+    return {'comando': comando, 'entradas_sqlite_stat1': estatisticas,
+            'segundos': round(time.perf_counter() - inicio, 2)}
+
+
+def vacuum(engine, paginas=PAGINAS_POR_PASSO, pausa_ms=PAUSA_MS, ativar=False, maximo=None):
+    """Devolve ao sistema as páginas livres do arquivo, em passos curtos; retorna um resumo.
+
+    - `ativar`: converte um banco com `auto_vacuum=NONE` (um VACUUM completo);
+    - `maximo`: limite de páginas liberadas nesta execução (padrão: todas).
+    """
+    inicio = time.perf_counter()
+    tamanho_antes = os.path.getsize(caminho_banco(engine))
+    with engine.connect() as conexao:
+        modo = conexao.exec_driver_sql('PRAGMA auto_vacuum').scalar()
+        convertido = modo != 2  # 0 = NONE, 1 = FULL, 2 = INCREMENTAL
+        if convertido:
+            if not ativar:
+                return {'auto_vacuum': modo, 'mensagem': 'auto_vacuum não é INCREMENTAL; use --ativar uma vez.'}
+            conexao.exec_driver_sql('PRAGMA auto_vacuum=INCREMENTAL')
+            conexao.exec_driver_sql('VACUUM')  # Reescreve o arquivo inteiro (já sem as páginas livres)
+        livres_antes = conexao.exec_driver_sql('PRAGMA freelist_count').scalar()
+        driver = conexao.connection.driver_connection
+        liberadas = 0
+        while True:
+            passo = paginas if maximo is None else min(paginas, maximo - liberadas)
+            livres = conexao.exec_driver_sql('PRAGMA freelist_count').scalar()
+            if livres == 0 or passo <= 0:
+                break
+            # `executescript` executa o PRAGMA até o fim (com `execute` o sqlite3 do
+            # Python liberaria uma página só); cada passo é uma transação própria
+            driver.executescript(f'PRAGMA incremental_vacuum({passo});')
+            liberadas += livres - conexao.exec_driver_sql('PRAGMA freelist_count').scalar()
+            if pausa_ms:
+                time.sleep(pausa_ms / 1000)
+        if conexao.exec_driver_sql('PRAGMA journal_mode').scalar().lower() == 'wal':
+            # O arquivo só diminui quando as páginas voltam do WAL (não espera leitores)
+            conexao.exec_driver_sql('PRAGMA wal_checkpoint(PASSIVE)')
+        conexao.commit()
+    return {
+        'convertido': convertido,
+        'paginas_livres_antes': livres_antes,
+        'paginas_liberadas': liberadas,
+        'bytes_antes': tamanho_antes,
+        'bytes_depois': os.path.getsize(caminho_banco(engine)),
+        'segundos': round(time.perf_counter() - inicio, 2),
+    }
+
+
+def podar(engine, dias=RETENCAO_DIAS):
+    """Descarta as lápides da sincronização com mais de `dias` dias (uma transação curta)."""
+    with engine.begin() as conexao:
+        removidas = podar_remocoes(conexao, dias)
+    return {'lapides_descartadas': removidas, 'dias': dias}
+
+
+def destino_backup(app, destino=None):
+    """Caminho do backup: `destino` (arquivo ou diretório) ou instance/backups/site-<data>.db."""
+    nome = f"site-{datetime.now().strftime('%Y%m%d-%H%M%S')}.db"
+    if destino is None:
+        destino = os.path.join(app.instance_path, DIRETORIO_BACKUPS)
+        os.makedirs(destino, exist_ok=True)
+    return os.path.join(destino, nome) if os.path.isdir(destino) else destino
+
+
+def agenda(app, args):
+    """Executa as tarefas periodicamente até o processo ser interrompido."""
+    tarefas = []
+    if args.backup_horas:
+        def tarefa_backup():
+            destino = destino_backup(app, args.destino)
+            resultado = backup(db.engine, destino, args.paginas, args.pausa_ms)
+            resultado['removidos'] = remover_antigos(os.path.dirname(destino), args.manter)
+            return resultado
+        tarefas.append(['backup', args.backup_horas * 3600, tarefa_backup])
+    if args.otimizar_horas:
+        tarefas.append(['otimizar', args.otimizar_horas * 3600, lambda: otimizar(db.engine)])
+    if args.vacuum_minutos:
+        tarefas.append(['vacuum', args.vacuum_minutos * 60,
+                        lambda: vacuum(db.engine, args.paginas, args.pausa_ms, maximo=args.maximo)])
+    if args.podar_horas:
+        tarefas.append(['podar', args.podar_horas * 3600, lambda: podar(db.engine, args.dias)])
+    proximas = {nome: time.monotonic() for nome, _, _ in tarefas}
+    while tarefas:
+        for nome, intervalo, executar in tarefas:
+            if time.monotonic() >= proximas[nome]:
+                try:
+                    resultado = executar()
+                except Exception as erro:  # Uma falha não interrompe as próximas execuções
+                    resultado = {'erro': str(erro)}
+                print(json.dumps({'tarefa': nome, 'em': datetime.now().isoformat(timespec='seconds'),
+                                  **resultado}, ensure_ascii=False), flush=True)
+                proximas[nome] = time.monotonic() + intervalo
+        time.sleep(max(1.0, min(proximas.values()) - time.monotonic()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backup, verificação e otimização do banco SQLite.')
+    parser.add_argument('--banco', help='arquivo SQLite alternativo (padrão: instance/site.db)')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    def passos(subparser):
+        subparser.add_argument('--paginas', type=int, default=PAGINAS_POR_PASSO,
+                               help=f'páginas por passo (padrão: {PAGINAS_POR_PASSO})')
+        subparser.add_argument('--pausa-ms', type=float, default=PAUSA_MS,
+                               help=f'pausa entre os passos em ms (padrão: {PAUSA_MS})')
+
+    sub = comandos.add_parser('backup', help='cópia consistente do banco com o servidor no ar')
+    passos(sub)
+    sub.add_argument('--destino', help='arquivo ou diretório (padrão: instance/backups/)')
+    sub.add_argument('--manter', type=int, default=0, help='mantém só os N backups mais recentes do diretório')
+    sub.add_argument('--sem-verificar', action='store_true', help='não roda o quick_check na cópia')
+
+    sub = comandos.add_parser('verificar', help='integridade, chaves estrangeiras e duplicatas')
+    sub.add_argument('--completo', action='store_true', help='integrity_check em vez de quick_check')
+    sub.add_argument('--relatorio', help='diretório onde gravar os CSVs das duplicatas')
+
+    sub = comandos.add_parser('otimizar', help='atualiza as estatísticas do planejador')
+    sub.add_argument('--completo', action='store_true', help='ANALYZE completo em vez de PRAGMA optimize')
+
+    sub = comandos.add_parser('vacuum', help='vacuum incremental em passos curtos')
+    passos(sub)
+    sub.add_argument('--ativar', action='store_true', help='converte o banco para auto_vacuum=INCREMENTAL')
+    sub.add_argument('--maximo', type=int, help='máximo de páginas liberadas nesta execução')
+
+    sub = comandos.add_parser('podar', help='descarta as lápides antigas da sincronização dos cachorros')
+    sub.add_argument('--dias', type=float, default=RETENCAO_DIAS,
+                     help=f'retenção das lápides em dias (padrão: {RETENCAO_DIAS})')
+
+    sub = comandos.add_parser('agenda', help='executa backup, otimização, vacuum e poda periodicamente')
+    passos(sub)
+    sub.add_argument('--backup-horas', type=float, default=24, help='intervalo dos backups (0 desliga; padrão: 24)')
+    sub.add_argument('--destino', help='diretório dos backups (padrão: instance/backups/)')
+    sub.add_argument('--manter', type=int, default=7, help='backups mantidos (padrão: 7)')
+    sub.add_argument('--otimizar-horas', type=float, default=6, help='intervalo do optimize (0 desliga; padrão: 6)')
+    sub.add_argument('--vacuum-minutos', type=float, default=60, help='intervalo do vacuum (0 desliga; padrão: 60)')
+    sub.add_argument('--maximo', type=int, default=10000, help='páginas liberadas por execução (padrão: 10000)')
+    sub.add_argument('--podar-horas', type=float, default=24, help='intervalo da poda (0 desliga; padrão: 24)')
+    sub.add_argument('--dias', type=float, default=RETENCAO_DIAS,
+                     help=f'retenção das lápides em dias (padrão: {RETENCAO_DIAS})')
+    args = parser.parse_args()
+
+    from app import create_app  # Importado aqui: evita carregar a app só para mostrar a ajuda
+    config = {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(args.banco)}'} if args.banco else None
+    app = create_app(config)
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            parser.error('a manutenção só se aplica a bancos SQLite')
+        if args.comando == 'backup':
+            resultado = backup(db.engine, destino_backup(app, args.destino), args.paginas, args.pausa_ms,
+                               not args.sem_verificar)
+            if args.manter:
+                resultado['removidos'] = remover_antigos(os.path.dirname(resultado['destino']), args.manter)
+        elif args.comando == 'verificar':
+            # Só leituras: usa o engine somente leitura, se existir (não disputa com os escritores)
+            engine = app.extensions.get('engine_leitura') or db.engine
+            ok, resultado = verificar(engine, args.completo, args.relatorio)
+            print(json.dumps(resultado, indent=2, ensure_ascii=False, default=str))
+            sys.exit(0 if ok else 1)
+        elif args.comando == 'otimizar':
+            resultado = otimizar(db.engine, args.completo)
+        elif args.comando == 'vacuum':
+            resultado = vacuum(db.engine, args.paginas, args.pausa_ms, args.ativar, args.maximo)
+        elif args.comando == 'podar':
+            resultado = podar(db.engine, args.dias)
+        else:
+            agenda(app, args)
+            return
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
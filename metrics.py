@@ -0,0 +1,207 @@
+# backend/metrics.py
+"""
+Instrumentação das requisições: latência, consultas SQL e bytes por rota.
+
+Para cada combinação (método, rota, status) a extensão acumula:
+- um histograma da latência da requisição;
+- a quantidade de comandos SQL e o tempo total gasto neles (medidos pelos
+  eventos `before_cursor_execute`/`after_cursor_execute` do SQLAlchemy);
+- os bytes enviados no corpo das respostas.
+
+Os números ficam disponíveis em `GET /metrics`, no formato texto do
+Prometheus. A rota é a regra do Flask (ex: `/usuarios/<int:user_id>`), não a
+URL concreta, para que o número de séries não cresça com os ids.
+
+Requisições lentas (`METRICAS_LIMITE_LENTO_MS`) ou com consultas demais
+(`METRICAS_LIMITE_CONSULTAS`) são registradas no log com os comandos SQL
+agrupados (quantas vezes cada um rodou) e o `EXPLAIN QUERY PLAN` de cada um.
+Um padrão N+1 aparece como o mesmo SELECT repetido dezenas de vezes.
+"""
+
+import threading
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+# Limites (em segundos) dos buckets do histograma de latência
+BUCKETS_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Serie:
+    """Valores acumulados de uma combinação (método, rota, status)."""
+
+    def __init__(self, buckets):
+        self.buckets = [0] * len(buckets)
+        self.quantidade = 0
+        self.soma_latencia = 0.0
+        self.consultas = 0
+        self.tempo_sql = 0.0
+        self.bytes = 0
+
+
+def _rotulos(metodo, rota, status):
+    rota = rota.replace('\\', '\\\\').replace('"', '\\"')
+    return f'method="{metodo}",route="{rota}",status="{status}"'
+
+
+class Metricas:
+    """Extensão Flask que coleta métricas por rota e expõe `/metrics`.
+
+    Configuração:
+        METRICAS_ATIVAS:            liga/desliga a coleta (padrão: True)
+        METRICAS_BUCKETS:           limites do histograma, em segundos
+        METRICAS_LIMITE_LENTO_MS:   latência a partir da qual a requisição é logada (padrão: 500)
+        METRICAS_LIMITE_CONSULTAS:  nº de comandos SQL a partir do qual é logada (padrão: 20)
+        METRICAS_EXPLAIN:           inclui o EXPLAIN QUERY PLAN no log (padrão: True)
+    """
+
+    def __init__(self, app=None, engine=None):
+        self._series = {}
+        self._coletores = []  # Funções que devolvem linhas extras (ex: contadores do cache de respostas)
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app, engine)
+
+    def init_app(self, app, engine):
+        app.config.setdefault('METRICAS_ATIVAS', True)
+        app.config.setdefault('METRICAS_BUCKETS', BUCKETS_PADRAO)
+        app.config.setdefault('METRICAS_LIMITE_LENTO_MS', 500)
+        app.config.setdefault('METRICAS_LIMITE_CONSULTAS', 20)
+        app.config.setdefault('METRICAS_EXPLAIN', True)
+        self.app = app
+        self.engine = engine
+        self.buckets = tuple(sorted(app.config['METRICAS_BUCKETS']))
+        limite_ms = app.config['METRICAS_LIMITE_LENTO_MS']
+        self.limite_lento = limite_ms / 1000 if limite_ms is not None else None
+        self.limite_consultas = app.config['METRICAS_LIMITE_CONSULTAS']
+        app.extensions['metricas'] = self
+        if not app.config['METRICAS_ATIVAS']:
+            return
+        self.instrumentar_engine(engine)
+        app.before_request(self._inicio)
+        app.after_request(self._fim)
+        app.add_url_rule('/metrics', 'metrics', self.exportar)
+
+    # --- SQL ---
+
+    def instrumentar_engine(self, engine):
+        """Mede os comandos SQL executados por um engine durante as requisições."""
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _antes(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('metricas_inicio', []).append(time.perf_counter())
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def _depois(conn, cursor, statement, parameters, context, executemany):
+            inicio = conn.info['metricas_inicio'].pop()
+            if has_request_context() and 'metricas_sql' in g:
+                g.metricas_sql.append((statement, parameters, executemany, time.perf_counter() - inicio))
+
+    # --- Requisições ---
+
+    def _inicio(self):
+        g.metricas_inicio = time.perf_counter()
+        g.metricas_sql = []
+
+    def _fim(self, response):
+        if 'metricas_inicio' not in g:
+            return response
+        latencia = time.perf_counter() - g.metricas_inicio
+        comandos = g.metricas_sql
+        tempo_sql = sum(c[3] for c in comandos)
+        rota = request.url_rule.rule if request.url_rule is not None else '<sem rota>'
+        tamanho = response.calculate_content_length() or 0  # Respostas em streaming: desconhecido
+
+        chave = (request.method, rota, response.status_code)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = Serie(self.buckets)
+            serie.quantidade += 1
+            serie.soma_latencia += latencia
+            for indice, limite in enumerate(self.buckets):
+                if latencia <= limite:
+                    serie.buckets[indice] += 1
+                    break
+            serie.consultas += len(comandos)
+            serie.tempo_sql += tempo_sql
+            serie.bytes += tamanho
+
+        if ((self.limite_lento is not None and latencia >= self.limite_lento)
+                or (self.limite_consultas is not None and len(comandos) >= self.limite_consultas)):
+            self._registrar_lenta(latencia, tempo_sql, comandos)
+        return response
+
+    def _registrar_lenta(self, latencia, tempo_sql, comandos):
+        """Loga a requisição com seus comandos SQL agrupados e os planos de execução."""
+        agrupados = {}
+        for statement, parametros, executemany, duracao in comandos:
+            item = agrupados.setdefault(statement, [0, 0.0, parametros, executemany])
+            item[0] += 1
+            item[1] += duracao
+        linhas = [f'Requisição lenta: {request.method} {request.full_path.rstrip("?")} '
+                  f'{latencia * 1000:.1f} ms, {len(comandos)} comandos SQL ({tempo_sql * 1000:.1f} ms)']
+        for statement, (vezes, duracao, parametros, executemany) in sorted(
+                agrupados.items(), key=lambda item: -item[1][1]):
+            linhas.append(f'  {vezes}x {duracao * 1000:.1f} ms: {" ".join(statement.split())}')
+            if self.app.config['METRICAS_EXPLAIN']:
+                for plano in self._explicar(statement, parametros, executemany):
+                    linhas.append(f'      plano: {plano}')
+        self.app.logger.warning('\n'.join(linhas))
+
+    def _explicar(self, statement, parametros, executemany):
+        """EXPLAIN QUERY PLAN de um comando (com os parâmetros da primeira execução)."""
+        if self.engine.dialect.name != 'sqlite' or statement.lstrip().upper().startswith(('PRAGMA', 'EXPLAIN')):
+            return []
+        if executemany:
+            parametros = parametros[0] if parametros else ()
+        try:
+            with self.engine.connect() as conexao:
+                linhas = conexao.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parametros).fetchall()
+        except Exception as erro:  # O log não pode derrubar a requisição
+            return [f'(indisponível: {erro})']
+        return [linha[-1] for linha in linhas]
+
+    # --- Exportação ---
+
+    def adicionar_coletor(self, coletor):
+        """Inclui em `/metrics` as linhas (texto do Prometheus) devolvidas por `coletor()`."""
+        self._coletores.append(coletor)
+
+    def texto_prometheus(self):
+        """Métricas no formato de exposição texto do Prometheus."""
+        with self._lock:
+            series = sorted(self._series.items())
+            copias = [(chave, list(s.buckets), s.quantidade, s.soma_latencia, s.consultas, s.tempo_sql, s.bytes)
+                      for chave, s in series]
+        linhas = [
+            '# HELP http_request_duration_seconds Latência das requisições HTTP.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (metodo, rota, status), buckets, quantidade, soma, _, _, _ in copias:
+            rotulos = _rotulos(metodo, rota, status)
+            acumulado = 0
+            for limite, valor in zip(self.buckets, buckets):
+                acumulado += valor
+                linhas.append(f'http_request_duration_seconds_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+            linhas.append(f'http_request_duration_seconds_bucket{{{rotulos},le="+Inf"}} {quantidade}')
+            linhas.append(f'http_request_duration_seconds_sum{{{rotulos}}} {soma:.6f}')
+            linhas.append(f'http_request_duration_seconds_count{{{rotulos}}} {quantidade}')
+
+        contadores = [
+            ('http_request_sql_queries_total', 'Comandos SQL executados pelas requisições.', 4, '{}'),
+            ('http_request_sql_seconds_total', 'Tempo gasto em comandos SQL pelas requisições.', 5, '{:.6f}'),
+            ('http_response_bytes_total', 'Bytes enviados no corpo das respostas.', 6, '{}'),
+        ]
+        for nome, descricao, posicao, formato in contadores:
+            linhas.append(f'# HELP {nome} {descricao}')
+            linhas.append(f'# TYPE {nome} counter')
+            for copia in copias:
+                linhas.append(f'{nome}{{{_rotulos(*copia[0])}}} {formato.format(copia[posicao])}')
+        for coletor in self._coletores:
+            linhas.extend(coletor())
+        return '\n'.join(linhas) + '\n'
+
+    def exportar(self):
+        """Rota `GET /metrics`."""
+        return self.app.response_class(self.texto_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
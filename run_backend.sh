@@ -3,7 +3,8 @@ set -euo pipefail
 # Script para iniciar o backend localmente (venv + install + run)
 # Uso:
 #   chmod +x backend/run_backend.sh
-#   ./backend/run_backend.sh
+#   ./backend/run_backend.sh            # servidor de desenvolvimento (Flask)
+#   ./backend/run_backend.sh producao   # gunicorn com vários workers (backend/serve.py)
 
 ROOT_DIR="$(cd "$(dirname "$0")/.." && pwd)"
 cd "$ROOT_DIR"
@@ -25,5 +26,10 @@ pip install -r backend/requirements.txt
 # Garante que a pasta instance exista
 mkdir -p backend/instance
 
+if [ "${1:-}" = "producao" ]; then
+  echo "Iniciando o servidor de produção (backend/serve.py)..."
+  exec python backend/serve.py "${@:2}"
+fi
+
 echo "Iniciando o servidor Flask (backend/app.py)..."
 exec python backend/app.py
@@ -0,0 +1,147 @@
+# backend/search.py
+"""
+Busca textual de raças com o FTS5 do SQLite.
+
+A tabela virtual `raca_fts` indexa `nome`, `cuidados`, `comportamento` e
+`racao` da tabela `raca` (tabela de conteúdo externo: o texto não é
+duplicado, só o índice). O tokenizador `unicode61 remove_diacritics 2`
+ignora acentos e maiúsculas ("frances" encontra "Francês") e o índice de
+prefixos (`prefix='2 3'`) deixa rápidas as buscas enquanto o usuário digita.
+
+Gatilhos (triggers) na tabela `raca` mantêm o índice em dia a cada INSERT,
+UPDATE ou DELETE, feitos pelo ORM, por `seed_db.py` ou direto no banco. O
+índice é criado junto com a tabela `raca` (`db.create_all()`) e, em bancos
+antigos, por `create_app()` (`garantir_indice_busca`).
+
+A busca (`buscar`) faz uma única consulta ao índice e usa o catálogo em
+memória (`catalog.py`) para os dados das raças, os filtros de `porte` e
+`grupo` e as contagens por faceta.
+
+Uso:
+    garantir_indice_busca(engine)  # cria e preenche o índice, se faltar
+    criar_indice_busca(conexao)    # cria tabela e gatilhos (se faltarem)
+    reconstruir_indice(conexao)    # reindexa todas as raças (seed_db.py)
+    buscar(catalogo.snapshot(), db.session.connection(), 'lab', porte='Grande')
+"""
+
+import re
+from functools import lru_cache
+from sqlalchemy import event, text
+from catalog import slugify
+from database import Raca
+
+# Pesos do bm25 por coluna (nome, cuidados, comportamento, racao): o nome vale mais
+PESOS_BM25 = (10.0, 1.0, 1.0, 1.0)
+
+COMANDOS_INDICE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS raca_fts USING fts5(
+        nome, cuidados, comportamento, racao,
+        content='raca', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS raca_fts_insert AFTER INSERT ON raca BEGIN
+        INSERT INTO raca_fts(rowid, nome, cuidados, comportamento, racao)
+        VALUES (new.id, new.nome, new.cuidados, new.comportamento, new.racao);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS raca_fts_delete AFTER DELETE ON raca BEGIN
+        INSERT INTO raca_fts(raca_fts, rowid, nome, cuidados, comportamento, racao)
+        VALUES ('delete', old.id, old.nome, old.cuidados, old.comportamento, old.racao);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS raca_fts_update AFTER UPDATE ON raca BEGIN
+        INSERT INTO raca_fts(raca_fts, rowid, nome, cuidados, comportamento, racao)
+        VALUES ('delete', old.id, old.nome, old.cuidados, old.comportamento, old.racao);
+        INSERT INTO raca_fts(rowid, nome, cuidados, comportamento, racao)
+        VALUES (new.id, new.nome, new.cuidados, new.comportamento, new.racao);
+    END""",
+]
+
+CONSULTA_BUSCA = text(
+    'SELECT rowid FROM raca_fts WHERE raca_fts MATCH :termos '
+    'ORDER BY bm25(raca_fts, %s, %s, %s, %s)' % PESOS_BM25
+)
+
+
+@event.listens_for(Raca.__table__, 'after_create')
+def _criar_com_tabela(tabela, conexao, **kw):
+    # `db.create_all()` cria o índice junto com a tabela `raca`
+    if conexao.dialect.name == 'sqlite':
+        criar_indice_busca(conexao)
+
+
+def garantir_indice_busca(engine):
+    """Cria e preenche o índice em bancos antigos que já têm raças mas não o índice."""
+    if engine.dialect.name != 'sqlite':
+        return
+    with engine.begin() as conexao:
+        tem_racas = conexao.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'raca'").first() is not None
+        if tem_racas and criar_indice_busca(conexao):
+            reconstruir_indice(conexao)
+
+
+def criar_indice_busca(conexao):
+    """Cria a tabela `raca_fts` e os gatilhos, se ainda não existirem.
+
+    Retorna True se o índice acabou de ser criado (e precisa ser preenchido).
+    """
+    existia = conexao.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'raca_fts'").first() is not None
+    for comando in COMANDOS_INDICE:
+        conexao.exec_driver_sql(comando)
+    return not existia
+
+
+def reconstruir_indice(conexao):
+    """Reindexa todas as raças a partir da tabela `raca`."""
+    conexao.exec_driver_sql("INSERT INTO raca_fts(raca_fts) VALUES ('rebuild')")
+
+
+def termos_fts(consulta):
+    """Converte o texto digitado numa expressão MATCH segura.
+
+    Cada palavra vira um termo entre aspas (sem operadores do FTS5) e a
+    última é buscada como prefixo, para a busca enquanto se digita.
+    Ex: 'golden ret' -> '"golden" "ret"*'. Retorna None se não houver palavras.
+    """
+    palavras = re.findall(r'\w+', consulta or '')
+    if not palavras:
+        return None
+    return ' '.join(f'"{palavra}"' for palavra in palavras) + '*'
+
+
+@lru_cache(maxsize=1024)
+def _normalizar(valor):
+    return slugify(valor or '')
+
+
+def buscar(snapshot, conexao, consulta=None, porte=None, grupo=None, limite=20):
+    """Busca raças por texto e filtra por porte/grupo.
+
+    Retorna um dicionário com `total`, os `resultados` (dicionários das raças,
+    do mais para o menos relevante) e as `facetas` com as contagens por
+    porte e por grupo. A contagem de cada faceta considera o texto e o
+    filtro da outra faceta, mas não o seu próprio filtro, para que o
+    frontend mostre quantas raças cada opção traria.
+    """
+    termos = termos_fts(consulta)
+    if termos is None:
+        # Sem texto: todas as raças, em ordem alfabética
+        ids = sorted(snapshot.racas, key=lambda raca_id: _normalizar(snapshot.racas[raca_id]['nome']))
+    else:
+        ids = [linha[0] for linha in conexao.execute(CONSULTA_BUSCA, {'termos': termos})]
+    racas = [snapshot.racas[raca_id] for raca_id in ids if raca_id in snapshot.racas]
+
+    filtro_porte = _normalizar(porte) if porte else None
+    filtro_grupo = _normalizar(grupo) if grupo else None
+    facetas = {'porte': {}, 'grupo': {}}
+    resultados = []
+    for raca in racas:
+        porte_ok = filtro_porte is None or _normalizar(raca['porte']) == filtro_porte
+        grupo_ok = filtro_grupo is None or _normalizar(raca['grupo']) == filtro_grupo
+        if grupo_ok and raca['porte']:
+            facetas['porte'][raca['porte']] = facetas['porte'].get(raca['porte'], 0) + 1
+        if porte_ok and raca['grupo']:
+            facetas['grupo'][raca['grupo']] = facetas['grupo'].get(raca['grupo'], 0) + 1
+        if porte_ok and grupo_ok:
+            resultados.append(raca)
+    return {'total': len(resultados), 'resultados': resultados[:limite], 'facetas': facetas}
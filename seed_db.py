@@ -11,34 +11,30 @@ e demonstração (por exemplo: para o vídeo e testes locais).
 Uso:
     python seed_db.py
 
+    # ou, a partir de outro script (dentro de um contexto de aplicação):
+    from seed_db import seed_database
+    with app.app_context():
+        seed_database()
+
 Observações:
 - Garante que a pasta `instance/` exista (onde o arquivo SQLite é criado);
-- Evita duplicatas checando se uma raça já existe antes de inseri-la.
+- Evita duplicatas checando quais raças já existem antes de inseri-las;
+- Constrói o índice de busca textual das raças (`search.py`);
+- Importar este módulo não cria app nem conecta ao banco: isso só acontece
+  ao executá-lo diretamente (bloco `__main__`). Para gerar muitos usuários e
+  cachorros de teste, veja `gerar_dados.py`.
 """
 
 import os
 from app import create_app # Importa a função create_app do nosso app.py
 from database import db, Raca
-
-# --- Configuração ---
-# O Flask-SQLAlchemy precisa de um contexto de aplicação para operar o banco de dados.
-# Usamos a função create_app para criar uma instância de aplicativo "temporária" e um contexto para as operações de banco.
-app = create_app()
-
-# ESTE BLOCO É A CORREÇÃO PRINCIPAL E ESTÁ FALTANDO NO SEU ARQUIVO:
-# Garante que a pasta 'instance' exista antes de tentar criar o banco de dados nela.
-if not os.path.exists('instance'):
-    os.makedirs('instance')
-# FIM DO BLOCO DE CORREÇÃO
-
-
-
-
-# Empurra o contexto da aplicação para que possamos usar o SQLAlchemy aqui
-app.app_context().push() # Ativa o contexto da aplicação para operações de banco
+from search import criar_indice_busca, reconstruir_indice
 
 def seed_database():
-    """Popula o banco de dados com dados iniciais de raças."""
+    """Popula o banco de dados com dados iniciais de raças.
+
+    Deve ser chamada dentro de um contexto de aplicação (`app.app_context()`).
+    """
     print("Verificando e criando tabelas no banco de dados...")
     # Cria todas as tabelas definidas em database.py se elas ainda não existirem
     db.create_all()
@@ -146,17 +142,33 @@ def seed_database():
 
     print(f"Caminho atual: {os.getcwd()}") # Para depuração, verificar onde o script está sendo executado
 
+    # Busca de uma vez os nomes das raças já cadastradas (em vez de uma consulta por raça)
+    existentes = set(db.session.execute(db.select(Raca.nome)).scalars())
     for raca_data in racas_data:
         # Verifica se a raça já existe no banco de dados para evitar duplicatas
-        if not Raca.query.filter_by(nome=raca_data['nome']).first():
+        if raca_data['nome'] not in existentes:
             raca = Raca(**raca_data) # Cria um novo objeto Raca com os dados
             db.session.add(raca) # Adiciona o objeto à sessão do banco de dados
             print(f"Adicionando raça: {raca_data['nome']}")
         else:
             print(f"Raça {raca_data['nome']} já existe. Pulando.")
     
+    # Índice de busca textual das raças (FTS5; ver `search.py`): os gatilhos já indexam
+    # as raças novas, mas a reconstrução garante o índice completo também em bancos antigos.
+    if db.engine.dialect.name == 'sqlite':
+        conexao = db.session.connection()
+        criar_indice_busca(conexao)
+        reconstruir_indice(conexao)
+
     db.session.commit() # Salva todas as mudanças pendentes no banco de dados
     print("Banco de dados populado com sucesso (ou já estava populado)!")
 
 if __name__ == '__main__':
-    seed_database()
+    # Garante que a pasta 'instance' exista antes de tentar criar o banco de dados nela.
+    os.makedirs(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance'), exist_ok=True)
+
+    # O Flask-SQLAlchemy precisa de um contexto de aplicação para operar o banco de dados.
+    # Usamos a função create_app para criar uma instância de aplicativo "temporária" e um contexto para as operações de banco.
+    app = create_app()
+    with app.app_context(): # Ativa o contexto da aplicação para operações de banco
+        seed_database()
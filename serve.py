@@ -0,0 +1,187 @@
+# backend/serve.py
+"""
+Ponto de entrada de produção: `create_app()` servido pelo gunicorn com
+vários processos (workers) e threads.
+
+`python app.py` usa o servidor de desenvolvimento do Werkzeug: um único
+processo e o depurador ligado. Aqui a aplicação é criada uma vez no processo
+mestre, antes do fork (`preload_app`), e os workers a herdam por
+copy-on-write (catálogo de raças, manifesto do frontend, módulos
+importados). Num banco novo (ex: `--banco` apontando para um arquivo que
+ainda não existe), o mestre cria as tabelas e as raças iniciais antes do
+fork, como `python app.py` e `seed_db.py`. Depois do fork, cada worker:
+- descarta as conexões SQLite herdadas do mestre (não podem ser
+  compartilhadas entre processos) e abre as suas;
+- aquece os pools de conexões de escrita e de leitura (os PRAGMAs são
+  aplicados na conexão) e o catálogo de raças, para que as primeiras
+  requisições não paguem esse custo.
+
+O desligamento é gracioso: ao receber SIGTERM, o gunicorn para de aceitar
+conexões e espera as requisições em andamento (até --graceful-timeout).
+
+Observação: com vários workers, cada processo tem suas próprias métricas
+(`/metrics`) e seu próprio catálogo em memória. O cache das respostas
+(`--cache`, ver cache.py) só fica coerente entre processos no armazém
+compartilhado; com `--cache memoria` é preciso um único worker.
+
+Uso:
+    python serve.py                                   # 0.0.0.0:8000, workers = nº de CPUs
+    python serve.py --bind 127.0.0.1:5000 --workers 4 --threads 8
+    python serve.py --banco /tmp/grande.db --workers 2
+    python serve.py --grupo-commit                    # commit em grupo das escritas
+    python serve.py --cache compartilhado             # cache das respostas em /dev/shm
+"""
+
+import argparse
+import os
+from gunicorn.app.base import BaseApplication
+from sqlalchemy import select
+from app import create_app
+from database import db, Raca
+from seed_db import seed_database
+
+
+class Servidor(BaseApplication):
+    """Aplicação gunicorn que serve a fábrica `create_app()`."""
+
+    def __init__(self, opcoes, config_app=None):
+        self.opcoes = opcoes
+        self.config_app = config_app or {}
+        self.application = None
+        super().__init__()
+
+    def load_config(self):
+        for nome, valor in self.opcoes.items():
+            if nome in self.cfg.settings and valor is not None:
+                self.cfg.set(nome, valor)
+        # Ganchos do ciclo de vida dos workers
+        self.cfg.set('post_fork', post_fork)
+        self.cfg.set('worker_exit', worker_exit)
+
+    def load(self):
+        if self.application is None:
+            self.application = create_app(self.config_app)
+            with self.application.app_context():
+                preparar_banco()
+            # As conexões abertas pela fábrica (esquema, catálogo) não podem ir para os workers
+            for engine in engines(self.application):
+                engine.dispose()
+        return self.application
+
+
+def preparar_banco():
+    """Cria as tabelas que faltarem e, se não houver raças, as raças iniciais (`seed_db.py`).
+
+    Sem isso, num banco novo cada worker morre ao aquecer o catálogo (`no such table: raca`).
+    """
+    db.create_all()
+    if db.session.execute(select(Raca.id).limit(1)).first() is None:
+        seed_database()
+    db.session.remove()
+
+
+def engines(app):
+    """Engine principal e, se existir, o engine somente leitura das rotas GET."""
+    with app.app_context():
+        principal = db.engine
+    return [engine for engine in (principal, app.extensions.get('engine_leitura')) if engine is not None]
+
+
+def aquecer(app, conexoes):
+    """Abre `conexoes` conexões em cada pool e monta o catálogo de raças."""
+    for engine in engines(app):
+        abertas = []
+        try:
+            for _ in range(min(conexoes, engine.pool.size())):
+                conexao = engine.connect()
+                conexao.exec_driver_sql('SELECT 1').fetchall()
+                abertas.append(conexao)
+        finally:
+            for conexao in abertas:
+                conexao.close()  # Volta para o pool, já conectada
+    with app.app_context():
+        app.extensions['catalogo_racas'].snapshot()
+
+
+def post_fork(server, worker):
+    app = worker.app.load()  # Mesma instância criada no mestre (preload_app)
+    for engine in engines(app):
+        # Conexões herdadas do mestre são abandonadas sem fechar (o mestre ainda é o dono)
+        engine.dispose(close=False)
+    aquecer(app, worker.cfg.threads)
+    server.log.info('Worker %s pronto (%s conexões aquecidas por pool)', worker.pid, worker.cfg.threads)
+
+
+def worker_exit(server, worker):
+    for engine in engines(worker.app.load()):
+        engine.dispose()
+
+
+def arquivo_cache_padrao():
+    """Arquivo do cache compartilhado: em memória (/dev/shm) quando o sistema tiver."""
+    if os.path.isdir('/dev/shm'):
+        return '/dev/shm/pet-cache.db'
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'cache-respostas.db')
+
+
+def opcoes_padrao(args):
+    """Opções do gunicorn a partir dos argumentos da linha de comando."""
+    return {
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'preload_app': True,
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'keepalive': args.keepalive,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests // 10 if args.max_requests else 0,
+        'accesslog': '-' if args.access_log else None,
+        'loglevel': args.log_level,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve a API com gunicorn (vários processos e threads).')
+    parser.add_argument('--bind', default=os.environ.get('BIND', '0.0.0.0:8000'),
+                        help='endereço:porta (padrão: 0.0.0.0:8000 ou $BIND)')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WORKERS', os.cpu_count() or 1)),
+                        help='processos worker (padrão: nº de CPUs ou $WORKERS)')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('THREADS', 4)),
+                        help='threads por worker (padrão: 4 ou $THREADS)')
+    parser.add_argument('--banco', help='arquivo SQLite alternativo (padrão: instance/site.db)')
+    parser.add_argument('--grupo-commit', action='store_true',
+                        help='junta as escritas simultâneas em uma transação (ver group_commit.py)')
+    parser.add_argument('--cache', choices=('memoria', 'compartilhado'),
+                        help='liga o cache das respostas por usuário (ver cache.py); '
+                             'memoria exige --workers 1')
+    parser.add_argument('--cache-arquivo',
+                        help='arquivo do cache compartilhado (padrão: /dev/shm/pet-cache.db, '
+                             'ou instance/cache-respostas.db se não houver /dev/shm)')
+    parser.add_argument('--timeout', type=int, default=30, help='segundos até reiniciar um worker travado')
+    parser.add_argument('--graceful-timeout', type=int, default=30,
+                        help='segundos para concluir as requisições ao desligar (padrão: 30)')
+    parser.add_argument('--keepalive', type=int, default=5, help='segundos de keep-alive HTTP (padrão: 5)')
+    parser.add_argument('--max-requests', type=int, default=0,
+                        help='recicla o worker após N requisições (padrão: 0 = nunca)')
+    parser.add_argument('--access-log', action='store_true', help='imprime o log de acesso')
+    parser.add_argument('--log-level', default='info', help='nível de log do gunicorn (padrão: info)')
+    args = parser.parse_args(argv)
+    if args.cache == 'memoria' and args.workers > 1:
+        parser.error('--cache memoria não é invalidado entre processos; use --workers 1 ou --cache compartilhado')
+
+    config_app = {}
+    if args.banco:
+        config_app['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.abspath(args.banco)}'
+    if args.grupo_commit:
+        config_app['GRUPO_COMMIT'] = True
+    if args.cache:
+        config_app['CACHE_RESPOSTAS'] = True
+    if args.cache == 'compartilhado':
+        config_app['CACHE_RESPOSTAS_ARQUIVO'] = os.path.abspath(args.cache_arquivo or arquivo_cache_padrao())
+    Servidor(opcoes_padrao(args), config_app).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+# backend/sincronizacao.py
+"""
+Sincronização incremental dos cachorros de um usuário (`/cachorros/changes`).
+
+O frontend recarregava a lista inteira (`GET /usuarios/<id>/cachorros`, com
+as raças) depois de cada alteração. Com as tabelas daqui, ele guarda um
+cursor e pede só o que mudou desde então:
+
+- `sequencia_cachorro`: uma linha com o contador de alterações (`valor`) e o
+  horizonte das remoções já descartadas (`podado_ate`);
+- `alteracao_cachorro`: por cachorro existente, o dono e o número da última
+  alteração (`seq`), com índice (user_id, seq);
+- `cachorro_removido`: as "lápides" dos cachorros removidos
+  (`DELETE /cachorros/<id>`, inclusive em cascata) ou transferidos para outro
+  dono (`PUT /cachorros/<id>` mudando `user_id`), também com índice
+  (user_id, seq). O `seq` de cada lápide é único e serve de chave primária.
+
+Gatilhos em `cachorro` incrementam o contador e atualizam as duas tabelas
+dentro da mesma transação de cada INSERT, UPDATE ou DELETE (rotas, lotes,
+importações). Como o SQLite tem um único escritor por vez, os números são
+atribuídos na ordem dos commits: quem leu o contador já vê todas as
+alterações com `seq` menor ou igual a ele. Uma consulta percorre só as
+entradas do usuário com `seq` maior que o cursor, então o custo e o tamanho
+da resposta dependem do número de alterações, não do número de cachorros.
+
+As lápides mais antigas que `RETENCAO_DIAS` são descartadas por
+`podar_remocoes` (`python manutencao.py podar`, também na `agenda`). Um
+cursor anterior ao horizonte descartado (ou a ausência de cursor, ou um
+cursor à frente do contador, depois de restaurar um backup) recebe a lista
+completa, marcada com `completo: true`, para o cliente substituir o que tem.
+
+As tabelas são criadas junto com a tabela `cachorro` (`db.create_all()`) e,
+em bancos antigos, por `create_app()` (`garantir_sincronizacao`). A
+reconstrução (ex: depois de `gerar_dados.py`, que carrega com os gatilhos
+desligados) renumera os cachorros e obriga todos os clientes a uma
+sincronização completa.
+
+Uso:
+    python sincronizacao.py --podar --dias 30
+    python sincronizacao.py --reconstruir --banco /tmp/grande.db
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import column, event, table, text
+from database import Cachorro, consulta_cachorros, cachorro_de_linha
+
+# Dias em que as lápides ficam guardadas (clientes parados há mais tempo recebem a lista completa)
+RETENCAO_DIAS = 30
+
+# Alterações devolvidas por resposta (o restante vem nas próximas, com `mais: true`)
+ALTERACOES_POR_RESPOSTA = 500
+ALTERACOES_POR_RESPOSTA_MAXIMO = 1000
+
+TABELAS = [
+    """CREATE TABLE IF NOT EXISTS sequencia_cachorro (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        valor INTEGER NOT NULL,
+        podado_ate INTEGER NOT NULL
+    )""",
+    'INSERT OR IGNORE INTO sequencia_cachorro (id, valor, podado_ate) VALUES (1, 0, 0)',
+    """CREATE TABLE IF NOT EXISTS alteracao_cachorro (
+        cachorro_id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        seq INTEGER NOT NULL
+    )""",
+    'CREATE INDEX IF NOT EXISTS ix_alteracao_cachorro_user_seq ON alteracao_cachorro (user_id, seq)',
+    """CREATE TABLE IF NOT EXISTS cachorro_removido (
+        seq INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        cachorro_id INTEGER NOT NULL,
+        removido_em TEXT NOT NULL
+    )""",
+    'CREATE INDEX IF NOT EXISTS ix_cachorro_removido_user_seq ON cachorro_removido (user_id, seq)',
+]
+
+_PROXIMO = 'UPDATE sequencia_cachorro SET valor = valor + 1 WHERE id = 1;'
+_ATUAL = '(SELECT valor FROM sequencia_cachorro WHERE id = 1)'
+# Mesmo formato das datas gravadas pela aplicação (UTC, texto)
+_AGORA = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+def _registrar(registro):
+    """Comando que grava o cachorro (`new`) como alterado no número atual da sequência."""
+    return f"""
+        INSERT INTO alteracao_cachorro (cachorro_id, user_id, seq) VALUES ({registro}.id, {registro}.user_id, {_ATUAL})
+            ON CONFLICT (cachorro_id) DO UPDATE SET user_id = excluded.user_id, seq = excluded.seq;"""
+
+
+def _lapide(condicao='1'):
+    """Comando que grava a lápide do cachorro `old` para o seu dono (se `condicao`)."""
+    return f"""
+        INSERT INTO cachorro_removido (seq, user_id, cachorro_id, removido_em)
+            SELECT {_ATUAL}, old.user_id, old.id, {_AGORA} WHERE {condicao};"""
+
+
+GATILHOS = {
+    'sincronizacao_cachorro_insert': f"""CREATE TRIGGER IF NOT EXISTS sincronizacao_cachorro_insert
+        AFTER INSERT ON cachorro BEGIN {_PROXIMO} {_registrar('new')}
+    END""",
+    'sincronizacao_cachorro_delete': f"""CREATE TRIGGER IF NOT EXISTS sincronizacao_cachorro_delete
+        AFTER DELETE ON cachorro BEGIN {_PROXIMO}
+        DELETE FROM alteracao_cachorro WHERE cachorro_id = old.id; {_lapide()}
+    END""",
+    # Qualquer coluna visível na API (e `versao`, que muda a cada PUT); transferências geram a lápide
+    'sincronizacao_cachorro_update': f"""CREATE TRIGGER IF NOT EXISTS sincronizacao_cachorro_update
+        AFTER UPDATE OF nome_pet, idade, peso, info_extra, data_registro, user_id, raca_id, versao
+        ON cachorro BEGIN {_PROXIMO} {_registrar('new')} {_lapide('old.user_id IS NOT new.user_id')}
+    END""",
+}
+
+# Renumera todos os cachorros com um único número novo e descarta as lápides:
+# os cursores anteriores ficam abaixo do horizonte e recebem a lista completa.
+RECONSTRUCAO = [
+    'UPDATE sequencia_cachorro SET valor = valor + 1, podado_ate = valor + 1 WHERE id = 1',
+    'DELETE FROM alteracao_cachorro',
+    'DELETE FROM cachorro_removido',
+    f'INSERT INTO alteracao_cachorro (cachorro_id, user_id, seq) SELECT id, user_id, {_ATUAL} FROM cachorro',
+]
+
+CONSULTA_SEQUENCIA = text(
+    'SELECT valor, podado_ate, EXISTS (SELECT 1 FROM user WHERE id = :user_id) FROM sequencia_cachorro WHERE id = 1'
+)
+CONSULTA_REMOVIDOS = text(
+    'SELECT seq, cachorro_id FROM cachorro_removido '
+    'WHERE user_id = :user_id AND seq > :desde AND seq <= :ate ORDER BY seq LIMIT :limite'
+)
+
+alteracao_cachorro = table('alteracao_cachorro', column('cachorro_id'), column('user_id'), column('seq'))
+
+
+def criar_sincronizacao(conexao):
+    """Cria as tabelas e os gatilhos, se ainda não existirem.
+
+    Retorna True se as tabelas acabaram de ser criadas (e precisam ser preenchidas).
+    """
+    existia = conexao.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'alteracao_cachorro'").first() is not None
+    for comando in TABELAS + list(GATILHOS.values()):
+        conexao.exec_driver_sql(comando)
+    return not existia
+
+
+def reconstruir_sincronizacao(conexao):
+    """Recalcula `alteracao_cachorro` a partir de `cachorro` (todos os clientes sincronizam do zero)."""
+    for comando in RECONSTRUCAO:
+        conexao.exec_driver_sql(comando)
+
+
+@event.listens_for(Cachorro.__table__, 'after_create')
+def _criar_com_tabela(tabela, conexao, **kw):
+    # `db.create_all()` cria as tabelas da sincronização junto com a tabela `cachorro`
+    if conexao.dialect.name == 'sqlite':
+        criar_sincronizacao(conexao)
+
+
+def garantir_sincronizacao(engine):
+    """Cria e preenche as tabelas em bancos antigos que já têm cachorros mas não a sincronização."""
+    if engine.dialect.name != 'sqlite':
+        return
+    with engine.begin() as conexao:
+        tem_cachorros = conexao.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cachorro'").first() is not None
+        if tem_cachorros and criar_sincronizacao(conexao):
+            reconstruir_sincronizacao(conexao)
+
+
+def podar_remocoes(conexao, dias=RETENCAO_DIAS):
+    """Descarta as lápides com mais de `dias` dias e avança o horizonte (`podado_ate`).
+
+    Retorna o número de lápides descartadas.
+    """
+    corte = (datetime.utcnow() - timedelta(days=dias)).strftime('%Y-%m-%d %H:%M:%S')
+    limite = conexao.execute(text('SELECT max(seq) FROM cachorro_removido WHERE removido_em < :corte'),
+                             {'corte': corte}).scalar()
+    if limite is None:
+        return 0
+    # Por `seq` (e não pela data): tudo até o horizonte some, mesmo que o relógio tenha voltado
+    removidas = conexao.execute(text('DELETE FROM cachorro_removido WHERE seq <= :limite'),
+                                {'limite': limite}).rowcount
+    conexao.execute(text('UPDATE sequencia_cachorro SET podado_ate = max(podado_ate, :limite) WHERE id = 1'),
+                    {'limite': limite})
+    return removidas
+
+
+def _consulta_completa(*extras):
+    return consulta_cachorros(False, False, *extras)
+
+
+def consultar_alteracoes(conexao, user_id, desde=None, limite=ALTERACOES_POR_RESPOSTA,
+                         consulta=_consulta_completa, de_linha=cachorro_de_linha):
+    """Cachorros alterados e removidos de um usuário desde o cursor `desde`.
+
+    `consulta(*extras)` monta o SELECT dos cachorros e `de_linha(linha)` serializa
+    cada linha (padrão: todos os campos; ver `campos.py` para os campos esparsos).
+
+    Retorna None se o usuário não existir, ou um dicionário com:
+    - `cachorros`: os cachorros criados/alterados (formato de `to_dict`), em ordem de alteração;
+    - `removidos`: os ids dos cachorros removidos ou transferidos para outro dono;
+    - `cursor`: o valor a enviar em `since` na próxima consulta;
+    - `completo`: True quando `cachorros` é a lista inteira (sem cursor ou com um
+      cursor fora do intervalo guardado): o cliente deve substituir o que tem;
+    - `mais`: True se ainda há alterações depois deste cursor (consultar de novo).
+    """
+    # O contador é lido antes de tudo: as alterações até ele já estão gravadas, e as
+    # seguintes (mesmo as que forem confirmadas durante esta consulta) ficam para a próxima.
+    atual, podado_ate, existe = conexao.execute(CONSULTA_SEQUENCIA, {'user_id': user_id}).one()
+    if not existe:
+        return None
+
+    # Cursor maior que o contador: o banco voltou a um backup anterior ao cursor
+    if desde is None or desde < podado_ate or desde > atual:
+        linhas = conexao.execute(consulta().where(Cachorro.user_id == user_id)).all()
+        return {'cachorros': [de_linha(linha) for linha in linhas], 'removidos': [],
+                'cursor': atual, 'completo': True, 'mais': False}
+
+    # Um registro a mais de cada tabela só para saber se existe continuação
+    alterados = conexao.execute(
+        consulta(alteracao_cachorro.c.cachorro_id, alteracao_cachorro.c.seq)
+        .join(alteracao_cachorro, alteracao_cachorro.c.cachorro_id == Cachorro.id)
+        .where(alteracao_cachorro.c.user_id == user_id, alteracao_cachorro.c.seq > desde,
+               alteracao_cachorro.c.seq <= atual)
+        .order_by(alteracao_cachorro.c.seq).limit(limite + 1)
+    ).all()
+    removidos = conexao.execute(CONSULTA_REMOVIDOS, {'user_id': user_id, 'desde': desde, 'ate': atual,
+                                                     'limite': limite + 1}).all()
+
+    # Junta as duas listas em ordem de `seq` e fica com as `limite` primeiras alterações
+    eventos = sorted([(linha[-1], linha, None) for linha in alterados] +
+                     [(seq, None, cachorro_id) for seq, cachorro_id in removidos], key=lambda evento: evento[0])
+    mais = len(eventos) > limite
+    eventos = eventos[:limite]
+    alterados = [linha for _, linha, _ in eventos if linha is not None]
+    # Um cachorro que saiu e voltou para o mesmo dono aparece só como alterado
+    presentes = {linha[-2] for linha in alterados}
+    return {
+        'cachorros': [de_linha(linha) for linha in alterados],
+        'removidos': [cachorro_id for _, linha, cachorro_id in eventos
+                      if linha is None and cachorro_id not in presentes],
+        'cursor': eventos[-1][0] if mais else atual,
+        'completo': False,
+        'mais': mais,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Poda ou reconstrói as tabelas da sincronização dos cachorros.')
+    parser.add_argument('--banco', help='arquivo SQLite alternativo (padrão: instance/site.db)')
+    parser.add_argument('--podar', action='store_true', help='descarta as lápides mais antigas que --dias')
+    parser.add_argument('--dias', type=float, default=RETENCAO_DIAS,
+                        help=f'retenção das lápides em dias (padrão: {RETENCAO_DIAS})')
+    parser.add_argument('--reconstruir', action='store_true',
+                        help='recalcula a partir de `cachorro` (todos os clientes sincronizam do zero)')
+    args = parser.parse_args()
+
+    from app import create_app  # Importado aqui: `app.py` também importa este módulo
+    from database import db
+    config = {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(args.banco)}'} if args.banco else None
+    app = create_app(config)
+    with app.app_context(), db.engine.begin() as conexao:
+        resultado = {}
+        if args.reconstruir:
+            criar_sincronizacao(conexao)
+            reconstruir_sincronizacao(conexao)
+            resultado['reconstruido'] = True
+        if args.podar:
+            resultado['lapides_descartadas'] = podar_remocoes(conexao, args.dias)
+        valor, podado_ate = conexao.exec_driver_sql(
+            'SELECT valor, podado_ate FROM sequencia_cachorro WHERE id = 1').one()
+        print(json.dumps({**resultado, 'sequencia': valor, 'podado_ate': podado_ate}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
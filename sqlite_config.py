@@ -0,0 +1,127 @@
+# backend/sqlite_config.py
+"""
+Perfis de configuração do engine SQLite usados pela fábrica `create_app()`.
+
+Por padrão o SQLite trabalha em modo "rollback journal": um escritor
+bloqueia todos os leitores e cada commit paga um fsync completo. O perfil
+`producao` liga o modo WAL (leitores não bloqueiam o escritor), reduz o
+custo de sincronização e aumenta os caches. Os PRAGMAs são aplicados a
+cada nova conexão do pool por meio do evento `connect` do SQLAlchemy.
+
+Configuração (em `app.config` ou pelo parâmetro `config` de `create_app`):
+    SQLITE_PERFIL:  'producao' (padrão) ou 'padrao' (comportamento original
+                    do SQLite); também pode vir da variável de ambiente
+                    SQLITE_PERFIL.
+    SQLITE_PRAGMAS: dicionário opcional que sobrescreve PRAGMAs do perfil.
+    SQLITE_LEITURA: cria o engine somente leitura das requisições GET
+                    (padrão: ligado nos perfis com WAL).
+    SQLITE_LEITURA_POOL: conexões do pool de leitura (padrão: 20).
+
+Com WAL, os leitores não esperam o escritor. `criar_engine_leitura` abre um
+segundo engine sobre o mesmo arquivo, com conexões `mode=ro` e
+`query_only=ON` e um pool dimensionado à parte; a `SessaoRoteada` de
+`database.py` envia para ele as consultas das requisições GET.
+"""
+
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+PERFIS = {
+    # Sem nenhum ajuste: rollback journal, synchronous=FULL, caches padrão.
+    'padrao': {
+        'pragmas': {},
+        'engine': {},
+    },
+    'producao': {
+        # A ordem importa: auto_vacuum e journal_mode devem ser definidos antes dos demais.
+        'pragmas': {
+            # Bancos novos liberam espaço aos poucos (`manutencao.py vacuum`). Só vale antes
+            # da criação das tabelas e do WAL; nos bancos existentes não muda nada.
+            'auto_vacuum': 'INCREMENTAL',
+            'journal_mode': 'WAL',         # Leitores e escritor em paralelo
+            'synchronous': 'NORMAL',       # Em WAL, fsync só nos checkpoints
+            'cache_size': -64000,          # ~64 MB de cache de páginas por conexão
+            'mmap_size': 268435456,        # Até 256 MB lidos via memória mapeada
+            'temp_store': 'MEMORY',        # Tabelas temporárias (ORDER BY/GROUP BY) em memória
+            'busy_timeout': 5000,          # Espera até 5 s pelo lock em vez de falhar
+            'foreign_keys': 'ON',          # Faz valer as chaves estrangeiras declaradas
+        },
+        'engine': {
+            # As conexões circulam entre as threads do servidor pelo pool.
+            'connect_args': {'check_same_thread': False, 'timeout': 5},
+            'pool_size': 10,
+            'max_overflow': 20,
+            'pool_timeout': 30,
+        },
+        'leitura': True,  # Engine somente leitura separado para as requisições GET
+    },
+}
+
+
+def perfil_atual(app):
+    """Retorna o nome do perfil SQLite configurado para a app."""
+    return app.config.get('SQLITE_PERFIL') or os.environ.get('SQLITE_PERFIL', 'producao')
+
+
+def opcoes_engine(app):
+    """Preenche `SQLALCHEMY_ENGINE_OPTIONS` com as opções do perfil.
+
+    Deve ser chamada antes de `db.init_app(app)`. Opções definidas
+    explicitamente na configuração da app têm prioridade.
+    """
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    if not uri.startswith('sqlite') or uri in ('sqlite://', 'sqlite:///:memory:'):
+        return  # Bancos em memória usam um pool próprio do SQLAlchemy
+    perfil = PERFIS[perfil_atual(app)]
+    opcoes = dict(perfil['engine'])
+    opcoes.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opcoes
+
+
+def aplicar_pragmas(engine, pragmas):
+    """Registra um evento que executa os PRAGMAs em cada nova conexão."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _ao_conectar(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for nome, valor in pragmas.items():
+            cursor.execute(f'PRAGMA {nome}={valor}')
+        cursor.close()
+
+
+def configurar_engine(app, engine):
+    """Aplica os PRAGMAs do perfil configurado ao engine da app."""
+    pragmas = dict(PERFIS[perfil_atual(app)]['pragmas'])
+    pragmas.update(app.config.get('SQLITE_PRAGMAS', {}))
+    aplicar_pragmas(engine, pragmas)
+
+
+def criar_engine_leitura(app):
+    """Cria o engine somente leitura usado pelas requisições GET.
+
+    Retorna None para bancos em memória (um segundo engine veria outro banco)
+    ou quando `SQLITE_LEITURA` estiver desligado.
+    """
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    if not uri.startswith('sqlite') or uri in ('sqlite://', 'sqlite:///:memory:'):
+        return None
+    perfil = PERFIS[perfil_atual(app)]
+    if not app.config.get('SQLITE_LEITURA', perfil.get('leitura', False)):
+        return None
+
+    caminho = os.path.abspath(make_url(uri).database)
+    opcoes = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    opcoes['pool_size'] = app.config.get('SQLITE_LEITURA_POOL', 20)
+    engine = create_engine(f'sqlite:///file:{caminho}?mode=ro&uri=true', **opcoes)
+
+    # Os mesmos PRAGMAs de desempenho, menos os do formato do arquivo (definidos pelo escritor)
+    pragmas = dict(perfil['pragmas'])
+    pragmas.update(app.config.get('SQLITE_PRAGMAS', {}))
+    pragmas.pop('auto_vacuum', None)
+    pragmas.pop('journal_mode', None)
+    pragmas['query_only'] = 'ON'
+    aplicar_pragmas(engine, pragmas)
+    return engine
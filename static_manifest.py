@@ -0,0 +1,147 @@
+# backend/static_manifest.py
+"""
+Manifesto em memória dos arquivos estáticos do frontend (SPA).
+
+Antes, cada acesso à rota catch-all fazia `os.path.exists` e depois
+`send_from_directory` (várias chamadas ao sistema de arquivos por página),
+inclusive para os deep links da SPA que sempre caem no `index.html`.
+
+Agora o diretório do frontend é lido uma única vez e cada arquivo vira uma
+entrada do manifesto com tamanho, data de modificação, hash do conteúdo
+(usado como ETag), tipo MIME e, para arquivos pequenos, os próprios bytes.
+O `index.html` e os demais arquivos pequenos são servidos direto da memória.
+
+Cabeçalhos de cache:
+- arquivos com "impressão digital" no nome (ex: `app.3f9a2c1d.js`) não mudam
+  nunca e recebem `Cache-Control: public, max-age=31536000, immutable`;
+- os demais recebem `no-cache`: o navegador revalida com o ETag e recebe 304.
+
+Em desenvolvimento, o manifesto pode verificar periodicamente se algum
+arquivo mudou (`FRONTEND_RECARREGAR`, em segundos) e se reconstruir.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+from flask import send_file
+from conditional import nao_modificado, resposta_nao_modificada, aplicar_validadores
+from compression import comprimir_com_cache
+
+# Nome com hash de conteúdo: "nome.<8+ hex>.ext" ou "nome-<8+ hex>.ext"
+PADRAO_IMPRESSAO_DIGITAL = re.compile(r'[.-][0-9a-f]{8,}\.[A-Za-z0-9]+$')
+
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+CACHE_REVALIDAR = 'no-cache'
+
+
+class EntradaArquivo:
+    """Metadados (e, se pequeno, o conteúdo) de um arquivo do frontend."""
+
+    def __init__(self, caminho, absoluto, tamanho, mtime, etag, mimetype, conteudo):
+        self.caminho = caminho      # Caminho relativo, com '/' (chave do manifesto)
+        self.absoluto = absoluto    # Caminho absoluto no disco
+        self.tamanho = tamanho
+        self.mtime = mtime
+        self.etag = etag            # Hash do conteúdo
+        self.mimetype = mimetype
+        self.conteudo = conteudo    # Bytes do arquivo ou None (arquivo grande)
+        self.cache_control = CACHE_IMUTAVEL if PADRAO_IMPRESSAO_DIGITAL.search(caminho) else CACHE_REVALIDAR
+
+
+def _hash_arquivo(caminho):
+    resumo = hashlib.sha1()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1024 * 1024), b''):
+            resumo.update(bloco)
+    return resumo.hexdigest()[:20]
+
+
+class ManifestoFrontend:
+    """Índice dos arquivos do frontend, montado uma vez e consultado em memória.
+
+    Uso:
+        manifesto = ManifestoFrontend('/caminho/frontend')
+        return manifesto.responder(path, app.response_class)
+    """
+
+    def __init__(self, diretorio, limite_memoria=256 * 1024, intervalo_verificacao=None):
+        self.diretorio = diretorio
+        self.limite_memoria = limite_memoria              # Arquivos até este tamanho ficam em memória
+        self.intervalo_verificacao = intervalo_verificacao  # Segundos entre verificações (None = nunca)
+        self._lock = threading.Lock()
+        self._proxima_verificacao = 0.0
+        self._assinatura = None
+        self.arquivos = {}
+        self.escanear()
+
+    def escanear(self):
+        """(Re)lê o diretório do frontend e monta um novo manifesto."""
+        arquivos = {}
+        for raiz, _, nomes in os.walk(self.diretorio):
+            for nome in nomes:
+                absoluto = os.path.join(raiz, nome)
+                caminho = os.path.relpath(absoluto, self.diretorio).replace(os.sep, '/')
+                info = os.stat(absoluto)
+                conteudo = None
+                if info.st_size <= self.limite_memoria:
+                    with open(absoluto, 'rb') as arquivo:
+                        conteudo = arquivo.read()
+                    etag = hashlib.sha1(conteudo).hexdigest()[:20]
+                else:
+                    etag = _hash_arquivo(absoluto)
+                mimetype = mimetypes.guess_type(nome)[0] or 'application/octet-stream'
+                arquivos[caminho] = EntradaArquivo(caminho, absoluto, info.st_size, info.st_mtime,
+                                                   etag, mimetype, conteudo)
+        self.arquivos = arquivos  # Troca atômica: leitores veem o manifesto antigo ou o novo
+        self._assinatura = self._calcular_assinatura()
+
+    def _calcular_assinatura(self):
+        # Resumo barato do estado do diretório: (arquivo, tamanho, mtime) de cada arquivo
+        assinatura = []
+        for raiz, _, nomes in os.walk(self.diretorio):
+            for nome in nomes:
+                try:
+                    info = os.stat(os.path.join(raiz, nome))
+                except OSError:
+                    continue
+                assinatura.append((raiz, nome, info.st_size, info.st_mtime_ns))
+        return sorted(assinatura)
+
+    def _verificar_alteracoes(self):
+        if self.intervalo_verificacao is None:
+            return
+        agora = time.monotonic()
+        if agora < self._proxima_verificacao:
+            return
+        with self._lock:
+            if agora < self._proxima_verificacao:
+                return
+            self._proxima_verificacao = agora + self.intervalo_verificacao
+            if self._calcular_assinatura() != self._assinatura:
+                self.escanear()
+
+    def obter(self, caminho):
+        """Retorna a entrada do arquivo pedido, ou a do `index.html` (fallback da SPA)."""
+        self._verificar_alteracoes()
+        entrada = self.arquivos.get(caminho) if caminho else None
+        return entrada or self.arquivos.get('index.html')
+
+    def responder(self, caminho, response_class):
+        """Monta a resposta para um caminho do frontend, ou None se não houver index.html."""
+        entrada = self.obter(caminho)
+        if entrada is None:
+            return None
+        if nao_modificado(entrada.etag):
+            response = resposta_nao_modificada(response_class, entrada.etag)
+        elif entrada.conteudo is not None:
+            response = aplicar_validadores(response_class(entrada.conteudo, mimetype=entrada.mimetype),
+                                           entrada.etag)
+        else:
+            # Arquivo grande: enviado do disco, mas sem consultar o sistema de arquivos antes
+            response = send_file(entrada.absoluto, mimetype=entrada.mimetype, etag=entrada.etag,
+                                 conditional=True, last_modified=entrada.mtime)
+        response.headers['Cache-Control'] = entrada.cache_control
+        return comprimir_com_cache(response)
@@ -0,0 +1,59 @@
+# backend/streaming.py
+"""
+Utilitários para respostas JSON transmitidas em partes (streaming).
+
+Em vez de montar uma lista inteira em memória e serializá-la de uma vez
+com `jsonify`, as funções daqui recebem um iterável (normalmente um
+resultado do SQLAlchemy lido com `yield_per`) e geram o texto JSON aos
+poucos. A memória usada fica limitada ao tamanho de uma parte.
+"""
+
+from flask import Response, stream_with_context
+
+# Tipos MIME dos formatos suportados
+MIMETYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Quantos itens são agrupados em cada parte enviada ao cliente.
+ITENS_POR_PARTE = 500
+
+
+def json_em_partes(itens, dumps, formato='json', itens_por_parte=ITENS_POR_PARTE):
+    """Gera o conteúdo de `itens` como array JSON ou NDJSON, parte por parte.
+
+    - `itens`: iterável de dicionários;
+    - `dumps`: função que serializa um dicionário (ex: `app.json.dumps`);
+    - `formato`: 'json' (um array) ou 'ndjson' (um objeto por linha).
+    """
+    ndjson = formato == 'ndjson'
+    separador = '\n' if ndjson else ','
+    buffer = []
+    primeira = True
+    if not ndjson:
+        yield '['
+    for item in itens:
+        buffer.append(dumps(item))
+        if len(buffer) >= itens_por_parte:
+            parte = separador.join(buffer)
+            yield (parte + '\n') if ndjson else (parte if primeira else ',' + parte)
+            primeira = False
+            buffer = []
+    if buffer:
+        parte = separador.join(buffer)
+        yield (parte + '\n') if ndjson else (parte if primeira else ',' + parte)
+    if not ndjson:
+        yield ']\n'
+
+
+def resposta_em_partes(itens, dumps, formato='json', itens_por_parte=ITENS_POR_PARTE):
+    """Cria uma `Response` Flask que transmite `itens` sem materializar a lista.
+
+    O gerador roda com `stream_with_context`, mantendo a sessão do banco
+    disponível enquanto o cursor é consumido. Por isso `itens` deve ser um
+    gerador que executa a consulta só na primeira iteração: a sessão usada
+    pela view é encerrada assim que ela retorna.
+    """
+    gerador = json_em_partes(itens, dumps, formato, itens_por_parte)
+    return Response(stream_with_context(gerador), mimetype=MIMETYPES[formato])
@@ -0,0 +1,122 @@
+# backend/tests/test_consultas.py
+"""
+Número de consultas SQL por requisição nas rotas de cachorros.
+
+As raças vêm do catálogo em memória (ver `cachorro_com_raca` em `app.py`),
+então nenhuma rota pode voltar a carregar a raça de cada cachorro com um
+SELECT próprio (problema N+1): o número de consultas é fixo, não importa
+quantos cachorros o usuário tenha.
+
+Uso:
+    python -m pytest -q tests
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import create_app
+from database import db
+from seed_db import seed_database
+
+
+class TestConsultasPorRequisicao(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.diretorio = tempfile.mkdtemp()
+        config = {'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(cls.diretorio, 'site.db')}", 'TESTING': True}
+        app = create_app(config)
+        with app.app_context():
+            seed_database()
+            db.engine.dispose()
+        # Uma segunda fábrica sobre o banco já criado, como no servidor depois do `seed_db.py`
+        cls.app = create_app(config)
+        cls.client = cls.app.test_client()
+
+        cls.consultas = []
+        engines = [cls.app.extensions.get('engine_leitura')]
+        with cls.app.app_context():
+            engines.append(db.engine)
+        for engine in filter(None, engines):
+            event.listen(engine, 'before_cursor_execute', cls._registrar)
+
+        # Um usuário com muitos cachorros (raças variadas), outro com um só e um sem cachorros
+        cls.user_id = cls._criar_usuario('muitos@example.com')
+        cls.outro_id = cls._criar_usuario('um@example.com')
+        cls.sem_cachorros_id = cls._criar_usuario('nenhum@example.com')
+        for numero in range(30):
+            cls._criar_cachorro(cls.user_id, f'Cachorro {numero}', 1 + numero % 10)
+        cls.cachorro_id = cls._criar_cachorro(cls.outro_id, 'Rex', 4)
+
+    @classmethod
+    def tearDownClass(cls):
+        with cls.app.app_context():
+            db.engine.dispose()
+        if 'engine_leitura' in cls.app.extensions:
+            cls.app.extensions['engine_leitura'].dispose()
+        shutil.rmtree(cls.diretorio, ignore_errors=True)
+
+    @classmethod
+    def _registrar(cls, conn, cursor, statement, parameters, context, executemany):
+        cls.consultas.append(statement)
+
+    @classmethod
+    def _criar_usuario(cls, email):
+        response = cls.client.post('/usuarios', json={'nome_completo': 'Usuário de Teste', 'email': email})
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()['id']
+
+    @classmethod
+    def _criar_cachorro(cls, user_id, nome_pet, raca_id):
+        response = cls.client.post('/cachorros', json={'nome_pet': nome_pet, 'user_id': user_id, 'raca_id': raca_id})
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()['id']
+
+    @contextmanager
+    def contar_consultas(self, esperado):
+        """Verifica que o bloco executa exatamente `esperado` comandos SQL."""
+        self.consultas.clear()
+        yield
+        self.assertEqual(len(self.consultas), esperado, '\n'.join(self.consultas))
+
+    def test_lista_de_cachorros_do_usuario(self):
+        for user_id, quantidade in ((self.outro_id, 1), (self.user_id, 30)):
+            with self.contar_consultas(2):  # Usuário existe + cachorros
+                response = self.client.get(f'/usuarios/{user_id}/cachorros')
+            self.assertEqual(response.status_code, 200)
+            cachorros = response.get_json()
+            self.assertEqual(len(cachorros), quantidade)
+            self.assertTrue(all(cachorro['breed']['id'] == cachorro['raca_id'] for cachorro in cachorros))
+
+    def test_cachorro_por_nome(self):
+        with self.contar_consultas(2):  # Usuário existe + cachorro
+            response = self.client.get(f'/usuarios/{self.outro_id}/cachorros/Rex')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['breed']['id'], 4)
+
+    def test_cachorro_por_id(self):
+        with self.contar_consultas(1):
+            response = self.client.get(f'/cachorros/{self.cachorro_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['breed']['id'], 4)
+
+    def test_cadastro_de_cachorro(self):
+        with self.contar_consultas(1):  # INSERT ... SELECT ... RETURNING
+            response = self.client.post('/cachorros', json={'nome_pet': 'Novo', 'user_id': self.sem_cachorros_id, 'raca_id': 2})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()['breed']['id'], 2)
+
+    def test_atualizacao_de_cachorro(self):
+        with self.contar_consultas(1):  # UPDATE ... RETURNING
+            response = self.client.put(f'/cachorros/{self.cachorro_id}', json={'idade': 5, 'raca_id': 4})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['idade'], 5)
+        self.assertEqual(response.get_json()['breed']['id'], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
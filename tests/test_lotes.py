@@ -0,0 +1,114 @@
+# backend/tests/test_lotes.py
+"""
+Corrida entre as rotas de cadastro em lote e outras escritas.
+
+As rotas de lote verificam os conflitos com um SELECT e só depois fazem o
+INSERT. Os testes colocam outra requisição (que grava e confirma) entre os
+dois, bem antes do INSERT do lote: o item afetado deve receber o seu 409
+(ou 404, se o dono foi removido) e o restante do lote deve ser gravado,
+sem um 500 para o lote inteiro.
+
+Uso:
+    python -m pytest -q tests
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from sqlalchemy import event
+from app import create_app
+from database import db
+from seed_db import seed_database
+
+
+class TestCorridaNosLotes(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.diretorio = tempfile.mkdtemp()
+        config = {'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(cls.diretorio, 'site.db')}", 'TESTING': True}
+        app = create_app(config)
+        with app.app_context():
+            seed_database()
+            db.engine.dispose()
+        cls.app = create_app(config)
+        cls.client = cls.app.test_client()
+        with cls.app.app_context():
+            cls.engine = db.engine
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.dispose()
+        if 'engine_leitura' in cls.app.extensions:
+            cls.app.extensions['engine_leitura'].dispose()
+        shutil.rmtree(cls.diretorio, ignore_errors=True)
+
+    def intrometer(self, prefixo, requisicao):
+        """Executa `requisicao()` noutra thread logo antes do primeiro comando que começa com `prefixo`."""
+        pendente = [requisicao]
+
+        def antes(conn, cursor, statement, parameters, context, executemany):
+            if pendente and statement.startswith(prefixo):
+                outra = threading.Thread(target=pendente.pop())
+                outra.start()
+                outra.join()
+
+        event.listen(self.engine, 'before_cursor_execute', antes)
+        self.addCleanup(event.remove, self.engine, 'before_cursor_execute', antes)
+        self.addCleanup(self.assertFalse, pendente, 'a outra requisição não foi executada')
+
+    def criar_usuario(self, email):
+        response = self.client.post('/usuarios', json={'nome_completo': 'Usuário de Teste', 'email': email})
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()['id']
+
+    def test_email_gravado_por_outra_requisicao(self):
+        self.intrometer('INSERT INTO user', lambda: self.criar_usuario('corrida@example.com'))
+        response = self.client.post('/usuarios/batch', json=[
+            {'nome_completo': 'Primeiro', 'email': 'lote-1@example.com'},
+            {'nome_completo': 'Corrida', 'email': 'corrida@example.com'},
+        ])
+        self.assertEqual(response.status_code, 207)
+        resultados = response.get_json()['resultados']
+        self.assertEqual([r['status'] for r in resultados], [201, 409])
+        self.assertEqual(resultados[0]['usuario']['email'], 'lote-1@example.com')
+
+    def test_cachorro_gravado_por_outra_requisicao(self):
+        user_id = self.criar_usuario('dono-corrida@example.com')
+
+        def outro_cadastro():
+            response = self.client.post('/cachorros', json={'nome_pet': 'Rex', 'user_id': user_id, 'raca_id': 1})
+            self.assertEqual(response.status_code, 201)
+            outro.append(response.get_json()['id'])
+
+        outro = []
+        self.intrometer('INSERT INTO cachorro', outro_cadastro)
+        response = self.client.post('/cachorros/batch', json=[
+            {'nome_pet': 'Rex', 'user_id': user_id, 'raca_id': 1},
+            {'nome_pet': 'Bidu', 'user_id': user_id, 'raca_id': 2},
+            {'nome_pet': 'Rex', 'user_id': user_id, 'raca_id': 3},
+        ])
+        self.assertEqual(response.status_code, 207)
+        resultados = response.get_json()['resultados']
+        self.assertEqual([r['status'] for r in resultados], [409, 201, 409])
+        self.assertEqual(resultados[0]['cachorro']['id'], outro[0])
+        self.assertEqual(resultados[2]['cachorro']['id'], outro[0])
+
+    def test_dono_removido_por_outra_requisicao(self):
+        removido = self.criar_usuario('removido@example.com')
+        dono = self.criar_usuario('fica@example.com')
+        self.intrometer('INSERT INTO cachorro',
+                        lambda: self.assertEqual(self.client.delete(f'/usuarios/{removido}').status_code, 200))
+        response = self.client.post('/cachorros/batch', json=[
+            {'nome_pet': 'Toby', 'user_id': removido, 'raca_id': 1},
+            {'nome_pet': 'Toby', 'user_id': dono, 'raca_id': 1},
+        ])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([r['status'] for r in response.get_json()['resultados']], [404, 201])
+
+
+if __name__ == '__main__':
+    unittest.main()